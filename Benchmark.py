@@ -0,0 +1,337 @@
+"""
+Houses the benchmark suite and its command line runner
+
+    python Benchmark.py --output results.json
+    python Benchmark.py --baseline results.json --threshold 0.25 --filter 'operator/*'
+
+Every benchmark is a call timed with timeit, the best of repeat runs of
+a calibrated number of calls, reported in seconds per call. Results are
+written as JSON and compared with a baseline written the same way, a
+benchmark is a regression when it is slower than the baseline by more
+than the threshold fraction, which makes the runner exit with status 1
+"""
+
+import argparse
+
+import fnmatch
+
+import json
+
+import platform
+
+import sys
+
+import time
+
+import timeit
+
+import numpy as np
+
+from Capture import CaptureSession
+
+from Error import ValueUncertainty
+
+from Utilities import LatexCreator
+
+
+SIZES = (1, 10**3, 10**6)
+
+CAPTURE_LENGTHS = (10, 100, 1000)
+
+LATEX_LENGTHS = (10, 100, 1000)
+
+
+_OPERATORS = {
+    'add': lambda a, b: a + b,
+    'sub': lambda a, b: a - b,
+    'mul': lambda a, b: a * b,
+    'truediv': lambda a, b: a / b,
+    'pow': lambda a, b: a ** 2.5,
+    'radd': lambda a, b: 2.5 + a,
+    'rsub': lambda a, b: 2.5 - a,
+    'rmul': lambda a, b: 2.5 * a,
+    'rtruediv': lambda a, b: 2.5 / a,
+    'rpow': lambda a, b: 2.5 ** a,
+    'neg': lambda a, b: -a,
+    'abs': lambda a, b: abs(a),
+}
+
+# The in place operators keep their operand bounded so repeated calls
+# time the same arithmetic
+_IN_PLACE_OPERATORS = {
+    'iadd': lambda a, b: a.__iadd__(b),
+    'isub': lambda a, b: a.__isub__(b),
+    'imul': lambda a, b: a.__imul__(1.0),
+    'itruediv': lambda a, b: a.__itruediv__(1.0),
+    'ipow': lambda a, b: a.__ipow__(1.0),
+}
+
+_STATICS = ('sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'exp', 'log', 'sqrt')
+
+_REDUCTIONS = {
+    'sum': lambda a: ValueUncertainty.sum(a),
+    'mean': lambda a: ValueUncertainty.average(a),
+    'population_variance': lambda a: ValueUncertainty.variance(a),
+    'sample_variance': lambda a: ValueUncertainty.variance(a, ddof = 1),
+}
+
+
+def Benchmarks(sizes = SIZES, capture_lengths = CAPTURE_LENGTHS, latex_lengths = LATEX_LENGTHS):
+    """
+    Yields (name, function) for every benchmark, names are
+    group/case/size. Operands are made when the benchmark is reached so
+    only one size is held in memory at a time
+    """
+
+    sizes = [str(size) for size in sizes] + ['scalar']
+
+    for size in sizes:
+
+        a, b = _Operands(size, 0), _Operands(size, 1)
+
+        for name, operator in _OPERATORS.items():
+            yield f"operator/{name}/{size}", lambda operator = operator: operator(a, b)
+
+        if size != 'scalar':
+
+            for name, operator in _IN_PLACE_OPERATORS.items():
+
+                target = _Operands(size, 2)
+
+                yield f"operator/{name}/{size}", lambda operator = operator, target = target: operator(target, b)
+
+        for name in _STATICS:
+            yield f"static/{name}/{size}", lambda function = getattr(ValueUncertainty, name): function(a)
+
+        if size != 'scalar':
+
+            for name, reduction in _REDUCTIONS.items():
+                yield f"reduction/{name}/{size}", lambda reduction = reduction: reduction(a)
+
+            values, errors = a.values, a.errors
+
+            values_list, errors_list = values.tolist(), errors.tolist()
+
+            yield f"construct/list/{size}", lambda: ValueUncertainty(values_list, errors_list)
+
+            yield f"construct/ndarray/{size}", lambda: ValueUncertainty(values, errors)
+
+            yield f"construct/ndarray_copy/{size}", lambda: ValueUncertainty(values, errors, copy = True)
+
+    for length in capture_lengths:
+
+        yield f"capture/none/{length}", lambda length = length: _Chain(length)
+
+        yield f"capture/record/{length}", lambda length = length: _CaptureChain(length, render = False)
+
+        yield f"capture/render/{length}", lambda length = length: _CaptureChain(length, render = True)
+
+    for length in latex_lengths:
+
+        capture = _CaptureChain(length, render = False)
+
+        start, values_dict, _ = capture._latex_variables()
+
+        yield f"latex/creator/{length}", lambda start = start, values_dict = values_dict: LatexCreator(start, values_dict)
+
+
+def RunBenchmarks(pattern = '*', repeat = 5, min_time = 0.05, sizes = SIZES, report = None):
+    """
+    Times the benchmarks whose names match the fnmatch pattern and
+    returns {name: seconds per call}. report is called with (name,
+    seconds) as each one finishes
+    """
+
+    results = {}
+
+    for name, function in Benchmarks(sizes):
+
+        if not fnmatch.fnmatchcase(name, pattern):
+            continue
+
+        results[name] = _Time(function, repeat, min_time)
+
+        if report is not None:
+            report(name, results[name])
+
+    return results
+
+
+def CompareResults(results, baseline, threshold = 0.25):
+    """
+    Compares {name: seconds} results with a baseline of the same form,
+    returns (name, baseline seconds, seconds, ratio, is regression)
+    for the benchmarks in both
+    """
+
+    comparison = []
+
+    for name in sorted(set(results) & set(baseline)):
+
+        ratio = results[name] / baseline[name] if baseline[name] > 0 else float('inf')
+
+        comparison.append((name, baseline[name], results[name], ratio, ratio > 1 + threshold))
+
+    return comparison
+
+
+def SaveResults(results, path):
+    """
+    Writes the results with the versions and machine they came from
+    """
+
+    document = {
+        'metadata': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+    with open(path, 'w') as file:
+        json.dump(document, file, indent = 2, sort_keys = True)
+
+
+def LoadResults(path):
+
+    with open(path) as file:
+        return json.load(file)['results']
+
+
+def main(argv = None):
+
+    parser = argparse.ArgumentParser(description = "Runs the ValueUncertainty benchmarks")
+
+    parser.add_argument('--output', help = "JSON file to write the results to")
+
+    parser.add_argument('--baseline', help = "JSON results of an earlier run to compare with")
+
+    parser.add_argument('--threshold', type = float, default = 0.25, help = "Slowdown fraction counted as a regression (default 0.25)")
+
+    parser.add_argument('--filter', default = '*', help = "fnmatch pattern of the benchmarks to run, e.g. 'static/*/1000'")
+
+    parser.add_argument('--sizes', default = ','.join(map(str, SIZES)), help = "Comma separated array sizes (default 1,1000,1000000)")
+
+    parser.add_argument('--repeat', type = int, default = 5, help = "Timing runs per benchmark, the best is kept (default 5)")
+
+    parser.add_argument('--min-time', type = float, default = 0.05, help = "Minimum seconds per timing run (default 0.05)")
+
+    parser.add_argument('--list', action = 'store_true', help = "List the benchmark names and exit")
+
+    arguments = parser.parse_args(argv)
+
+    sizes = [int(size) for size in arguments.sizes.split(',') if size]
+
+    if arguments.list:
+
+        for name, _ in Benchmarks(sizes = [1]):
+            print(name)
+
+        return 0
+
+    report = lambda name, seconds: print(f"{name:<40} {_Format(seconds)}", flush = True)
+
+    results = RunBenchmarks(arguments.filter, arguments.repeat, arguments.min_time, sizes, report)
+
+    if arguments.output:
+        SaveResults(results, arguments.output)
+
+    if not arguments.baseline:
+        return 0
+
+    comparison = CompareResults(results, LoadResults(arguments.baseline), arguments.threshold)
+
+    print()
+
+    print(f"{'benchmark':<40} {'baseline':>10} {'current':>10} {'ratio':>7}")
+
+    for name, before, after, ratio, regression in comparison:
+        print(f"{name:<40} {_Format(before)} {_Format(after)} {ratio:7.2f}" + ("  REGRESSION" if regression else ""))
+
+    regressions = sum(regression for *_, regression in comparison)
+
+    print(f"\n{regressions} regression(s) over {arguments.threshold:.0%} in {len(comparison)} compared benchmarks")
+
+    return 1 if regressions else 0
+
+
+def _Operands(size, seed):
+    """
+    Operand of the given size, values in [0.1, 0.9) so every static
+    function is defined, 'scalar' gives a ScalarUncertainty
+    """
+
+    rng = np.random.default_rng(seed)
+
+    if size == 'scalar':
+        return ValueUncertainty(float(rng.uniform(0.1, 0.9)), float(rng.uniform(0.001, 0.01)))
+
+    size = int(size)
+
+    return ValueUncertainty(rng.uniform(0.1, 0.9, size), rng.uniform(0.001, 0.01, size))
+
+
+def _Chain(length):
+    """
+    length alternating multiplications and additions on scalars
+    """
+
+    x, factor, addend = ValueUncertainty(0.5, 0.01, 'x'), ValueUncertainty(1.01, 0.001, 'k'), ValueUncertainty(0.1, 0.002, 'c')
+
+    for i in range(length // 2):
+        x = x * factor + addend
+
+    return x
+
+
+def _CaptureChain(length, render):
+
+    capture = CaptureSession().start()
+
+    try:
+        _Chain(length)
+
+    finally:
+        capture._reset()
+
+    if render:
+        capture.end()
+
+    return capture
+
+
+def _Time(function, repeat, min_time):
+    """
+    Best seconds per call, the number of calls per run being raised
+    until a run takes at least min_time
+    """
+
+    number = 1
+
+    while True:
+
+        elapsed = timeit.timeit(function, number = number)
+
+        if elapsed >= min_time:
+            break
+
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+
+    return min(timeit.repeat(function, number = number, repeat = repeat)) / number
+
+
+def _Format(seconds):
+
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+
+        if seconds >= scale:
+            return f"{seconds / scale:8.3f}{unit:>2}"
+
+    return f"{seconds / 1e-9:8.3f}ns"
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Houses the calculation capture sessions behind ValueUncertainty.StartCalcCapture
+
+The active session is held in a context variable, so captures running in
+different threads or asyncio tasks never see each other's operations and
+code outside a capture never sees one at all
+"""
+
+import itertools
+
+from array import array
+
+from contextvars import ContextVar
+
+from Utilities import CreateErrorLatexString, CreateValueLatexSting, LatexCreator
+
+
+current_capture = ContextVar('current_capture', default = None)
+
+
+_OPERATIONS = ('+', '-', '*', '/', 'l**', 'r**', 'sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'e', 'log', 'abs')
+
+_OPCODES = {operation: code for code, operation in enumerate(_OPERATIONS)}
+
+_UNARY = frozenset(_OPCODES[operation] for operation in ('sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'e', 'log', 'abs'))
+
+_session_numbers = itertools.count(1)
+
+
+class _Reference(str):
+    """
+    The @n# variable naming a captured result, which also remembers the
+    number of the session whose tape entry n is
+    """
+
+    session = 0
+
+
+class _Untracked(str):
+    """
+    The name of an operand that is not the result of a recorded
+    operation, e.g. an item of a reduction. It renders like any name,
+    but CompiledFormula refuses it rather than freezing its value
+    """
+
+
+class CaptureSession:
+    """
+    Collects the operations done while it is active. Use it as a context
+    manager, the results are then kept in latex_list and error_operations,
+    or through ValueUncertainty.StartCalcCapture and EndCalcCapture
+
+    Operations are kept on a tape, one entry per operation with its
+    opcode and two operand references in arrays, and the operand values
+    and errors and the result in lists. Operand references are n for the
+    result of entry n (the variable @n#), or -i for the i-th item of
+    inputs, which holds the (name, value, error) of named values and
+    plain numbers. Unnamed results of operations that were not recorded,
+    including results of other sessions, are inputs too, named untracked
+    by their value. The latex is only built from the tape by render or end
+    """
+
+    def __init__(self, precision = 4):
+
+        self.precision = precision
+
+        self.opcodes = array('b')
+
+        self.operands = array('q')
+
+        # The numbers are kept as given, not as doubles, so integers still
+        # render as integers
+        self.operand_values = []
+
+        self.operand_errors = []
+
+        self.result_values = []
+
+        self.result_errors = []
+
+        self.inputs = []
+
+        self.latex_list = None
+
+        self.error_operations = None
+
+        self._token = None
+
+        self._number = next(_session_numbers)
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        if exc_type is None:
+            self.end()
+
+        else:
+            self._reset()
+
+        return False
+
+
+    def __len__(self):
+        return len(self.opcodes)
+
+
+    @property
+    def result(self):
+        """
+        (value, error) of the last captured operation, taken from the tape
+        """
+
+        if not self.opcodes:
+            return None
+
+        return self.result_values[-1], self.result_errors[-1]
+
+
+    def start(self):
+        """
+        Makes this the active capture of the current thread or task
+        """
+
+        self._token = current_capture.set(self)
+
+        return self
+
+
+    def end(self):
+        """
+        Stops capturing and returns the latex lines of the calculation
+        along with the latex of every error propagation
+        """
+
+        self._reset()
+
+        self.latex_list, self.error_operations = self.render()
+
+        return self.latex_list, self.error_operations
+
+
+    def record(self, operation, value, error, *items):
+        """
+        Appends an operation, items being the (name, value, error) of its
+        operands. Returns the variable naming the result
+        """
+
+        self.opcodes.append(_OPCODES[operation])
+
+        for name, item_value, item_error in items:
+
+            if isinstance(name, _Reference) and name.session == self._number:
+
+                self.operands.append(int(name[1:-1]))
+
+            else:
+
+                # A result of another session is taken by value, its @n#
+                # would name an entry of this tape
+                if name[:1] == '@' and name[-1:] == '#':
+                    name = _Untracked(str(item_value))
+
+                self.inputs.append((name, item_value, item_error))
+
+                self.operands.append(-len(self.inputs))
+
+            self.operand_values.append(item_value)
+
+            self.operand_errors.append(item_error)
+
+        if len(items) == 1:
+
+            self.operands.append(0)
+
+            self.operand_values.append(0.0)
+
+            self.operand_errors.append(0.0)
+
+        self.result_values.append(value)
+
+        self.result_errors.append(error)
+
+        reference = _Reference(f"@{len(self.opcodes)}#")
+
+        reference.session = self._number
+
+        return reference
+
+
+    def render(self):
+        """
+        Builds the latex lines and error propagation strings of the
+        operations captured so far
+        """
+
+        start, values_dict, error_operations = self._latex_variables()
+
+        if start is None:
+            return [], error_operations
+
+        latex_list = LatexCreator(start, values_dict)
+
+        latex_list.reverse()
+
+        return latex_list, error_operations
+
+
+    def _latex_variables(self):
+        """
+        The variable LatexCreator starts from, the dictionary of variable
+        strings it expands and the error propagation strings. The start
+        is None when nothing was captured
+        """
+
+        values_dict = {}
+
+        error_operations = []
+
+        for entry, opcode in enumerate(self.opcodes):
+
+            operation = _OPERATIONS[opcode]
+
+            items = [self._operand(2 * entry)]
+
+            if opcode not in _UNARY:
+                items.append(self._operand(2 * entry + 1))
+
+            value_operation = '**' if operation in ('l**', 'r**') else operation
+
+            values_dict[f"@{entry + 1}#"] = CreateValueLatexSting(value_operation, *[(name, value) for name, value, _ in items])
+
+            if operation != 'abs':
+                error_operations.append(CreateErrorLatexString(operation, self.result_errors[entry], *[(value, error) for _, value, error in items]))
+
+        if not values_dict:
+            return None, values_dict, error_operations
+
+        current_var = f"@{len(self.opcodes)}#"
+
+        next_var = f"@{len(self.opcodes) + 1}#"
+
+        next_result = str(self.result_values[-1])
+
+        values_dict[next_var] = (current_var, next_result)
+
+        final_var = f"@{len(self.opcodes) + 2}#"
+
+        values_dict[final_var] = (next_var, '')
+
+        return values_dict[final_var][0], values_dict, error_operations
+
+
+    def compile(self):
+        """
+        CompiledFormula replaying the captured operations on arrays,
+        see Formula.CompiledFormula
+        """
+
+        from Formula import CompiledFormula
+
+        return CompiledFormula(self)
+
+
+    def _operand(self, index):
+
+        reference = self.operands[index]
+
+        if reference < 0:
+            return self.inputs[-reference - 1]
+
+        return f"@{reference}#", self.operand_values[index], self.operand_errors[index]
+
+
+    def _reset(self):
+
+        if self._token is not None:
+
+            current_capture.reset(self._token)
+
+            self._token = None
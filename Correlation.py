@@ -0,0 +1,267 @@
+"""
+Houses the sparse jacobian used to propagate errors between correlated
+values, see ValueUncertainty.StartCorrelationTracking
+
+Every item of a tracked value carries the partial derivatives of it with
+respect to the independent inputs it depends on, stored as coordinate
+(row, column, coefficient) arrays. Rows index the flattened items of the
+value and columns index the independent inputs, whose errors are kept in
+a registry here. The error of every item is then one weighted bincount
+over the non-zero derivatives, no dense matrices are ever built
+"""
+
+import numpy as np
+
+
+_input_errors = np.empty(0)
+
+_input_count = 0
+
+_generation = 0
+
+
+def ResetInputs():
+    """
+    Forgets all registered independent inputs. Jacobians created before
+    the reset are stale and their values get registered again as new
+    independent inputs when next used
+    """
+
+    global _input_errors, _input_count, _generation
+
+    _input_errors = np.empty(0)
+
+    _input_count = 0
+
+    _generation += 1
+
+
+def RegisterInputs(errors):
+    """
+    Registers every item of errors as a new independent input and returns
+    the identity jacobian of those items. Items without error get an id
+    but no derivative entry as they can not contribute
+    """
+
+    global _input_errors, _input_count
+
+    errors = np.ravel(errors)
+
+    start = _input_count
+
+    end = start + errors.size
+
+    if end > _input_errors.size:
+
+        grown = np.empty(max(end, 2 * _input_errors.size))
+
+        grown[:start] = _input_errors[:start]
+
+        _input_errors = grown
+
+    _input_errors[start:end] = errors
+
+    _input_count = end
+
+    rows = np.flatnonzero(errors)
+
+    return SparseJacobian(rows, rows + start, np.ones(rows.size), errors.size)
+
+
+def CombineJacobians(shape, *terms):
+    """
+    Chain rule for an elementwise operation with a result of the given
+    shape. terms are (jacobian, operand shape, partial derivative) with
+    the partial derivative of the result with respect to that operand,
+    broadcastable to shape
+    """
+
+    size = int(np.prod(shape))
+
+    parts = []
+
+    for jacobian, operand_shape, partial in terms:
+
+        if tuple(operand_shape) != tuple(shape):
+
+            mapping = np.broadcast_to(np.arange(jacobian.size).reshape(operand_shape), shape)
+
+            jacobian = jacobian.remap(mapping.ravel())
+
+        parts.append(jacobian.scaled(partial, shape))
+
+    if len(parts) == 0:
+        return SparseJacobian(np.empty(0, dtype = np.int64), np.empty(0, dtype = np.int64), np.empty(0), size)
+
+    if len(parts) == 1:
+        return parts[0]
+
+    rows = np.concatenate([part.rows for part in parts])
+
+    columns = np.concatenate([part.columns for part in parts])
+
+    coefficients = np.concatenate([part.coefficients for part in parts])
+
+    return _Coalesce(rows, columns, coefficients, size)
+
+
+def Covariance(jacobian_a, jacobian_b):
+    """
+    Covariance matrix between the items of two tracked values, of shape
+    (jacobian_a.size, jacobian_b.size). Only the inputs either depends on
+    are expanded so this stays small for small values
+    """
+
+    columns = np.union1d(jacobian_a.columns, jacobian_b.columns)
+
+    dense = lambda jac: _Dense(jac, columns)
+
+    return (dense(jacobian_a) * _input_errors[columns]**2) @ dense(jacobian_b).T
+
+
+def _Dense(jacobian, columns):
+
+    dense = np.zeros((jacobian.size, columns.size))
+
+    dense[jacobian.rows, np.searchsorted(columns, jacobian.columns)] = jacobian.coefficients
+
+    return dense
+
+
+def _Coalesce(rows, columns, coefficients, size):
+    """
+    Sums the coefficients of repeated (row, column) pairs, dropping the
+    ones that cancel exactly such as in x - x
+    """
+
+    keys = rows * max(_input_count, 1) + columns
+
+    unique, inverse = np.unique(keys, return_inverse = True)
+
+    coefficients = np.bincount(inverse, coefficients, minlength = unique.size)
+
+    keep = coefficients != 0
+
+    unique = unique[keep]
+
+    rows, columns = np.divmod(unique, max(_input_count, 1))
+
+    return SparseJacobian(rows, columns, coefficients[keep], size)
+
+
+class SparseJacobian:
+    """
+    Partial derivatives of the flattened items of a value (rows) with
+    respect to the registered independent inputs (columns)
+    """
+
+    __slots__ = ('rows', 'columns', 'coefficients', 'size', 'generation')
+
+    def __init__(self, rows, columns, coefficients, size):
+
+        self.rows = rows
+
+        self.columns = columns
+
+        self.coefficients = coefficients
+
+        self.size = size
+
+        self.generation = _generation
+
+
+    @property
+    def is_current(self):
+        return self.generation == _generation
+
+
+    def errors(self):
+        """
+        Propagated error of every item, sqrt(sum_j (J_ij sigma_j)^2)
+        """
+
+        contributions = np.square(self.coefficients * _input_errors[self.columns])
+
+        return np.sqrt(np.bincount(self.rows, contributions, minlength = self.size))
+
+
+    def scaled(self, partial, shape):
+        """
+        Multiplies every row by the partial derivative of its item
+        """
+
+        if np.ndim(partial) == 0:
+            return self._replace(self.rows, self.columns, self.coefficients * partial, self.size)
+
+        partial = np.ravel(np.broadcast_to(partial, shape))
+
+        return self._replace(self.rows, self.columns, self.coefficients * partial[self.rows], self.size)
+
+
+    def remap(self, mapping):
+        """
+        Jacobian of a selection or broadcast of this value, where item i
+        of the new value is item mapping[i] of this one
+        """
+
+        mapping = np.ravel(mapping)
+
+        order = np.argsort(mapping, kind = 'stable')
+
+        counts = np.bincount(mapping, minlength = self.size)
+
+        starts = np.cumsum(counts) - counts
+
+        repeats = counts[self.rows]
+
+        total = int(repeats.sum())
+
+        offsets = np.arange(total) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+
+        rows = order[np.repeat(starts[self.rows], repeats) + offsets]
+
+        return self._replace(rows, np.repeat(self.columns, repeats), np.repeat(self.coefficients, repeats), mapping.size)
+
+
+    def reduced(self, shape, axis, weights = None):
+        """
+        Jacobian of a weighted sum over axis of a value with the given
+        shape, weights being broadcastable to shape
+        """
+
+        coefficients = self.coefficients
+
+        if np.ndim(weights) == 0 and weights is not None:
+            coefficients = coefficients * weights
+
+        elif weights is not None:
+            coefficients = coefficients * np.ravel(np.broadcast_to(weights, shape))[self.rows]
+
+        if axis is None:
+
+            return _Coalesce(np.zeros_like(self.rows), self.columns, coefficients, 1)
+
+        axes = [a % len(shape) for a in np.atleast_1d(axis)]
+
+        kept = [i for i in range(len(shape)) if i not in axes]
+
+        kept_shape = tuple(shape[i] for i in kept)
+
+        coordinates = np.unravel_index(self.rows, shape)
+
+        if kept:
+            rows = np.ravel_multi_index(tuple(coordinates[i] for i in kept), kept_shape)
+
+        else:
+            rows = np.zeros_like(self.rows)
+
+        return _Coalesce(rows, self.columns, coefficients, int(np.prod(kept_shape)))
+
+
+    def _replace(self, rows, columns, coefficients, size):
+
+        result = SparseJacobian(rows, columns, coefficients, size)
+
+        result.generation = self.generation
+
+        return result
@@ -1,609 +1,2372 @@
+import math
+
+import threading
+
+import weakref
+
 import numpy as np
 
-from Utilities import *
+from functools import wraps
 
-class ValueUncertainty:
-    
-    _values_dict = {}
+from Utilities import *
 
-    _error_operations = []
+from Correlation import *
 
-    _capture_calcs = False
+from Capture import CaptureSession, _Reference, _Untracked, current_capture
 
-    _last_var = '@0#'
+from Lazy import BLOCK_SIZE, EvaluateExpression, ReadsBuffers
 
-    @property
-    def mean(self):
+from Kernels import SLOPES
 
-        return ValueUncertainty.sum(self) / len(self)
-    
 
-    @property
-    def population_variance(self):
+_NUMBER_TYPES = (int, float, np.integer, np.floating)
 
-        numerator = (self - self.mean)**2
+_new_object = object.__new__
 
-        return ValueUncertainty.sum(numerator) / len(self)
 
+_scratch = threading.local()
 
-    @property
-    def sample_variance(self):
-        
-        numerator = (self - self.mean)**2
+# Lazy results not evaluated yet. Their graphs read the buffers of the
+# operands only when evaluated, so writes into an operand evaluate the
+# results reading it first, see ValueUncertainty._settle_lazy
+_pending_lazy = weakref.WeakSet()
 
-        return ValueUncertainty.sum(numerator) / (len(self) - 1)
 
+def _scratch_buffer(shape, dtype):
+    """
+    Temporary array of shape reused by the in place operations of the
+    current thread, so steady state loops do not allocate
+    """
 
-    @property
-    def zipped(self):
-        return zip(self.values.tolist(), self.errors.tolist())
-    
+    size = int(np.prod(shape))
 
-    def __init__(self, values, errors = [], variable_name = ''):
-        
-        if not (values is np.ndarray):
+    buffer = getattr(_scratch, 'buffer', None)
 
-            if hasattr(values, '__iter__'):
+    if buffer is None or buffer.size < size or buffer.dtype != dtype:
+        buffer = _scratch.buffer = np.empty(size, dtype = dtype)
 
-                values = np.array(list(values))
+    return buffer[:size].reshape(shape)
 
-            elif type(values) == int or type(values) == float:
-                
-                values = np.array([values])
-            
-            else:
-                raise ValueError("values field must be castable to a list, or a number (float/int)")
-        
-        if (type(errors) != np.ndarray):
-             
-            if hasattr(errors, '__iter__'):
 
-                errors = np.array(list(errors))
+def _error_buffer(item):
+    """
+    Errors array of a ValueUncertainty, None for exact objects and plain
+    numbers
+    """
 
-            elif type(errors) == int or type(errors) == float:
-                
-                errors = np.array([errors])
-            
-            else:
-                raise ValueError("errors field must be castable to a list, or a number (float/int)")
-        
-        if (len(errors) == 0):
-            errors = np.array([0.0] * len(values))
-        
-        if len(values) != len(errors):
-            raise ValueError("Values and errors must have the same length")
+    if not isinstance(item, ValueUncertainty) or item.is_exact:
+        return None
 
-        self.values = values
+    return item._errors
 
-        self.errors = abs(errors)
 
-        if variable_name == "":
-            
-            self._variable_name = str(self.values[0])
-        
-        else:
+def _added_errors(a_errors, b_errors, shape):
+    """
+    Errors of a sum or difference of items of shape, None when both
+    operands are exact
+    """
 
-            self._variable_name = variable_name
+    if a_errors is None and b_errors is None:
+        return None
 
+    if a_errors is None or b_errors is None:
+        return np.broadcast_to(b_errors if a_errors is None else a_errors, shape).copy()
 
-    def __len__(self):
-        return len(self.values)
-    
+    return np.sqrt(np.square(a_errors) + np.square(b_errors))
 
-    def __iter__(self):
 
-        for value, error in self.zipped:
+def _quadrature(a_term, b_term, shape):
+    """
+    sqrt(a_term^2 + b_term^2) for items of shape, where the terms of
+    exact operands are None and skipped
+    """
 
-            yield ValueUncertainty(value, error)
+    if a_term is None and b_term is None:
+        return None
 
-    # Making i a tuple to allow for multi indexing?
-    def __getitem__(self, i):
-        
-        if type(i) != int:
-            raise IndexError(f"When indexing the index varible must be type 'int', not {type(i)}")
-        
-        return ValueUncertainty(self.values[i], self.errors[i])
+    if a_term is None or b_term is None:
 
-    # Making i a tuple to allow for multi indexing?
-    def __setitem__(self, i, value):
-        
-        if type(value) != ValueUncertainty:
-            raise ValueError(f"Value must be of type ValueUncertainty, not {type(value)}")
-        
-        if len(value) > 1:
-            raise ValueError(f"Value must have a length of 1, not {len(value)}")
+        term = np.abs(b_term if a_term is None else a_term)
 
-        self.values[i] = value.values[0]
+        return term if term.shape == shape else np.broadcast_to(term, shape).copy()
 
-        self.errors[i] = value.errors[0]
-    
+    errors = np.sqrt(np.square(a_term) + np.square(b_term))
 
-    def __str__(self) -> str:
+    return errors if errors.shape == shape else np.broadcast_to(errors, shape).copy()
 
-        s = [f'{round(value,2)} ± {round(error,2)}' for value, error in self.zipped]
 
-        return f'[{", ".join(s)}]'
-    
+def _cached_statistic(method):
+    """
+    Turns a statistic into a property whose result is kept in the
+    instance's cache until the values or errors are changed
+    """
 
-    def __add__(self, addend):
+    name = method.__name__
 
-        if type(addend) == ValueUncertainty:
+    # Views share their buffers with the base object, so they are never
+    # cached as writes through the base would not reach them. Neither
+    # are statistics computed while tracking correlations, which need
+    # derivatives from the current tracking
 
-            values = self.values + addend.values
+    @wraps(method)
+    def cached(self):
 
-            errors = np.sqrt(self.errors**2 + addend.errors**2)
+        if self._base is not None or ValueUncertainty._track_correlations:
+            return method(self)
 
-        else:
+        if self._stats_cache is None:
+            self._stats_cache = {}
 
-            values = self.values + addend
+        if name not in self._stats_cache:
 
-            errors = self.errors
-        
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('+', self, addend)
+            result = method(self)
 
-            ValueUncertainty._format_error_calcs('+', errors[0], self, addend)
-        
-        variable = ValueUncertainty._get_var()
+            # The cached object is handed to every caller, so its buffers
+            # are made read only to keep in place operators and item
+            # assignment from changing the cache
+            for buffer in (result._values, result._errors):
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+                if buffer is not None:
+                    buffer.flags.writeable = False
 
+            self._stats_cache[name] = result
 
+        return self._stats_cache[name]
 
-    def __mul__(self, factor):
+    return property(cached)
 
-        if type(factor) == ValueUncertainty:
 
-            values = self.values * factor.values
+class ValueUncertainty:
 
-            errors = values * np.sqrt((self.errors / self.values)**2 + (factor.errors / factor.values)**2)
+    __slots__ = ('_values', '_errors', '_stats_cache', '_base', '_jacobian', '_expression', '_variable_name', '__weakref__')
+    
+    _track_correlations = False
 
-        else:
+    _lazy = False
 
-            values = self.values * factor
+    _block_size = None
 
-            errors = self.errors * factor
+    @property
+    def values(self):
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('*', self, factor)
+        if self._expression is not None:
+            self.compute()
 
-            ValueUncertainty._format_error_calcs('*', errors[0], self, factor)
+        return self._values
 
-        variable = ValueUncertainty._get_var()
-        
-        return ValueUncertainty(values, errors, variable_name=variable)
 
+    @values.setter
+    def values(self, values):
 
-    def __truediv__(self, divisor):
-        
+        self._settle_lazy()
 
-        if type(divisor) == ValueUncertainty:
+        self._values = values
 
-            values = self.values / divisor.values
+        self._invalidate_cache()
 
-            errors = values * np.sqrt((self.errors / self.values)**2 + (divisor.errors / divisor.values)**2)
 
-        else:
-            values = self.values / divisor
+    @property
+    def errors(self):
+        """
+        Exact objects hold no errors buffer, for them this is a read
+        only array of zeros taking no memory
+        """
 
-            errors = self.errors / divisor
+        if self._expression is not None:
+            self.compute()
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('/', self, divisor)
+        if self._errors is None:
+            return np.broadcast_to(np.zeros((), dtype = np.result_type(self._values, 0.0)), self._values.shape)
 
-            ValueUncertainty._format_error_calcs('/', errors[0], self, divisor)
-        
-        variable = ValueUncertainty._get_var()
+        return self._errors
 
-        return ValueUncertainty(values, errors, variable_name=variable)
 
+    @errors.setter
+    def errors(self, errors):
 
-    def __rtruediv__(self, quotient):
+        self._settle_lazy()
 
+        self._errors = errors
 
-        if type(quotient) == ValueUncertainty:
+        self._invalidate_cache()
 
-            values = quotient.values / self.values
 
-            errors = values * np.sqrt((self.errors / self.values)**2 + (quotient.errors / quotient.values)**2)
+    @property
+    def is_exact(self):
+        """
+        True when the errors are known to be zero, the propagation then
+        skips every error calculation involving this object
+        """
 
-        else:
-            values = quotient / self.values
+        if self._expression is not None:
+            self.compute()
 
-            errors = values * self.errors / self.values
+        return self._errors is None
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('/', quotient, self)
 
-            ValueUncertainty._format_error_calcs('/', errors[0], quotient, self)
-        
-        variable = ValueUncertainty._get_var()
+    @_cached_statistic
+    def mean(self):
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+        return ValueUncertainty.average(self)
     
 
-    def __pow__(self, power): 
+    @_cached_statistic
+    def population_variance(self):
 
-        values = self.values ** power
+        return ValueUncertainty.variance(self)
+
+
+    @_cached_statistic
+    def sample_variance(self):
         
-        errors = power * values * self.errors / self.values
+        return ValueUncertainty.variance(self, ddof = 1)
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('**', self, power)
 
-            ValueUncertainty._format_error_calcs('l**', errors[0], self, power)
+    @_cached_statistic
+    def standard_error(self):
+        """
+        Standard error of the mean, sqrt(sample_variance / N)
+        """
 
-        variable = ValueUncertainty._get_var()
+        variance = self.sample_variance
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+        values = np.sqrt(variance.values / self.size)
 
+        errors = None if variance.is_exact else variance.errors / (2 * self.size * values)
 
-    def __rpow__(self, base):
+        return ValueUncertainty._from_buffers(values, errors)
 
-        values = base ** self.values
 
-        errors = values * np.log(base) * self.errors
+    @property
+    def zipped(self):
+        return zip(self.values.ravel().tolist(), self.errors.ravel().tolist())
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('**', base, self)
 
-            ValueUncertainty._format_error_calcs('r**', errors[0], base, self)
+    @property
+    def shape(self):
+        return self.values.shape
 
-        variable = ValueUncertainty._get_var()
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+    @property
+    def ndim(self):
+        return self.values.ndim
 
 
-    def __radd__(self, addend):
-        return self + addend
+    @property
+    def size(self):
+        return self.values.size
 
 
-    def __sub__(self, term):
+    @property
+    def T(self):
+        return self.transpose()
+    
 
+    def __new__(cls, values = None, errors = None, variable_name = '', copy = False, dtype = None):
+        """
+        Single numbers with a single number or no error make a
+        ScalarUncertainty, which holds plain floats
+        """
 
-        if type(term) == ValueUncertainty:
+        if cls is ValueUncertainty and dtype is None and isinstance(values, _NUMBER_TYPES) and (errors is None or isinstance(errors, _NUMBER_TYPES)):
+            cls = ScalarUncertainty
 
-            values = self.values - term.values
+        return object.__new__(cls)
 
-            errors = np.sqrt(self.errors**2 + term.errors**2)
 
-        else:
+    def __init__(self, values, errors = None, variable_name = '', copy = False, dtype = None):
+        """
+        values and errors may be numbers, iterables or numpy arrays. Arrays
+        are adopted without copying unless copy is True or a dtype cast is
+        needed, dtype allows e.g. np.float32 storage for large datasets.
+        Without errors (or with errors = 0) the object is exact and holds
+        no errors buffer, see is_exact
+        """
 
-            values = self.values - term
+        values = ValueUncertainty._as_buffer(values, 'values', copy, dtype)
 
-            errors = self.errors
+        if errors is None or (not isinstance(errors, np.ndarray) and hasattr(errors, '__len__') and len(errors) == 0) \
+           or (isinstance(errors, (int, float)) and errors == 0):
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('-', self, term)
+            errors = None
+
+        else:
 
-            ValueUncertainty._format_error_calcs('-', errors[0], self, term)
+            errors = ValueUncertainty._as_buffer(errors, 'errors', copy, dtype)
+
+            if (errors < 0).any():
+                errors = np.abs(errors)
         
-        variable = ValueUncertainty._get_var()
+        if errors is not None and errors.shape != values.shape:
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+            try:
+                errors = np.broadcast_to(errors, values.shape).copy()
 
+            except ValueError:
+                raise ValueError(f"Errors of shape {errors.shape} can not be broadcast to the values shape {values.shape}")
 
-    def __rsub__(self, term):
+        # A new object has nothing to settle or invalidate, the buffers
+        # are set as _from_buffers does instead of through the setters
+        self._values = values
 
-        if type(term) == ValueUncertainty:
+        self._errors = errors
 
-            values = term.values - self.values
+        self._stats_cache = None
+
+        self._base = None
 
-            errors = np.sqrt(self.errors**2 + term.errors**2)
+        self._jacobian = None
 
+        self._expression = None
+
+        if variable_name == "":
+            
+            self._variable_name = str(self.values.flat[0])
+        
         else:
 
-            values = term - self.values
+            self._variable_name = variable_name
 
-            errors = self.errors
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('-', term, self)
+    @staticmethod
+    def _as_buffer(items, field, copy, dtype):
 
-            ValueUncertainty._format_error_calcs('-', errors[0], term, self)
+        if isinstance(items, np.ndarray):
 
-        variable = ValueUncertainty._get_var()
+            if copy:
+                return np.array(items, dtype = dtype, ndmin = 1)
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+            return np.atleast_1d(np.asarray(items, dtype = dtype))
 
+        elif hasattr(items, '__iter__'):
 
-    def __rmul__(self, factor):
-        return self * factor
-    
+            return np.array(items if hasattr(items, '__len__') else list(items), dtype = dtype)
 
-    def __abs__(self):
+        elif isinstance(items, (int, float, np.number)):
 
-        if ValueUncertainty._capture_calcs:
-            ValueUncertainty._format_value_calcs('abs', self)
+            return np.array([items], dtype = dtype)
 
-        variable = self._get_var()
+        raise ValueError(f"{field} field must be castable to a list, or a number (float/int)")
 
-        return ValueUncertainty(abs(self.values), self.errors, variable_name=variable)
-    
 
-    @staticmethod
-    def sqrt(rooted):
+    @classmethod
+    def _from_buffers(cls, values, errors, variable_name = ''):
+        """
+        Wraps arrays computed by the operators directly, skipping the
+        validation and copying done in __init__. errors must already
+        be non-negative, or None for exact results
+        """
 
-        ## Format string for sqrt
+        result = object.__new__(cls)
 
-        return rooted ** (1/2)
-    
+        result._values = values
 
-    @staticmethod
-    def sum(iterable):
-        
-        ## Format string for the sum method
+        result._errors = errors
 
-        result = 0
+        result._stats_cache = None
 
-        for item in iterable:
-            result += item
-        
-        return result
+        result._base = None
 
+        result._jacobian = None
 
-    @staticmethod
-    def sin(value_uncertainty):
-        """
-        IN RADS
-        """
-        
-        if type(value_uncertainty) == ValueUncertainty:
+        result._expression = None
 
-            values = np.sin(value_uncertainty.values)
+        result._variable_name = variable_name
 
-            errors = np.cos(value_uncertainty.values) * value_uncertainty.errors
+        return result
 
-        else:
 
-            values = np.sin(value_uncertainty)
+    def __len__(self):
+        return len(self.values)
+    
 
-            errors = 0
+    def __iter__(self):
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('sin', value_uncertainty)
+        if self.ndim > 1:
 
-            ValueUncertainty._format_error_calcs('sin', abs(errors[0]), value_uncertainty)
+            for i in range(len(self)):
+                yield self[i]
 
-        variable = ValueUncertainty._get_var()
+            return
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+        for value, error in self.zipped:
 
-    @staticmethod
-    def cos(value_uncertainty):
+            yield ValueUncertainty(value, error)
+
+
+    def reshape(self, *shape):
         """
-        IN RADS
+        New shape sharing the buffers where numpy can return a view
         """
-        
-        if type(value_uncertainty) == ValueUncertainty:
 
-            values = np.cos(value_uncertainty.values)
+        if len(shape) == 1:
+            shape = shape[0]
 
-            errors = np.sin(value_uncertainty.values) * value_uncertainty.errors
+        return self._view(lambda items: items.reshape(shape))
 
-        else:
 
-            values = np.cos(value_uncertainty)
+    def transpose(self, *axes):
 
-            errors = 0
+        return self._view(lambda items: items.transpose(*axes))
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('cos', value_uncertainty)
 
-            ValueUncertainty._format_error_calcs('cos', abs(errors[0]), value_uncertainty)
-        
-        variable = ValueUncertainty._get_var()
+    def _view(self, select):
+        """
+        Wraps the arrays select derives from this object's buffers,
+        keeping a reference to it when they share memory so writes
+        invalidate its cached statistics
+        """
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+        values = select(self.values)
 
+        errors = None if self._errors is None else select(self._errors)
 
-    @staticmethod
-    def tan(value_uncertainty):
-        """
-        IN RADS
-        """
-        
-        if type(value_uncertainty) == ValueUncertainty:
+        tracked = ValueUncertainty._track_correlations and self._jacobian is not None and self._jacobian.is_current
 
-            values = np.tan(value_uncertainty.values)
+        if values.ndim == 0 and not tracked:
+            return ScalarUncertainty._from_numbers(values.item(), 0.0 if errors is None else errors.item())
 
-            errors =  value_uncertainty.errors / ((np.cos(value_uncertainty.values)) ** 2)
+        if values.ndim == 0:
             
-        else:
+            values, errors = values[None], None if errors is None else errors[None]
 
-            values = np.tan(value_uncertainty)
+        result = ValueUncertainty._from_buffers(values, errors)
 
-            errors = 0
+        if np.may_share_memory(values, self.values):
+            result._base = self
 
-        if ValueUncertainty._capture_calcs:
-            ValueUncertainty._format_value_calcs('tan', value_uncertainty)
+        if tracked:
+            result._jacobian = self._jacobian.remap(select(np.arange(self.size).reshape(self.shape)))
 
-            ValueUncertainty._format_error_calcs('tan', abs(errors[0]), value_uncertainty)
-        
-        variable = ValueUncertainty._get_var()
+        return result
+
+    def __getitem__(self, i):
+        """
+        Indexes like a numpy array. Integers and slices return views
+        sharing the values and errors buffers, integer arrays and boolean
+        masks return a copy of the selected items. Selecting a single
+        item returns a ScalarUncertainty holding a copy of it (a
+        ValueUncertainty of length 1 while tracking correlations)
+        """
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+        if isinstance(i, (float, str)):
+            raise IndexError(f"When indexing the index varible must be an int, slice, tuple, integer array or boolean mask, not {type(i)}")
 
+        if isinstance(i, ValueUncertainty):
+            i = i.values
 
-    @staticmethod
-    def arcsin(value_uncertainty):
+        return self._view(lambda items: items[i])
+
+
+    def __setitem__(self, i, value):
         """
-        IN RADS
+        value may be a ValueUncertainty, or numbers/arrays which are
+        taken as exact with zero error. It is broadcast over the selected
+        items so slices and masks can be assigned in bulk. Giving items of
+        an exact object errors creates its errors buffer, which views of
+        exact objects can not do as it would not be shared with the base
         """
         
-        if type(value_uncertainty) == ValueUncertainty:
+        if isinstance(value, ValueUncertainty):
 
-            values = np.arcsin(value_uncertainty.values)
+            values, errors = value.values, value._errors
+
+            if values.shape == (1,):
+                values, errors = values[0], None if errors is None else errors[0]
 
-            errors =  1 / np.sqrt(1 - (value_uncertainty.values**2)) * value_uncertainty.errors
-            
         else:
+            values, errors = value, None
 
-            values = np.arcsin(value_uncertainty)
+        self._settle_lazy()
 
-            errors = 0
+        if not self._values.flags.writeable:
+            raise ValueError("This ValueUncertainty is read only, e.g. a cached statistic, assign to a copy instead")
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('arcsin', value_uncertainty)
+        if errors is not None and self.is_exact:
 
-            ValueUncertainty._format_error_calcs('arcsin', errors[0], value_uncertainty)
-        
-        variable = ValueUncertainty._get_var()
+            if self._base is not None:
+                raise ValueError("Can not assign uncertain items to a view of an exact ValueUncertainty, assign them to the base object instead")
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+            self._errors = np.zeros(self.shape, dtype = np.result_type(self._values, 0.0))
 
+        self.values[i] = values
 
-    @staticmethod
-    def arccos(value_uncertainty):
+        if self._errors is not None:
+            self._errors[i] = 0 if errors is None else errors
+
+        self._invalidate_cache()
+
+
+    def _invalidate_cache(self):
         """
-        IN RADS
+        Drops the cached statistics, to be called by anything that
+        modifies the values or errors in place. Writing into the
+        arrays directly bypasses this. Tracked derivatives are dropped
+        too, so the object counts as a new independent input afterwards
         """
-        
-        if type(value_uncertainty) == ValueUncertainty:
 
-            values = np.arccos(value_uncertainty.values)
+        self._stats_cache = None
 
-            errors =  -1 / np.sqrt(1 - (value_uncertainty.values**2)) * value_uncertainty.errors
-            
-        else:
+        self._jacobian = None
 
-            values = np.arccos(value_uncertainty)
+        if self._base is not None:
+            self._base._invalidate_cache()
 
-            errors = 0
 
-        if ValueUncertainty._capture_calcs:
-            
-            ValueUncertainty._format_value_calcs('arccos', value_uncertainty)
+    def _writable_with(self, *operands):
+        """
+        True when the result of an operation on operands can be written
+        straight into this object's buffers: nothing is captured, tracked
+        or deferred, the result keeps this object's shape and float
+        dtypes, and no operand shares memory with the buffers. Views of
+        exact objects can not take errors, as a new errors buffer would
+        not be shared with the base
+        """
 
-            ValueUncertainty._format_error_calcs('arccos', errors[0], value_uncertainty)
-        
-        variable = ValueUncertainty._get_var()
+        if ValueUncertainty._lazy or ValueUncertainty._track_correlations or current_capture.get() is not None:
+            return False
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+        if self._expression is not None or not self._values.flags.writeable or not np.issubdtype(self._values.dtype, np.inexact):
+            return False
 
+        buffers = [self._values] if self._errors is None else [self._values, self._errors]
 
-    @staticmethod
-    def arctan(value_uncertainty):
+        if self._errors is not None and not (self._errors.flags.writeable and np.issubdtype(self._errors.dtype, np.inexact)):
+            return False
+
+        arrays = []
+
+        for operand in operands:
+
+            if isinstance(operand, ValueUncertainty):
+
+                arrays.append(operand.values)
+
+                if _error_buffer(operand) is not None:
+
+                    if self._errors is None and self._base is not None:
+                        return False
+
+                    arrays.append(operand._errors)
+
+            else:
+                arrays.append(operand)
+
+        if np.broadcast_shapes(self.shape, *[np.shape(array) for array in arrays]) != self.shape:
+            return False
+
+        if any(np.result_type(buffer, *arrays) != buffer.dtype for buffer in buffers):
+            return False
+
+        if any(isinstance(array, np.ndarray) and np.may_share_memory(array, buffer) for array in arrays for buffer in buffers):
+            return False
+
+        self._settle_lazy()
+
+        return True
+
+
+    def _settle_lazy(self):
         """
-        IN RADS
+        Evaluates this object if it is lazy, and every pending lazy result
+        that reads memory of its buffers, so writing into them can not
+        change results made before the write
         """
-        
-        if type(value_uncertainty) == ValueUncertainty:
 
-            values = np.arctan(value_uncertainty.values)
+        if self._expression is not None:
+            self.compute()
 
-            errors =  1 / (1 + (value_uncertainty.values**2)) * value_uncertainty.errors
-            
-        else:
+        if not _pending_lazy:
+            return
 
-            values = np.arctan(value_uncertainty)
+        buffers = [buffer for buffer in (self._values, self._errors) if buffer is not None]
 
-            errors = 0
+        for result in list(_pending_lazy):
 
-        if ValueUncertainty._capture_calcs:
+            if result._expression is not None and ReadsBuffers(result, buffers):
+                result.compute()
 
-            ValueUncertainty._format_value_calcs('arctan', value_uncertainty)
 
-            ValueUncertainty._format_error_calcs('arctan', errors[0], value_uncertainty)
-        
-        variable = ValueUncertainty._get_var()
+    def _written(self):
+        """
+        Marks the buffers as changed by an in place operation
+        """
 
-        return ValueUncertainty(values, errors, variable_name=variable)
+        self._variable_name = ''
 
+        self._invalidate_cache()
 
-    @staticmethod
-    def StartCalcCapture(precision = 4):
-        
-        ValueUncertainty._capture_calcs = True
+        return self
 
-        ValueUncertainty._last_var = '@0#'
 
-        ValueUncertainty._error_operations = []
+    def __str__(self) -> str:
+
+        return ValueUncertainty._format_nested(self.values, self.errors)
 
-        ValueUncertainty._values_dict = {}
 
-        ValueUncertainty._precision = precision
-    
     @staticmethod
-    def EndCalcCapture():
+    def _format_nested(values, errors, depth = 1):
+
+        if values.ndim == 1:
+
+            s = [f'{round(value,2)} ± {round(error,2)}' for value, error in zip(values.tolist(), errors.tolist())]
 
-        current_var = ValueUncertainty._last_var
+            return f'[{", ".join(s)}]'
 
-        next_var = f"@{int(current_var[1:-1]) + 1}#"
+        rows = [ValueUncertainty._format_nested(row_values, row_errors, depth + 1) for row_values, row_errors in zip(values, errors)]
 
-        next_result = str(eval(ValueUncertainty._values_dict[current_var][1]))
+        return '[' + (',\n' + ' ' * depth).join(rows) + ']'
+    
+
+    def __add__(self, addend):
 
-        value_dict = ValueUncertainty._values_dict
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('+', self, addend)
 
-        value_dict[next_var] = (current_var, next_result)
+        if isinstance(addend, ValueUncertainty):
+            values = self.values + addend.values
 
-        final_var = f"@{int(current_var[1:-1]) + 2}#"
+        else:
+            values = self.values + addend
 
-        value_dict[final_var] = (next_var, '')        
+        errors = _added_errors(_error_buffer(self), _error_buffer(addend), values.shape)
         
-        latex_list = LatexCreator(value_dict[final_var][0], value_dict)
+        variable = ValueUncertainty._record('+', values, errors, self, addend)
 
-        latex_list.reverse()
+        result = ValueUncertainty._from_buffers(values, errors, variable)
 
-        ValueUncertainty._capture_calcs = False
+        if ValueUncertainty._track_correlations:
 
-        return latex_list, ValueUncertainty._error_operations
+            result._track((self, 1), (addend, 1))
 
+        return result
 
-    @staticmethod
-    def _format_value_calcs(operation, *items):
+
+
+    def __mul__(self, factor):
+
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('*', self, factor)
+
+        self_errors, factor_errors = _error_buffer(self), _error_buffer(factor)
+
+        factor_values = factor.values if isinstance(factor, ValueUncertainty) else factor
+
+        values = self.values * factor_values
+
+        # sqrt((b da)^2 + (a db)^2) rather than |ab| sqrt((da/a)^2 + (db/b)^2)
+        # so zero values give no NaNs
+        errors = _quadrature(None if self_errors is None else self_errors * factor_values,
+                             None if factor_errors is None else self.values * factor_errors, values.shape)
+
+        variable = ValueUncertainty._record('*', values, errors, self, factor)
         
-        ValueUncertainty._update_last_var()
+        result = ValueUncertainty._from_buffers(values, errors, variable)
 
-        items_func = lambda ele: (ele._variable_name, ele.values[0]) if type(ele) == ValueUncertainty else (str(ele), ele)
+        if ValueUncertainty._track_correlations:
 
-        variable_values = tuple(map(items_func, items))
+            result._track((self, factor_values), (factor, self.values))
 
-        variable_str, numeric_str = CreateValueLatexSting(operation, *variable_values)
+        return result
 
-        ValueUncertainty._values_dict[ValueUncertainty._last_var] = (variable_str, numeric_str)
 
+    def __truediv__(self, divisor):
+        
 
-    @staticmethod
-    def _format_error_calcs(operation, error_result, *items):
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('/', self, divisor)
 
-        items_func = lambda ele: (ele.values[0], ele.errors[0]) if type(ele) == ValueUncertainty else (ele, 0)
+        self_errors, divisor_errors = _error_buffer(self), _error_buffer(divisor)
 
-        value_errors = tuple(map(items_func, items))
+        divisor_values = divisor.values if isinstance(divisor, ValueUncertainty) else divisor
 
-        ValueUncertainty._error_operations.append(CreateErrorLatexString(operation, error_result, *value_errors))
+        values = self.values / divisor_values
 
+        errors = _quadrature(None if self_errors is None else self_errors / divisor_values,
+                             None if divisor_errors is None else values * divisor_errors / divisor_values, values.shape)
 
-    @staticmethod
-    def _update_last_var():
-        ValueUncertainty._last_var = f"@{int(ValueUncertainty._last_var[1:-1]) + 1}#"
+        variable = ValueUncertainty._record('/', values, errors, self, divisor)
 
+        result = ValueUncertainty._from_buffers(values, errors, variable)
 
-    @staticmethod
-    def _get_var():
+        if ValueUncertainty._track_correlations:
 
-        if ValueUncertainty._capture_calcs:
-            variable = ValueUncertainty._last_var
+            result._track((self, 1 / divisor_values), (divisor, -values / divisor_values))
 
-        else:
-            variable = ''
+        return result
+
+
+    def __rtruediv__(self, quotient):
+
+
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('/', quotient, self)
+
+        self_errors, quotient_errors = _error_buffer(self), _error_buffer(quotient)
+
+        values = (quotient.values if isinstance(quotient, ValueUncertainty) else quotient) / self.values
+
+        errors = _quadrature(None if quotient_errors is None else quotient_errors / self.values,
+                             None if self_errors is None else values * self_errors / self.values, values.shape)
+
+        variable = ValueUncertainty._record('/', values, errors, quotient, self)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations:
+
+            result._track((quotient, 1 / self.values), (self, -values / self.values))
+
+        return result
+    
+
+    def __pow__(self, power): 
+
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('l**', self, power)
+
+        values = self.values ** power
+        
+        errors = None if self.is_exact else power * values * self._errors / self.values
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('l**', values, errors, self, power)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations:
+
+            result._track((self, power * self.values ** (power - 1)))
+
+        return result
+
+
+    def __rpow__(self, base):
+
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('r**', base, self)
+
+        values = base ** self.values
+
+        errors = None if self.is_exact else values * np.log(base) * self._errors
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('r**', values, errors, base, self)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations:
+
+            result._track((self, values * np.log(base)))
+
+        return result
+
+
+    def __radd__(self, addend):
+        return self + addend
+
+
+    def __sub__(self, term):
+
+
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('-', self, term)
+
+        if isinstance(term, ValueUncertainty):
+            values = self.values - term.values
+
+        else:
+            values = self.values - term
+
+        errors = _added_errors(_error_buffer(self), _error_buffer(term), values.shape)
+
+        variable = ValueUncertainty._record('-', values, errors, self, term)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations:
+
+            result._track((self, 1), (term, -1))
+
+        return result
+
+
+    def __rsub__(self, term):
+
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('-', term, self)
+
+        if isinstance(term, ValueUncertainty):
+            values = term.values - self.values
+
+        else:
+            values = term - self.values
+
+        errors = _added_errors(_error_buffer(term), _error_buffer(self), values.shape)
+
+        variable = ValueUncertainty._record('-', values, errors, term, self)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations:
+
+            result._track((term, 1), (self, -1))
+
+        return result
+
+
+    def __rmul__(self, factor):
+        return self * factor
+    
+
+    def __neg__(self):
+        return self * -1
+
+
+    def __abs__(self):
+
+        if ValueUncertainty._lazy and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('abs', self)
+
+        values = np.abs(self.values)
+
+        errors = None if self.is_exact else self._errors.copy()
+
+        variable = ValueUncertainty._record('abs', values, errors, self)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations:
+            result._track((self, np.sign(self.values)))
+
+        return result
+
+
+    # The in place operators write into the existing buffers when
+    # _writable_with allows it, otherwise NotImplemented makes python
+    # fall back to the normal operator so capturing, tracking and lazy
+    # evaluation behave exactly as with a = a + b. An exact object gets
+    # its errors buffer the first time an uncertain operand reaches it
+
+    def __iadd__(self, addend):
+
+        if not self._writable_with(addend):
+            return NotImplemented
+
+        if isinstance(addend, ValueUncertainty):
+
+            np.add(self._values, addend.values, out = self._values)
+
+            self._add_errors_in_place(addend._errors)
+
+        else:
+            np.add(self._values, addend, out = self._values)
+
+        return self._written()
+
+
+    def __isub__(self, term):
+
+        if not self._writable_with(term):
+            return NotImplemented
+
+        if isinstance(term, ValueUncertainty):
+
+            np.subtract(self._values, term.values, out = self._values)
+
+            self._add_errors_in_place(term._errors)
+
+        else:
+            np.subtract(self._values, term, out = self._values)
+
+        return self._written()
+
+
+    def _add_errors_in_place(self, errors):
+
+        if errors is None:
+            return
+
+        if self._errors is None:
+            self._errors = np.broadcast_to(errors, self.shape).astype(np.result_type(self._values, 0.0))
+
+        else:
+            np.hypot(self._errors, errors, out = self._errors)
+
+
+    def __imul__(self, factor):
+
+        if not self._writable_with(factor):
+            return NotImplemented
+
+        factor_values, factor_errors = (factor.values, factor._errors) if isinstance(factor, ValueUncertainty) else (factor, None)
+
+        if factor_errors is not None and self._errors is None:
+
+            self._errors = np.multiply(self._values, factor_errors, dtype = np.result_type(self._values, 0.0))
+
+        elif factor_errors is not None:
+
+            scratch = _scratch_buffer(self.shape, self._errors.dtype)
+
+            np.multiply(self._values, factor_errors, out = scratch)
+
+            np.multiply(self._errors, factor_values, out = self._errors)
+
+            np.hypot(self._errors, scratch, out = self._errors)
+
+        elif self._errors is not None:
+            np.multiply(self._errors, factor_values, out = self._errors)
+
+        np.multiply(self._values, factor_values, out = self._values)
+
+        if self._errors is not None:
+            np.abs(self._errors, out = self._errors)
+
+        return self._written()
+
+
+    def __itruediv__(self, divisor):
+
+        if not self._writable_with(divisor):
+            return NotImplemented
+
+        divisor_values, divisor_errors = (divisor.values, divisor._errors) if isinstance(divisor, ValueUncertainty) else (divisor, None)
+
+        np.divide(self._values, divisor_values, out = self._values)
+
+        if divisor_errors is not None and self._errors is None:
+
+            self._errors = np.multiply(self._values, divisor_errors, dtype = np.result_type(self._values, 0.0))
+
+        elif divisor_errors is not None:
+
+            scratch = _scratch_buffer(self.shape, self._errors.dtype)
+
+            np.multiply(self._values, divisor_errors, out = scratch)
+
+            np.hypot(self._errors, scratch, out = self._errors)
+
+        if self._errors is not None:
+
+            np.divide(self._errors, divisor_values, out = self._errors)
+
+            np.abs(self._errors, out = self._errors)
+
+        return self._written()
+
+
+    def __ipow__(self, power):
+
+        if isinstance(power, ValueUncertainty) or not self._writable_with(power):
+            return NotImplemented
+
+        if self._errors is None:
+
+            np.power(self._values, power, out = self._values)
+
+            return self._written()
+
+        np.divide(self._errors, self._values, out = self._errors)
+
+        np.power(self._values, power, out = self._values)
+
+        np.multiply(self._errors, self._values, out = self._errors)
+
+        np.multiply(self._errors, power, out = self._errors)
+
+        np.abs(self._errors, out = self._errors)
+
+        return self._written()
+
+
+    @staticmethod
+    def _apply_out(operation, value_uncertainty, out):
+        """
+        Writes the math function operation of value_uncertainty into the
+        buffers of out and returns out. Without a scratch buffer when out
+        can take the result directly (out may be value_uncertainty itself),
+        otherwise by copying the normal result into out
+        """
+
+        function, slope = SLOPES[operation]
+
+        is_uncertain = isinstance(value_uncertainty, ValueUncertainty) and not value_uncertainty.is_exact
+
+        values = value_uncertainty.values if isinstance(value_uncertainty, ValueUncertainty) else value_uncertainty
+
+        if out._writable_with() and np.broadcast_shapes(out.shape, np.shape(values)) == out.shape \
+           and np.result_type(out._values, values) == out._values.dtype \
+           and (out._errors is not None or out._base is None or not is_uncertain) \
+           and (out._errors is None or not np.may_share_memory(values, out._errors)):
+
+            if is_uncertain:
+
+                if out._errors is None:
+                    out._errors = np.empty(out.shape, dtype = np.result_type(out._values, 0.0))
+
+                scratch = _scratch_buffer(out.shape, out._errors.dtype)
+
+                slope(values, out = scratch)
+
+                np.multiply(scratch, value_uncertainty._errors, out = out._errors)
+
+                np.abs(out._errors, out = out._errors)
+
+            elif out._errors is not None:
+                out._errors.fill(0)
+
+            function(values, out = out._values)
+
+            return out._written()
+
+        result = getattr(ValueUncertainty, {'e': 'exp'}.get(operation, operation))(value_uncertainty)
+
+        if not isinstance(result, ValueUncertainty):
+            result = ValueUncertainty(result)
+
+        out[...] = result
+
+        out._variable_name, out._jacobian = result._variable_name, result._jacobian
+
+        return out
+
+
+    @staticmethod
+    def sqrt(rooted, out = None):
+
+        ## Format string for sqrt
+
+        if out is not None:
+            return ValueUncertainty._apply_out('sqrt', rooted, out)
+
+        return rooted ** (1/2)
+    
+
+    @staticmethod
+    def sum(iterable, axis = None):
+        """
+        Sums the values and adds the errors in quadrature over the
+        whole array at once. Plain iterables of ValueUncertainty
+        objects fall back to adding the items one by one
+        """
+        
+        ## Format string for the sum method
+
+        if not isinstance(iterable, ValueUncertainty):
+
+            result = 0
+
+            for item in iterable:
+                result += item
+            
+            return result
+
+        values = np.atleast_1d(iterable.values.sum(axis = axis))
+
+        errors = None if iterable.is_exact else np.atleast_1d(np.sqrt(np.square(iterable._errors).sum(axis = axis)))
+
+        result = ValueUncertainty._from_buffers(values, errors, ValueUncertainty._record_reduction(values, errors, iterable, axis))
+
+        if ValueUncertainty._track_correlations:
+            result._track_reduction(iterable, axis)
+
+        return result
+
+
+    @staticmethod
+    def average(value_uncertainty, axis = None):
+        """
+        Unweighted mean along axis, the error is the quadrature
+        sum of the errors divided by the number of items
+        """
+
+        count = _axis_count(value_uncertainty.shape, axis)
+
+        values = np.atleast_1d(value_uncertainty.values.sum(axis = axis)) / count
+
+        errors = None if value_uncertainty.is_exact else np.atleast_1d(np.sqrt(np.square(value_uncertainty._errors).sum(axis = axis))) / count
+
+        result = ValueUncertainty._from_buffers(values, errors, ValueUncertainty._record_reduction(values, errors, value_uncertainty, axis, count))
+
+        if ValueUncertainty._track_correlations:
+            result._track_reduction(value_uncertainty, axis, 1 / count)
+
+        return result
+
+
+    @staticmethod
+    def variance(value_uncertainty, axis = None, ddof = 0):
+        """
+        Mean squared deviation from the mean along axis with ddof
+        delta degrees of freedom. Errors are propagated through the
+        deviations and their squares as (x - mean)**2 would
+        """
+
+        values = value_uncertainty.values
+
+        count = _axis_count(values.shape, axis)
+
+        mean_values = values.mean(axis = axis, keepdims = True)
+
+        deviations = values - mean_values
+
+        errors = None
+
+        if not value_uncertainty.is_exact:
+
+            mean_errors = np.sqrt(np.square(value_uncertainty._errors).sum(axis = axis, keepdims = True)) / count
+
+            deviation_errors = np.sqrt(np.square(value_uncertainty._errors) + np.square(mean_errors))
+
+            square_errors = 2 * np.abs(deviations) * deviation_errors
+
+            errors = np.atleast_1d(np.sqrt(np.square(square_errors).sum(axis = axis))) / (count - ddof)
+
+        weights = 2 * deviations / (count - ddof) if ValueUncertainty._track_correlations else None
+
+        np.square(deviations, out = deviations)
+
+        values = np.atleast_1d(deviations.sum(axis = axis)) / (count - ddof)
+
+        # The deviations are not recorded, a captured variance is only
+        # named by its value
+        result = ValueUncertainty._from_buffers(values, errors, '' if current_capture.get() is None else _Untracked(str(values.flat[0])))
+
+        if ValueUncertainty._track_correlations:
+            result._track_reduction(value_uncertainty, axis, weights)
+
+        return result
+
+
+    @staticmethod
+    def sin(value_uncertainty, out = None):
+        """
+        IN RADS
+        """
         
-        return variable
+        if out is not None:
+            return ValueUncertainty._apply_out('sin', value_uncertainty, out)
+
+        if type(value_uncertainty) is ScalarUncertainty and not ValueUncertainty._track_correlations:
+            return value_uncertainty._unary('sin')
+
+        if ValueUncertainty._lazy and isinstance(value_uncertainty, ValueUncertainty) and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('sin', value_uncertainty)
+
+        if isinstance(value_uncertainty, ValueUncertainty):
+
+            values = np.sin(value_uncertainty.values)
+
+            errors = None if value_uncertainty.is_exact else np.cos(value_uncertainty.values) * value_uncertainty.errors
+
+        else:
+
+            values = np.sin(np.atleast_1d(value_uncertainty))
+
+            errors = None
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('sin', values, errors, value_uncertainty)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations and isinstance(value_uncertainty, ValueUncertainty):
+            result._track((value_uncertainty, np.cos(value_uncertainty.values)))
+
+        return result
+
+    @staticmethod
+    def cos(value_uncertainty, out = None):
+        """
+        IN RADS
+        """
+        
+        if out is not None:
+            return ValueUncertainty._apply_out('cos', value_uncertainty, out)
+
+        if type(value_uncertainty) is ScalarUncertainty and not ValueUncertainty._track_correlations:
+            return value_uncertainty._unary('cos')
+
+        if ValueUncertainty._lazy and isinstance(value_uncertainty, ValueUncertainty) and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('cos', value_uncertainty)
+
+        if isinstance(value_uncertainty, ValueUncertainty):
+
+            values = np.cos(value_uncertainty.values)
+
+            errors = None if value_uncertainty.is_exact else np.sin(value_uncertainty.values) * value_uncertainty.errors
+
+        else:
+
+            values = np.cos(np.atleast_1d(value_uncertainty))
+
+            errors = None
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('cos', values, errors, value_uncertainty)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations and isinstance(value_uncertainty, ValueUncertainty):
+            result._track((value_uncertainty, -np.sin(value_uncertainty.values)))
+
+        return result
+
+
+    @staticmethod
+    def tan(value_uncertainty, out = None):
+        """
+        IN RADS
+        """
+        
+        if out is not None:
+            return ValueUncertainty._apply_out('tan', value_uncertainty, out)
+
+        if type(value_uncertainty) is ScalarUncertainty and not ValueUncertainty._track_correlations:
+            return value_uncertainty._unary('tan')
+
+        if ValueUncertainty._lazy and isinstance(value_uncertainty, ValueUncertainty) and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('tan', value_uncertainty)
+
+        if isinstance(value_uncertainty, ValueUncertainty):
+
+            values = np.tan(value_uncertainty.values)
+
+            errors = None if value_uncertainty.is_exact else value_uncertainty.errors / ((np.cos(value_uncertainty.values)) ** 2)
+            
+        else:
+
+            values = np.tan(np.atleast_1d(value_uncertainty))
+
+            errors = None
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('tan', values, errors, value_uncertainty)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations and isinstance(value_uncertainty, ValueUncertainty):
+            result._track((value_uncertainty, 1 / np.cos(value_uncertainty.values) ** 2))
+
+        return result
+
+
+    @staticmethod
+    def arcsin(value_uncertainty, out = None):
+        """
+        IN RADS
+        """
+        
+        if out is not None:
+            return ValueUncertainty._apply_out('arcsin', value_uncertainty, out)
+
+        if type(value_uncertainty) is ScalarUncertainty and not ValueUncertainty._track_correlations:
+            return value_uncertainty._unary('arcsin')
+
+        if ValueUncertainty._lazy and isinstance(value_uncertainty, ValueUncertainty) and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('arcsin', value_uncertainty)
+
+        if isinstance(value_uncertainty, ValueUncertainty):
+
+            values = np.arcsin(value_uncertainty.values)
+
+            errors = None if value_uncertainty.is_exact else 1 / np.sqrt(1 - (value_uncertainty.values**2)) * value_uncertainty.errors
+            
+        else:
+
+            values = np.arcsin(np.atleast_1d(value_uncertainty))
+
+            errors = None
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('arcsin', values, errors, value_uncertainty)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations and isinstance(value_uncertainty, ValueUncertainty):
+            result._track((value_uncertainty, 1 / np.sqrt(1 - value_uncertainty.values**2)))
+
+        return result
+
+
+    @staticmethod
+    def arccos(value_uncertainty, out = None):
+        """
+        IN RADS
+        """
+        
+        if out is not None:
+            return ValueUncertainty._apply_out('arccos', value_uncertainty, out)
+
+        if type(value_uncertainty) is ScalarUncertainty and not ValueUncertainty._track_correlations:
+            return value_uncertainty._unary('arccos')
+
+        if ValueUncertainty._lazy and isinstance(value_uncertainty, ValueUncertainty) and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('arccos', value_uncertainty)
+
+        if isinstance(value_uncertainty, ValueUncertainty):
+
+            values = np.arccos(value_uncertainty.values)
+
+            errors = None if value_uncertainty.is_exact else -1 / np.sqrt(1 - (value_uncertainty.values**2)) * value_uncertainty.errors
+            
+        else:
+
+            values = np.arccos(np.atleast_1d(value_uncertainty))
+
+            errors = None
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('arccos', values, errors, value_uncertainty)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations and isinstance(value_uncertainty, ValueUncertainty):
+            result._track((value_uncertainty, -1 / np.sqrt(1 - value_uncertainty.values**2)))
+
+        return result
+
+
+    @staticmethod
+    def arctan(value_uncertainty, out = None):
+        """
+        IN RADS
+        """
+        
+        if out is not None:
+            return ValueUncertainty._apply_out('arctan', value_uncertainty, out)
+
+        if type(value_uncertainty) is ScalarUncertainty and not ValueUncertainty._track_correlations:
+            return value_uncertainty._unary('arctan')
+
+        if ValueUncertainty._lazy and isinstance(value_uncertainty, ValueUncertainty) and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('arctan', value_uncertainty)
+
+        if isinstance(value_uncertainty, ValueUncertainty):
+
+            values = np.arctan(value_uncertainty.values)
+
+            errors = None if value_uncertainty.is_exact else 1 / (1 + (value_uncertainty.values**2)) * value_uncertainty.errors
+            
+        else:
+
+            values = np.arctan(np.atleast_1d(value_uncertainty))
+
+            errors = None
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('arctan', values, errors, value_uncertainty)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations and isinstance(value_uncertainty, ValueUncertainty):
+            result._track((value_uncertainty, 1 / (1 + value_uncertainty.values**2)))
+
+        return result
+
+
+    @staticmethod
+    def exp(value_uncertainty, out = None):
+        
+        if out is not None:
+            return ValueUncertainty._apply_out('e', value_uncertainty, out)
+
+        if type(value_uncertainty) is ScalarUncertainty and not ValueUncertainty._track_correlations:
+            return value_uncertainty._unary('e')
+
+        if ValueUncertainty._lazy and isinstance(value_uncertainty, ValueUncertainty) and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('e', value_uncertainty)
+
+        if isinstance(value_uncertainty, ValueUncertainty):
+
+            values = np.exp(value_uncertainty.values)
+
+            errors = None if value_uncertainty.is_exact else values * value_uncertainty.errors
+            
+        else:
+
+            values = np.exp(np.atleast_1d(value_uncertainty))
+
+            errors = None
+
+        variable = ValueUncertainty._record('e', values, errors, value_uncertainty)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations and isinstance(value_uncertainty, ValueUncertainty):
+            result._track((value_uncertainty, values))
+
+        return result
+
+
+    @staticmethod
+    def log(value_uncertainty, out = None):
+        """
+        Natural log
+        """
+        
+        if out is not None:
+            return ValueUncertainty._apply_out('log', value_uncertainty, out)
+
+        if type(value_uncertainty) is ScalarUncertainty and not ValueUncertainty._track_correlations:
+            return value_uncertainty._unary('log')
+
+        if ValueUncertainty._lazy and isinstance(value_uncertainty, ValueUncertainty) and ValueUncertainty._can_defer():
+            return ValueUncertainty._defer('log', value_uncertainty)
+
+        if isinstance(value_uncertainty, ValueUncertainty):
+
+            values = np.log(value_uncertainty.values)
+
+            errors = None if value_uncertainty.is_exact else value_uncertainty.errors / value_uncertainty.values
+            
+        else:
+
+            values = np.log(np.atleast_1d(value_uncertainty))
+
+            errors = None
+
+        if errors is not None:
+            np.abs(errors, out = errors)
+
+        variable = ValueUncertainty._record('log', values, errors, value_uncertainty)
+
+        result = ValueUncertainty._from_buffers(values, errors, variable)
+
+        if ValueUncertainty._track_correlations and isinstance(value_uncertainty, ValueUncertainty):
+            result._track((value_uncertainty, 1 / value_uncertainty.values))
+
+        return result
+
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        Lets numpy ufuncs such as np.sin(vu) or ndarray + vu dispatch to
+        the matching ValueUncertainty operation so errors are propagated
+        """
+
+        if 'out' in kwargs:
+            return NotImplemented
+
+        if method == 'reduce' and ufunc is np.add and isinstance(inputs[0], ValueUncertainty):
+            return ValueUncertainty.sum(inputs[0], axis = kwargs.get('axis', 0))
+
+        if method != '__call__' or kwargs or ufunc.__name__ not in _UFUNC_OPERATIONS:
+            return NotImplemented
+
+        operation = _UFUNC_OPERATIONS[ufunc.__name__]
+
+        if len(inputs) == 1:
+            return operation(inputs[0])
+
+        left, right = inputs
+
+        if isinstance(left, ValueUncertainty):
+            return getattr(left, operation[0])(right)
+
+        return getattr(right, operation[1])(left)
+    
+
+    def __array_function__(self, func, types, args, kwargs):
+        """
+        Routes the numpy functions registered with _implements, e.g.
+        np.sum, np.mean or np.concatenate, to their ValueUncertainty
+        versions
+        """
+
+        if func not in _ARRAY_FUNCTIONS:
+            return NotImplemented
+
+        if not all(issubclass(t, (ValueUncertainty, np.ndarray)) for t in types):
+            return NotImplemented
+
+        return _ARRAY_FUNCTIONS[func](*args, **kwargs)
+
+
+    @staticmethod
+    def StartCorrelationTracking():
+        """
+        Until EndCorrelationTracking every result carries the sparse
+        derivatives of its items with respect to the independent inputs,
+        so shared inputs are accounted for, e.g. x - x has no error.
+        Objects first used in a tracked operation become the independent
+        inputs
+        """
+
+        ResetInputs()
+
+        ValueUncertainty._track_correlations = True
+
+
+    @staticmethod
+    def EndCorrelationTracking():
+
+        ValueUncertainty._track_correlations = False
+
+
+    @staticmethod
+    def covariance(value_uncertainty_a, value_uncertainty_b):
+        """
+        Covariance matrix between the flattened items of two values
+        computed while tracking correlations
+        """
+
+        return Covariance(value_uncertainty_a._input_jacobian(), value_uncertainty_b._input_jacobian())
+
+
+    def _input_jacobian(self):
+        """
+        The tracked derivatives, registering this object as new
+        independent inputs if it has none from the current tracking
+        """
+
+        if self._jacobian is None or not self._jacobian.is_current:
+            self._jacobian = RegisterInputs(self.errors)
+
+        return self._jacobian
+
+
+    def _track(self, *terms):
+        """
+        Chains the derivatives of an elementwise result, terms are
+        (operand, partial derivative) pairs where plain number operands
+        are skipped. The errors are replaced by the correlated ones
+        """
+
+        terms = [(item._input_jacobian(), item.shape, partial) for item, partial in terms if isinstance(item, ValueUncertainty)]
+
+        self._jacobian = CombineJacobians(self.shape, *terms)
+
+        self._update_tracked_errors()
+
+
+    def _track_reduction(self, source, axis, weights = None):
+
+        self._jacobian = source._input_jacobian().reduced(source.shape, axis, weights)
+
+        self._update_tracked_errors()
+
+
+    def _update_tracked_errors(self):
+
+        self._errors = self._jacobian.errors().reshape(self.shape).astype(self.errors.dtype, copy = False)
+
+
+    @staticmethod
+    def StartLazyEvaluation(block_size = None):
+        """
+        Until EndLazyEvaluation the operators and math functions return
+        lazy results holding the expression instead of arrays. Accessing
+        values or errors, or calling compute, evaluates the whole
+        expression at once in blocks of block_size items (see
+        Lazy.BLOCK_SIZE) so only cache sized temporaries are made.
+        Calculations are never deferred while capturing or tracking
+        correlations
+        """
+
+        ValueUncertainty._lazy = True
+
+        ValueUncertainty._block_size = block_size
+
+
+    @staticmethod
+    def EndLazyEvaluation():
+        """
+        Stops deferring new operations, lazy results made before are
+        still evaluated when used
+        """
+
+        ValueUncertainty._lazy = False
+
+
+    def compute(self):
+        """
+        Evaluates a lazy result in place and returns it, does nothing
+        for results that already hold their arrays. Lazy intermediates
+        used by it stay lazy
+        """
+
+        if self._expression is not None:
+
+            self._values, self._errors = EvaluateExpression(self, self._block_size or BLOCK_SIZE)
+
+            self._expression = None
+
+            _pending_lazy.discard(self)
+
+        return self
+
+
+    @staticmethod
+    def _can_defer():
+        return current_capture.get() is None and not ValueUncertainty._track_correlations
+
+
+    @staticmethod
+    def _defer(operation, *operands):
+
+        result = ValueUncertainty._from_buffers(None, None)
+
+        result._expression = (operation, operands)
+
+        _pending_lazy.add(result)
+
+        return result
+
+
+    @staticmethod
+    def StartCalcCapture(precision = 4):
+        """
+        Starts capturing the calculations of the current thread or
+        asyncio task, other threads and tasks are unaffected. A capture
+        already active in them is dropped, so starting again restarts
+        the capture
+        """
+
+        active = current_capture.get()
+
+        if active is not None:
+            active._reset()
+        
+        return CaptureSession(precision).start()
+    
+
+    @staticmethod
+    def EndCalcCapture():
+
+        capture = current_capture.get()
+
+        if capture is None:
+            raise RuntimeError("EndCalcCapture called without an active capture")
+
+        return capture.end()
+
+
+    @staticmethod
+    def CalcCapture(precision = 4):
+        """
+        Capture session to use as a context manager, e.g.
+        with ValueUncertainty.CalcCapture() as capture: ...
+        after which capture.latex_list and capture.error_operations
+        hold the results
+        """
+
+        return CaptureSession(precision)
+
+
+    @staticmethod
+    def _record_reduction(values, errors, source, axis, count = None):
+        """
+        Records a sum of every item of source on the tape of the active
+        capture as the additions of its items one by one, followed by
+        the division by count for a mean, and returns the variable naming
+        the result. The items are named x_{i} after a named source, by
+        their values otherwise. The tape holds single numbers, reductions
+        along an axis of N-D data are only named by their value
+        """
+
+        capture = current_capture.get()
+
+        if capture is None:
+            return ''
+
+        if axis is not None and source.ndim > 1:
+            return _Untracked(str(values.flat[0]))
+
+        items, item_errors = source.values.ravel(), source.errors.ravel()
+
+        name = source._variable_name
+
+        if not name or isinstance(name, (_Reference, _Untracked)) or name == str(items[0]):
+            names = [_Untracked(str(item)) for item in items.tolist()]
+
+        else:
+            names = [_Untracked(f"{name}_{{{i}}}") for i in range(len(items))]
+
+        totals, total_errors = np.cumsum(items), np.sqrt(np.cumsum(np.square(item_errors)))
+
+        # The last sum is the vectorised one, which may round differently
+        if count is None:
+            totals[-1], total_errors[-1] = values.flat[0], 0.0 if errors is None else errors.flat[0]
+
+        variable = (names[0], items[0], item_errors[0])
+
+        for i in range(1, len(items)):
+            variable = (capture.record('+', totals[i], total_errors[i], variable, (names[i], items[i], item_errors[i])), totals[i], total_errors[i])
+
+        if count is None:
+            return variable[0]
+
+        return capture.record('/', values.flat[0], 0.0 if errors is None else errors.flat[0], variable, (str(count), count, 0))
+
+
+    @staticmethod
+    def _record(operation, values, errors, *items):
+        """
+        Appends the operation to the tape of the active capture and returns
+        the variable naming its result, or '' when nothing is captured.
+        Unnamed operands are results of operations that were not recorded
+        and are named untracked by their value
+        """
+
+        capture = current_capture.get()
+
+        if capture is None:
+            return ''
+
+        items_func = lambda ele: (ele._variable_name or _Untracked(str(ele.values.flat[0])), ele.values.flat[0], ele.errors.flat[0]) if isinstance(ele, ValueUncertainty) else (str(ele), ele, 0)
+
+        return capture.record(operation, values.flat[0], 0.0 if errors is None else errors.flat[0], *map(items_func, items))
+
+
+
+
+class ScalarUncertainty(ValueUncertainty):
+    """
+    A single value ± error kept as plain python numbers, made by
+    ValueUncertainty(number, error) and by integer indexing. It has the
+    API of ValueUncertainty, values and errors being length 1 arrays,
+    but arithmetic and math functions between scalars and numbers work
+    on the numbers directly and are captured the same way. In place
+    operators return new objects
+
+    The item is changed by assigning s[0] (or s[...]), or values or
+    errors. The arrays values and errors return are read only copies,
+    so s.values[0] = 1 and s.errors *= 2 raise instead of being lost.
+    Code writing into those buffers needs the array type, made from a
+    list or with a dtype, e.g. ValueUncertainty([3.0], [0.1])
+    """
+
+    __slots__ = ('value', 'error')
+
+    # Scalars are never views nor lazy, so these stay class level
+    _base = None
+
+    _expression = None
+
+
+    def __init__(self, values, errors = None, variable_name = '', copy = False, dtype = None):
+
+        self.value = values.item() if isinstance(values, np.generic) else values
+
+        self.error = 0.0 if errors is None else abs(errors.item() if isinstance(errors, np.generic) else errors)
+
+        self._stats_cache = self._jacobian = None
+
+        self._variable_name = variable_name or str(values)
+
+
+    @staticmethod
+    def _from_numbers(value, error, variable_name = ''):
+
+        result = _new_object(ScalarUncertainty)
+
+        result.value = value
+
+        result.error = error
+
+        result._stats_cache = result._jacobian = None
+
+        result._variable_name = variable_name
+
+        return result
+
+
+    def __reduce__(self):
+        return ScalarUncertainty._from_numbers, (self.value, self.error, self._variable_name)
+
+
+    # values and errors are made on every access, they are read only so
+    # writes into them fail instead of being lost
+
+    @property
+    def _values(self):
+        return _read_only([self.value])
+
+
+    @_values.setter
+    def _values(self, values):
+        self.value = _single_item(values).item()
+
+
+    @property
+    def _errors(self):
+        return None if self.error == 0 else _read_only([self.error])
+
+
+    @_errors.setter
+    def _errors(self, errors):
+        self.error = 0.0 if errors is None else abs(_single_item(errors).item())
+
+
+    @property
+    def is_exact(self):
+        return self.error == 0
+
+
+    @property
+    def shape(self):
+        return (1,)
+
+
+    @property
+    def ndim(self):
+        return 1
+
+
+    @property
+    def size(self):
+        return 1
+
+
+    def __len__(self):
+        return 1
+
+
+    def __setitem__(self, i, value):
+        """
+        Assigns the single item (index 0, -1, ... or a slice of it) from
+        a ValueUncertainty or a number taken as exact
+        """
+
+        # Indexes a 1 item array would refuse are refused the same way
+        if np.empty(1)[i].size == 0:
+            return
+
+        if isinstance(value, ValueUncertainty):
+            values, errors = value.values, value.errors
+
+        else:
+            values, errors = value, 0.0
+
+        self.value = _single_item(values).item()
+
+        self.error = abs(_single_item(errors).item())
+
+        self._invalidate_cache()
+
+
+    def _writable_with(self, *operands):
+        return False
+
+
+    def _as_array(self):
+        """
+        The equivalent ValueUncertainty of length 1, used where the
+        numbers alone can not give numpy's result (e.g. inf on division
+        by zero)
+        """
+
+        return ValueUncertainty._from_buffers(self._values, self._errors, self._variable_name)
+
+
+    def _array_result(self, result):
+
+        if not isinstance(result, ValueUncertainty) or result.size != 1 or result._jacobian is not None:
+            return result
+
+        return ScalarUncertainty._from_numbers(result.values.item(), 0.0 if result.is_exact else result.errors.item(), result._variable_name)
+
+
+    # The operators below repeat the operand checks and the creation of
+    # the result inline, as calls cost as much as the arithmetic itself
+    # here. Anything else than scalars and numbers, and everything while
+    # tracking correlations, goes through the array operations
+
+    def __add__(self, addend):
+
+        if type(addend) is ScalarUncertainty:
+            b, b_error = addend.value, addend.error
+
+        elif isinstance(addend, _NUMBER_TYPES):
+            b, b_error = addend, 0.0
+
+        else:
+            return ValueUncertainty.__add__(self, addend)
+
+        if ValueUncertainty._track_correlations:
+            return ValueUncertainty.__add__(self, addend)
+
+        a_error = self.error
+
+        value = self.value + b
+
+        error = math.sqrt(a_error * a_error + b_error * b_error) if a_error and b_error else a_error or b_error
+
+        if current_capture.get() is not None:
+            return _scalar_result('+', value, error, self, addend)
+
+        result = _new_object(ScalarUncertainty)
+
+        result.value, result.error, result._variable_name = value, error, ''
+
+        result._stats_cache = result._jacobian = None
+
+        return result
+
+
+    # Addition and multiplication commute, and the base class records a
+    # reflected operation in the same order
+    __radd__ = __add__
+
+
+    def __sub__(self, term):
+
+        if type(term) is ScalarUncertainty:
+            b, b_error = term.value, term.error
+
+        elif isinstance(term, _NUMBER_TYPES):
+            b, b_error = term, 0.0
+
+        else:
+            return ValueUncertainty.__sub__(self, term)
+
+        if ValueUncertainty._track_correlations:
+            return ValueUncertainty.__sub__(self, term)
+
+        a_error = self.error
+
+        value = self.value - b
+
+        error = math.sqrt(a_error * a_error + b_error * b_error) if a_error and b_error else a_error or b_error
+
+        if current_capture.get() is not None:
+            return _scalar_result('-', value, error, self, term)
+
+        result = _new_object(ScalarUncertainty)
+
+        result.value, result.error, result._variable_name = value, error, ''
+
+        result._stats_cache = result._jacobian = None
+
+        return result
+
+
+    def __rsub__(self, term):
+
+        if type(term) is ScalarUncertainty:
+            b, b_error = term.value, term.error
+
+        elif isinstance(term, _NUMBER_TYPES):
+            b, b_error = term, 0.0
+
+        else:
+            return ValueUncertainty.__rsub__(self, term)
+
+        if ValueUncertainty._track_correlations:
+            return ValueUncertainty.__rsub__(self, term)
+
+        a_error = self.error
+
+        value = b - self.value
+
+        error = math.sqrt(b_error * b_error + a_error * a_error) if a_error and b_error else b_error or a_error
+
+        if current_capture.get() is not None:
+            return _scalar_result('-', value, error, term, self)
+
+        result = _new_object(ScalarUncertainty)
+
+        result.value, result.error, result._variable_name = value, error, ''
+
+        result._stats_cache = result._jacobian = None
+
+        return result
+
+
+    def __mul__(self, factor):
+
+        if type(factor) is ScalarUncertainty:
+            b, b_error = factor.value, factor.error
+
+        elif isinstance(factor, _NUMBER_TYPES):
+            b, b_error = factor, 0.0
+
+        else:
+            return ValueUncertainty.__mul__(self, factor)
+
+        if ValueUncertainty._track_correlations:
+            return ValueUncertainty.__mul__(self, factor)
+
+        a, a_error = self.value, self.error
+
+        value = a * b
+
+        if a_error and b_error:
+
+            a_term, b_term = a_error * b, a * b_error
+
+            error = math.sqrt(a_term * a_term + b_term * b_term)
+
+        else:
+            error = abs(a_error * b) if a_error else abs(a * b_error)
+
+        if current_capture.get() is not None:
+            return _scalar_result('*', value, error, self, factor)
+
+        result = _new_object(ScalarUncertainty)
+
+        result.value, result.error, result._variable_name = value, error, ''
+
+        result._stats_cache = result._jacobian = None
+
+        return result
+
+
+    __rmul__ = __mul__
+
+
+    def __truediv__(self, divisor):
+
+        if type(divisor) is ScalarUncertainty:
+            b, b_error = divisor.value, divisor.error
+
+        elif isinstance(divisor, _NUMBER_TYPES):
+            b, b_error = divisor, 0.0
+
+        else:
+            return ValueUncertainty.__truediv__(self, divisor)
+
+        if ValueUncertainty._track_correlations or not b:
+            return self._array_result(ValueUncertainty.__truediv__(self, divisor))
+
+        a_error = self.error
+
+        value = self.value / b
+
+        if a_error and b_error:
+
+            a_term, b_term = a_error / b, value * b_error / b
+
+            error = math.sqrt(a_term * a_term + b_term * b_term)
+
+        else:
+            error = abs(a_error / b) if a_error else abs(value * b_error / b)
+
+        if current_capture.get() is not None:
+            return _scalar_result('/', value, error, self, divisor)
+
+        result = _new_object(ScalarUncertainty)
+
+        result.value, result.error, result._variable_name = value, error, ''
+
+        result._stats_cache = result._jacobian = None
+
+        return result
+
+
+    def __rtruediv__(self, quotient):
+
+        if type(quotient) is ScalarUncertainty:
+            q, q_error = quotient.value, quotient.error
+
+        elif isinstance(quotient, _NUMBER_TYPES):
+            q, q_error = quotient, 0.0
+
+        else:
+            return ValueUncertainty.__rtruediv__(self, quotient)
+
+        a, a_error = self.value, self.error
+
+        if ValueUncertainty._track_correlations or not a:
+            return self._array_result(ValueUncertainty.__rtruediv__(self, quotient))
+
+        value = q / a
+
+        if a_error and q_error:
+
+            q_term, a_term = q_error / a, value * a_error / a
+
+            error = math.sqrt(q_term * q_term + a_term * a_term)
+
+        else:
+            error = abs(q_error / a) if q_error else abs(value * a_error / a)
+
+        if current_capture.get() is not None:
+            return _scalar_result('/', value, error, quotient, self)
+
+        result = _new_object(ScalarUncertainty)
+
+        result.value, result.error, result._variable_name = value, error, ''
+
+        result._stats_cache = result._jacobian = None
+
+        return result
+
+
+    def __pow__(self, power):
+
+        if not isinstance(power, _NUMBER_TYPES) or ValueUncertainty._track_correlations:
+            return ValueUncertainty.__pow__(self, power)
+
+        a, a_error = self.value, self.error
+
+        try:
+
+            value = a ** power
+
+            error = a_error and abs(power * value * a_error / a)
+
+        except (ArithmeticError, ValueError):
+            value = None
+
+        if value is None or isinstance(value, complex):
+            return self._array_result(ValueUncertainty.__pow__(self, power))
+
+        return _scalar_result('l**', value, error, self, power)
+
+
+    def __rpow__(self, base):
+
+        if not isinstance(base, _NUMBER_TYPES) or ValueUncertainty._track_correlations:
+            return ValueUncertainty.__rpow__(self, base)
+
+        a, a_error = self.value, self.error
+
+        try:
+
+            value = base ** a
+
+            error = a_error and abs(value * math.log(base) * a_error)
+
+        except (ArithmeticError, ValueError):
+            value = None
+
+        if value is None or isinstance(value, complex):
+            return self._array_result(ValueUncertainty.__rpow__(self, base))
+
+        return _scalar_result('r**', value, error, base, self)
+
+
+    def __abs__(self):
+
+        if ValueUncertainty._track_correlations:
+            return ValueUncertainty.__abs__(self)
+
+        return _scalar_result('abs', abs(self.value), self.error, self)
+
+
+    def _unary(self, operation):
+        """
+        Math function operation ('sin', 'e', ...) of the numbers, called
+        by the ValueUncertainty math functions
+        """
+
+        function, error_function = _SCALAR_FUNCTIONS[operation]
+
+        a, a_error = self.value, self.error
+
+        try:
+
+            value = function(a)
+
+            error = a_error and abs(error_function(a, value, a_error))
+
+        except (ArithmeticError, ValueError):
+            return self._array_result(getattr(ValueUncertainty, {'e': 'exp'}.get(operation, operation))(self._as_array()))
+
+        return _scalar_result(operation, value, error, self)
+
+
+def _read_only(items):
+
+    array = np.array(items)
+
+    array.flags.writeable = False
+
+    return array
+
+
+def _single_item(items):
+
+    items = np.asarray(items)
+
+    if items.size != 1:
+        raise ValueError(f"A ScalarUncertainty holds one item, not {items.size}, make a new ValueUncertainty from the array instead")
+
+    return items
+
+
+def _scalar_result(operation, value, error, *items):
+    """
+    ScalarUncertainty of value ± error, recording the operation when
+    capturing
+    """
+
+    result = _new_object(ScalarUncertainty)
+
+    result.value, result.error, result._variable_name = value, error, ''
+
+    result._stats_cache = result._jacobian = None
+
+    capture = current_capture.get()
+
+    if capture is not None:
+
+        items = [(item._variable_name or _Untracked(str(item.value)), item.value, item.error) if type(item) is ScalarUncertainty else (str(item), item, 0) for item in items]
+
+        result._variable_name = capture.record(operation, value, error, *items)
+
+    return result
+
+
+# (function, error) of the math functions on numbers, the errors are
+# written as in the array versions so both give the same result
+_SCALAR_FUNCTIONS = {
+    'sin': (math.sin, lambda a, value, error: math.cos(a) * error),
+    'cos': (math.cos, lambda a, value, error: math.sin(a) * error),
+    'tan': (math.tan, lambda a, value, error: error / math.cos(a) ** 2),
+    'arcsin': (math.asin, lambda a, value, error: 1 / math.sqrt(1 - a**2) * error),
+    'arccos': (math.acos, lambda a, value, error: -1 / math.sqrt(1 - a**2) * error),
+    'arctan': (math.atan, lambda a, value, error: 1 / (1 + a**2) * error),
+    'e': (math.exp, lambda a, value, error: value * error),
+    'log': (math.log, lambda a, value, error: error / a),
+}
+
+
+def _axis_count(shape, axis):
+    """
+    Number of items a reduction over axis (None, int or tuple) combines
+    """
+
+    if axis is None:
+        return int(np.prod(shape))
+    
+    return int(np.prod([shape[a] for a in np.atleast_1d(axis)]))
+
+
+# Binary ufuncs map to the (operator, reflected operator) method names,
+# unary ufuncs to the static method that propagates their errors
+_UFUNC_OPERATIONS = {
+    'add': ('__add__', '__radd__'),
+    'subtract': ('__sub__', '__rsub__'),
+    'multiply': ('__mul__', '__rmul__'),
+    'divide': ('__truediv__', '__rtruediv__'),
+    'power': ('__pow__', '__rpow__'),
+    'sqrt': ValueUncertainty.sqrt,
+    'sin': ValueUncertainty.sin,
+    'cos': ValueUncertainty.cos,
+    'tan': ValueUncertainty.tan,
+    'arcsin': ValueUncertainty.arcsin,
+    'arccos': ValueUncertainty.arccos,
+    'arctan': ValueUncertainty.arctan,
+    'exp': ValueUncertainty.exp,
+    'log': ValueUncertainty.log,
+    'absolute': abs,
+    'negative': ValueUncertainty.__neg__,
+}
+
+
+_ARRAY_FUNCTIONS = {}
+
+
+def _implements(numpy_function):
+    """
+    Registers a function as the ValueUncertainty version of a numpy function
+    """
+
+    def register(func):
+
+        _ARRAY_FUNCTIONS[numpy_function] = func
+
+        return func
+    
+    return register
+
+
+@_implements(np.sum)
+def _sum(a, axis = None):
+    return ValueUncertainty.sum(a, axis = axis)
+
+
+@_implements(np.mean)
+def _mean(a, axis = None):
+    return ValueUncertainty.average(a, axis = axis)
+
+
+@_implements(np.var)
+def _var(a, axis = None, ddof = 0):
+    return ValueUncertainty.variance(a, axis = axis, ddof = ddof)
+
+
+@_implements(np.std)
+def _std(a, axis = None, ddof = 0):
+
+    variance = ValueUncertainty.variance(a, axis = axis, ddof = ddof)
+
+    values = np.sqrt(variance.values)
+
+    return ValueUncertainty._from_buffers(values, None if variance.is_exact else variance.errors / (2 * values))
+
+
+@_implements(np.concatenate)
+def _concatenate(arrays, axis = 0):
+
+    as_uncertain = lambda item: item if isinstance(item, ValueUncertainty) else ValueUncertainty(item)
+
+    arrays = [as_uncertain(item) for item in arrays]
+
+    values = np.concatenate([item.values for item in arrays], axis = axis)
+
+    errors = None if all(item.is_exact for item in arrays) else np.concatenate([item.errors for item in arrays], axis = axis)
+
+    return ValueUncertainty._from_buffers(values, errors)
+
+
+@_implements(np.stack)
+def _stack(arrays, axis = 0):
+
+    arrays = [item if isinstance(item, ValueUncertainty) else ValueUncertainty(item) for item in arrays]
+
+    values = np.stack([item.values for item in arrays], axis = axis)
+
+    errors = None if all(item.is_exact for item in arrays) else np.stack([item.errors for item in arrays], axis = axis)
+
+    return ValueUncertainty._from_buffers(values, errors)
+
+
+@_implements(np.reshape)
+def _reshape(a, shape):
+    return a.reshape(shape)
+
+
+@_implements(np.transpose)
+def _transpose(a, axes = None):
+    return a.transpose() if axes is None else a.transpose(axes)
+
 
+@_implements(np.copy)
+def _copy(a):
+    return ValueUncertainty._from_buffers(a.values.copy(), None if a.is_exact else a.errors.copy(), a._variable_name)
 
 
+@_implements(np.shape)
+def _shape(a):
+    return a.values.shape
 
 
+@_implements(np.ndim)
+def _ndim(a):
+    return a.values.ndim
 
 
+@_implements(np.size)
+def _size(a, axis = None):
+    return np.size(a.values, axis)
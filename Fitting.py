@@ -0,0 +1,106 @@
+"""
+Houses the weighted least-squares fits of ValueUncertainty data, the
+points of each dataset on the last axis and any number of same-shaped
+datasets on the leading axes, all solved together
+
+The normal equations of every dataset are built with one batched matrix
+product and inverted with one stacked np.linalg.inv, after scaling the
+columns of the design matrix to unit weighted norm to keep them well
+conditioned
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+FitResult = namedtuple('FitResult', ["Parameters", "Covariance", "ChiSquare", "Degrees"])
+
+
+def FitLinear(x, y, scale_covariance = False):
+    """
+    Straight line fit y = a + b x, see FitPolynomial
+    """
+
+    return FitPolynomial(x, y, 1, scale_covariance)
+
+
+def FitPolynomial(x, y, degree, scale_covariance = False):
+    """
+    Fits y = sum_k p_k x^k, k = 0 ... degree, weighting every point by
+    1 / error^2 of y. x holds plain values (the values of a
+    ValueUncertainty are used, its errors are not), y is a
+    ValueUncertainty, both broadcast together with the points on the last
+    axis
+
+    Returns a FitResult with Parameters, a ValueUncertainty of shape
+    (..., degree + 1) lowest power first with errors from the diagonal
+    of Covariance (..., degree + 1, degree + 1), and the ChiSquare and
+    Degrees of freedom of every fit. With scale_covariance the covariance
+    is multiplied by the reduced chi-square, as it always is for exact y
+    which is fitted with unit weights
+    """
+
+    x = np.asarray(x.values if isinstance(x, ValueUncertainty) else x, dtype = np.float64)
+
+    if not isinstance(y, ValueUncertainty):
+        y = ValueUncertainty(np.asarray(y, dtype = np.float64))
+
+    x, y_values = np.broadcast_arrays(x, y.values)
+
+    count, terms = x.shape[-1], degree + 1
+
+    if count < terms:
+        raise ValueError(f"{count} points cannot fix {terms} parameters")
+
+    weights = np.ones_like(y_values) if y.is_exact else 1 / np.square(np.broadcast_to(y.errors, x.shape))
+
+    design = x[..., np.newaxis] ** np.arange(terms)
+
+    scale = np.sqrt(np.einsum('...n,...np->...p', weights, np.square(design)))
+
+    design /= scale[..., np.newaxis, :]
+
+    weighted = np.swapaxes(design * weights[..., np.newaxis], -1, -2)
+
+    inverse = np.linalg.inv(weighted @ design)
+
+    parameters = (inverse @ (weighted @ y_values[..., np.newaxis]))[..., 0]
+
+    residuals = y_values - (design @ parameters[..., np.newaxis])[..., 0]
+
+    chi_square = np.einsum('...n,...n->...', weights, np.square(residuals))
+
+    degrees = count - terms
+
+    covariance = inverse / (scale[..., :, np.newaxis] * scale[..., np.newaxis, :])
+
+    if scale_covariance or y.is_exact:
+        covariance *= (chi_square / max(degrees, 1))[..., np.newaxis, np.newaxis]
+
+    parameters /= scale
+
+    errors = np.sqrt(np.diagonal(covariance, axis1 = -2, axis2 = -1))
+
+    return FitResult(ValueUncertainty._from_buffers(parameters, errors), covariance, chi_square, degrees)
+
+
+def EvaluateFit(fit, x):
+    """
+    Value of the fitted polynomial at x with the error propagated from
+    the full parameter covariance, sqrt(v^T C v) with v = (1, x, x^2 ...).
+    x broadcasts against the leading (dataset) axes of the fit with the
+    points on its last axis
+    """
+
+    x = np.atleast_1d(np.asarray(x.values if isinstance(x, ValueUncertainty) else x, dtype = np.float64))
+
+    powers = x[..., np.newaxis] ** np.arange(fit.Covariance.shape[-1])
+
+    values = np.einsum('...mp,...p->...m', powers, fit.Parameters.values)
+
+    errors = np.sqrt(np.einsum('...mp,...pq,...mq->...m', powers, fit.Covariance, powers))
+
+    return ValueUncertainty._from_buffers(values, errors)
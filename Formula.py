@@ -0,0 +1,207 @@
+"""
+Houses the formula compiler, which turns a captured calculation into a
+callable that replays it on whole arrays of new data
+"""
+
+import inspect
+
+import numpy as np
+
+from Capture import CaptureSession, _OPERATIONS, _UNARY, _Untracked
+
+from Error import ValueUncertainty
+
+from Kernels import KERNELS
+
+
+def CompileFormula(function, *examples):
+    """
+    Traces function once on single representative measurements and
+    returns the CompiledFormula of it. examples give the value ± error
+    used for each parameter of function while tracing, a ValueUncertainty
+    (its first item is used) or a number, defaulting to 1. A function
+    returning one of its parameters compiles to that parameter
+    """
+
+    names = list(inspect.signature(function).parameters)
+
+    examples = list(examples) + [1.0] * (len(names) - len(examples))
+
+    first = lambda example: (example.values.flat[0], example.errors.flat[0]) if isinstance(example, ValueUncertainty) else (example, 0)
+
+    with CaptureSession() as capture:
+
+        parameters = [ValueUncertainty(*first(example), variable_name = name) for name, example in zip(names, examples)]
+
+        result = function(*parameters)
+
+    # Returning a parameter records nothing
+    returned = [name for name, parameter in zip(names, parameters) if parameter is result]
+
+    return CompiledFormula(capture, variables = names, result = returned[0] if returned and len(capture) == 0 else None)
+
+
+class CompiledFormula:
+    """
+    Replays the operations of a CaptureSession on arrays. Named values
+    used in the capture become the variables of the formula, plain
+    numbers and values named by their number are kept as constants.
+    Results of operations the capture does not record (reductions,
+    indexing, calculations done outside it) cannot be replayed and are
+    refused. An empty capture compiles to the variable named by result.
+    Calling it evaluates every operation once on the whole inputs with
+    the kernels, no ValueUncertainty is created until the result and no
+    LaTeX is built
+
+    Intermediate arrays are released as soon as no later operation uses
+    them to keep the peak memory of long formulas down
+    """
+
+    def __init__(self, capture, variables = None, result = None):
+
+        if len(capture) == 0 and result is None:
+            raise ValueError("The capture has no operations to compile")
+
+        self.variables = list(variables or [])
+
+        constants = []
+
+        def register(reference):
+
+            if reference > 0:
+                return ('entry', reference - 1)
+
+            name, value, error = capture.inputs[-reference - 1]
+
+            if isinstance(name, _Untracked):
+                raise ValueError(f"The operand {name} is the result of an operation the capture did not record (a reduction, an index or a "
+                                 "calculation outside the capture), it cannot be replayed on new data")
+
+            if _IsNumber(name):
+
+                constants.append((np.float64(value), np.float64(error)))
+
+                return ('constant', len(constants) - 1)
+
+            if name not in self.variables:
+                self.variables.append(name)
+
+            return ('variable', self.variables.index(name))
+
+        operations = []
+
+        for entry, opcode in enumerate(capture.opcodes):
+
+            arguments = [register(capture.operands[2 * entry])]
+
+            if opcode not in _UNARY:
+                arguments.append(register(capture.operands[2 * entry + 1]))
+
+            operations.append((KERNELS[_OPERATIONS[opcode]], arguments))
+
+        # Registers are laid out as variables, constants then entries
+        offsets = {'variable': 0, 'constant': len(self.variables), 'entry': len(self.variables) + len(constants)}
+
+        self._constants = constants
+
+        self._register_count = offsets['entry'] + len(operations)
+
+        last_use = {}
+
+        steps = []
+
+        for entry, (kernel, arguments) in enumerate(operations):
+
+            indices = [offsets[kind] + index for kind, index in arguments]
+
+            for index in indices:
+                last_use[index] = entry
+
+            steps.append((kernel, indices, offsets['entry'] + entry))
+
+        if result is not None and result not in self.variables:
+            self.variables.append(result)
+
+        self._result = self.variables.index(result) if not operations else offsets['entry'] + len(operations) - 1
+
+        self._steps = [(kernel, indices, result, [index for index in set(indices) if last_use[index] == entry and index >= offsets['entry']])
+                       for entry, (kernel, indices, result) in enumerate(steps)]
+
+
+    def __call__(self, *args, **kwargs):
+        """
+        Evaluates the formula, the variables are given in the order of
+        self.variables or by name, as ValueUncertainty objects or as
+        arrays/numbers taken as exact
+        """
+
+        inputs = list(args) + [None] * (len(self.variables) - len(args))
+
+        for name, item in kwargs.items():
+
+            if name not in self.variables:
+                raise ValueError(f"{name} is not a variable of the formula, expected one of {self.variables}")
+
+            inputs[self.variables.index(name)] = item
+
+        missing = [name for name, item in zip(self.variables, inputs) if item is None]
+
+        if missing:
+            raise ValueError(f"No values given for the variables {missing}")
+
+        registers = [None] * self._register_count
+
+        for i, item in enumerate(inputs):
+
+            if isinstance(item, ValueUncertainty):
+                registers[i] = (item.values, 0.0 if item.is_exact else item.errors)
+
+            else:
+                registers[i] = (np.asarray(item), 0.0)
+
+        registers[len(inputs):len(inputs) + len(self._constants)] = self._constants
+
+        for kernel, indices, result, released in self._steps:
+
+            first = registers[indices[0]]
+
+            second = registers[indices[1]] if len(indices) > 1 else (None, None)
+
+            registers[result] = kernel(*first, *second)
+
+            for index in released:
+                registers[index] = None
+
+        values, errors = registers[self._result]
+
+        values, errors = np.atleast_1d(values), np.asarray(errors)
+
+        if errors.ndim == 0 and errors == 0:
+            errors = None
+
+        elif errors.shape != values.shape:
+            errors = np.broadcast_to(errors, values.shape).copy()
+
+        # Kernels pass an error through untouched when the other operand
+        # is exact (x + 1, abs(x)), the result must not share the input
+        # buffers as the eager operators never do
+        inputs = [array for register in registers[:len(self.variables)] for array in register if isinstance(array, np.ndarray)]
+
+        if any(np.may_share_memory(values, array) for array in inputs):
+            values = values.copy()
+
+        if errors is not None and any(np.may_share_memory(errors, array) for array in inputs):
+            errors = errors.copy()
+
+        return ValueUncertainty._from_buffers(values, errors)
+
+
+def _IsNumber(name):
+
+    try:
+        float(name)
+
+    except ValueError:
+        return False
+
+    return True
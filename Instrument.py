@@ -0,0 +1,338 @@
+"""
+Houses the opt-in instrumentation of ValueUncertainty, counting the calls,
+elements, allocations and time of every operation
+
+    with Instrumentation() as instrumentation:
+        ...
+    print(InstrumentationReport(instrumentation.stats))
+
+StartInstrumentation swaps the operators, math functions, reductions,
+constructors, capture methods and Utilities formatting functions for
+timed wrappers and EndInstrumentation puts the originals back, so nothing
+is wrapped, and nothing costs anything, while it is off
+"""
+
+import threading
+
+from collections import namedtuple
+
+from functools import wraps
+
+from time import perf_counter
+
+import numpy as np
+
+import Capture
+
+import Error
+
+import Utilities
+
+from Capture import CaptureSession
+
+from Error import ScalarUncertainty, ValueUncertainty
+
+
+OperationStats = namedtuple('OperationStats', ["Calls", "Elements", "Allocations", "AllocatedBytes", "Seconds", "SelfSeconds"])
+
+
+_INSTRUMENTED = {
+    ValueUncertainty: ('__init__', '_from_buffers', '__getitem__', '__setitem__', '__str__', 'compute',
+                       '__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__', '__truediv__', '__rtruediv__',
+                       '__pow__', '__rpow__', '__neg__', '__abs__', '__iadd__', '__isub__', '__imul__', '__itruediv__', '__ipow__',
+                       'sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'exp', 'log', 'sqrt',
+                       'sum', 'average', 'variance', 'covariance'),
+    ScalarUncertainty: ('__init__', '_from_numbers',
+                        '__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__', '__truediv__', '__rtruediv__',
+                        '__pow__', '__rpow__', '__abs__', '_unary'),
+    CaptureSession: ('record', 'render', '_latex_variables', 'compile'),
+}
+
+_FORMATTING = ('LatexCreator', 'CreateValueLatexSting', 'CreateErrorLatexString', 'ErrorBeginning1Item', 'ErrorBeginning2Items')
+
+# Modules and tables holding their own references to instrumented
+# functions, these are swapped by identity
+_REFERENCES = (vars(Utilities), vars(Capture), vars(Error), Error._UFUNC_OPERATIONS)
+
+
+_lock = threading.Lock()
+
+_local = threading.local()
+
+# name: [calls, elements, allocations, allocated bytes, seconds, self seconds]
+_stats = {}
+
+# (namespace, key, original) of everything swapped while active
+_originals = []
+
+# id(original function): wrapper, so references held elsewhere to the
+# same function get the same wrapper
+_wrapped_functions = {}
+
+
+def StartInstrumentation():
+    """
+    Starts counting every instrumented operation, does nothing when
+    already started. Counts add up until ResetInstrumentation
+    """
+
+    with _lock:
+
+        if _originals:
+            return
+
+        for cls, names in _INSTRUMENTED.items():
+
+            for name in names:
+                _Swap(cls, name)
+
+        for name in _FORMATTING:
+            _wrapped_functions[id(vars(Utilities)[name])] = _Instrumented(f"Utilities.{name}", vars(Utilities)[name])
+
+        for namespace in _REFERENCES:
+
+            for key, value in list(namespace.items()):
+
+                wrapped = _wrapped_functions.get(id(value))
+
+                if wrapped is not None:
+
+                    _originals.append((namespace, key, value))
+
+                    namespace[key] = wrapped
+
+
+def EndInstrumentation():
+    """
+    Puts the original functions back, the counts are kept
+    """
+
+    with _lock:
+
+        while _originals:
+
+            namespace, key, original = _originals.pop()
+
+            if isinstance(namespace, type):
+                setattr(namespace, key, original)
+
+            else:
+                namespace[key] = original
+
+        _wrapped_functions.clear()
+
+
+def IsInstrumenting():
+    return bool(_originals)
+
+
+def InstrumentationSnapshot():
+    """
+    {operation name: OperationStats} of everything counted since the last
+    reset. Seconds include the operations called inside, SelfSeconds
+    exclude them
+    """
+
+    with _lock:
+        return {name: OperationStats(*counts) for name, counts in _stats.items()}
+
+
+def ResetInstrumentation():
+
+    with _lock:
+        _stats.clear()
+
+
+def InstrumentationReport(stats = None):
+    """
+    Table of the stats, by default the current snapshot, sorted by self
+    time, with the share of the total self time of each operation
+    """
+
+    stats = InstrumentationSnapshot() if stats is None else stats
+
+    total = sum(item.SelfSeconds for item in stats.values()) or 1.0
+
+    lines = [f"{'operation':<40} {'calls':>9} {'elements':>12} {'allocs':>8} {'MB':>9} {'total s':>10} {'self s':>10} {'self %':>7}"]
+
+    for name, item in sorted(stats.items(), key = lambda pair: -pair[1].SelfSeconds):
+        lines.append(f"{name:<40} {item.Calls:>9} {item.Elements:>12} {item.Allocations:>8} {item.AllocatedBytes / 2**20:>9.2f} "
+                     f"{item.Seconds:>10.6f} {item.SelfSeconds:>10.6f} {100 * item.SelfSeconds / total:>6.1f}%")
+
+    return '\n'.join(lines)
+
+
+class Instrumentation:
+    """
+    Instruments the operations inside a with block, afterwards stats
+    holds the {operation name: OperationStats} counted inside it. Blocks
+    can be nested, instrumentation stops when the outermost one exits
+    """
+
+    def __init__(self):
+
+        self.stats = None
+
+        self._before = None
+
+        self._started = False
+
+
+    def __enter__(self):
+
+        self._started = not IsInstrumenting()
+
+        self._before = InstrumentationSnapshot()
+
+        StartInstrumentation()
+
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        after = InstrumentationSnapshot()
+
+        if self._started:
+            EndInstrumentation()
+
+        empty = OperationStats(0, 0, 0, 0, 0.0, 0.0)
+
+        self.stats = {name: OperationStats(*[a - b for a, b in zip(item, self._before.get(name, empty))]) for name, item in after.items()}
+
+        self.stats = {name: item for name, item in self.stats.items() if item.Calls}
+
+        return False
+
+
+def _Swap(cls, key):
+    """
+    Replaces the attribute key of cls by its wrapper, keeping staticmethod
+    and classmethod descriptors around it
+    """
+
+    attribute = vars(cls)[key]
+
+    name = f"{cls.__name__}.{key}"
+
+    if isinstance(attribute, (staticmethod, classmethod)):
+
+        wrapped = type(attribute)(_Instrumented(name, attribute.__func__))
+
+        _wrapped_functions[id(attribute.__func__)] = wrapped.__func__
+
+    else:
+
+        wrapped = _Instrumented(name, attribute, constructor = key == '__init__')
+
+        _wrapped_functions[id(attribute)] = wrapped
+
+    _originals.append((cls, key, attribute))
+
+    setattr(cls, key, wrapped)
+
+
+def _Instrumented(name, function, constructor = False):
+    """
+    function wrapped to add its call to the stats of name
+    """
+
+    @wraps(function)
+    def instrumented(*args, **kwargs):
+
+        stack = getattr(_local, 'stack', None)
+
+        if stack is None:
+            stack = _local.stack = []
+
+        stack.append(0.0)
+
+        start = perf_counter()
+
+        try:
+            result = function(*args, **kwargs)
+
+        finally:
+
+            elapsed = perf_counter() - start
+
+            children = stack.pop()
+
+            if stack:
+                stack[-1] += elapsed
+
+        produced = args[0] if constructor else result
+
+        inputs = args[1:] if constructor else args
+
+        elements = max([_Elements(item) for item in (produced, *inputs, *kwargs.values())], default = 0)
+
+        allocations, allocated_bytes = _Allocations(produced, inputs)
+
+        with _lock:
+
+            counts = _stats.setdefault(name, [0, 0, 0, 0, 0.0, 0.0])
+
+            counts[0] += 1
+
+            counts[1] += elements
+
+            counts[2] += allocations
+
+            counts[3] += allocated_bytes
+
+            counts[4] += elapsed
+
+            counts[5] += elapsed - children
+
+        return result
+
+    return instrumented
+
+
+def _Elements(item):
+    """
+    Items held by a ValueUncertainty or array, lazy results not yet
+    evaluated count as none
+    """
+
+    if type(item) is ScalarUncertainty:
+        return 1
+
+    if isinstance(item, ValueUncertainty):
+        return 0 if item._expression is not None or item._values is None else item._values.size
+
+    if isinstance(item, np.ndarray):
+        return item.size
+
+    return 0
+
+
+def _Allocations(result, inputs):
+    """
+    (count, bytes) of the values and errors arrays of result that are
+    new, i.e. not memory of the inputs
+    """
+
+    if type(result) is ScalarUncertainty or not isinstance(result, ValueUncertainty) or result._expression is not None:
+        return 0, 0
+
+    arrays = [item for item in inputs if isinstance(item, np.ndarray)]
+
+    for item in inputs:
+
+        if isinstance(item, ValueUncertainty) and type(item) is not ScalarUncertainty and item._expression is None:
+            arrays.extend(array for array in (item._values, item._errors) if array is not None)
+
+    count = size = 0
+
+    for array in (result._values, result._errors):
+
+        if array is None or any(np.may_share_memory(array, item) for item in arrays):
+            continue
+
+        count += 1
+
+        size += array.nbytes
+
+    return count, size
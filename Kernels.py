@@ -0,0 +1,220 @@
+"""
+Houses the elementwise kernels used to evaluate captured operations on
+plain value and error arrays, without creating ValueUncertainty objects
+
+Every kernel takes the values and errors of its operands, the second
+pair being None for single operand operations, and returns the values
+and errors of the result with the same propagation as the operators of
+ValueUncertainty. They are keyed by the capture operation names
+"""
+
+import numpy as np
+
+
+def _Exact(errors):
+    """
+    True for the scalar 0 error of plain numbers and constants
+    """
+
+    return np.ndim(errors) == 0 and errors == 0
+
+
+def _Quadrature(a, b):
+    """
+    sqrt(a^2 + b^2), noticeably faster than np.hypot on large arrays
+    """
+
+    if _Exact(b):
+        return np.abs(a)
+
+    if _Exact(a):
+        return np.abs(b)
+
+    return np.sqrt(np.square(a) + np.square(b))
+
+
+def _AddErrors(a_err, b_err):
+    """
+    Quadrature sum of two errors, which are never negative so an exact
+    operand leaves the other error as it is
+    """
+
+    if _Exact(b_err):
+        return a_err
+
+    if _Exact(a_err):
+        return b_err
+
+    return np.sqrt(np.square(a_err) + np.square(b_err))
+
+
+def _Add(a, a_err, b, b_err):
+    return a + b, _AddErrors(a_err, b_err)
+
+
+def _Subtract(a, a_err, b, b_err):
+    return a - b, _AddErrors(a_err, b_err)
+
+
+def _Multiply(a, a_err, b, b_err):
+
+    a_term = 0.0 if _Exact(a_err) else b * a_err
+
+    b_term = 0.0 if _Exact(b_err) else a * b_err
+
+    return a * b, _Quadrature(a_term, b_term)
+
+
+def _Divide(a, a_err, b, b_err):
+
+    values = a / b
+
+    a_term = 0.0 if _Exact(a_err) else a_err / b
+
+    b_term = 0.0 if _Exact(b_err) else values * b_err / b
+
+    return values, _Quadrature(a_term, b_term)
+
+
+def _Power(a, a_err, b, b_err):
+
+    values = a ** b
+
+    return values, 0.0 if _Exact(a_err) else np.abs(b * values * a_err / a)
+
+
+def _ReversePower(a, a_err, b, b_err):
+
+    values = a ** b
+
+    return values, 0.0 if _Exact(b_err) else np.abs(values * np.log(a) * b_err)
+
+
+def _Sin(a, a_err, b, b_err):
+    return np.sin(a), 0.0 if _Exact(a_err) else np.abs(np.cos(a) * a_err)
+
+
+def _Cos(a, a_err, b, b_err):
+    return np.cos(a), 0.0 if _Exact(a_err) else np.abs(np.sin(a) * a_err)
+
+
+def _Tan(a, a_err, b, b_err):
+    return np.tan(a), 0.0 if _Exact(a_err) else np.abs(a_err / np.cos(a)**2)
+
+
+def _Arcsin(a, a_err, b, b_err):
+    return np.arcsin(a), 0.0 if _Exact(a_err) else np.abs(a_err / np.sqrt(1 - a**2))
+
+
+def _Arccos(a, a_err, b, b_err):
+    return np.arccos(a), 0.0 if _Exact(a_err) else np.abs(a_err / np.sqrt(1 - a**2))
+
+
+def _Arctan(a, a_err, b, b_err):
+    return np.arctan(a), 0.0 if _Exact(a_err) else np.abs(a_err / (1 + a**2))
+
+
+def _Exp(a, a_err, b, b_err):
+
+    values = np.exp(a)
+
+    return values, 0.0 if _Exact(a_err) else np.abs(values * a_err)
+
+
+def _Log(a, a_err, b, b_err):
+    return np.log(a), 0.0 if _Exact(a_err) else np.abs(a_err / a)
+
+
+def _Abs(a, a_err, b, b_err):
+    return np.abs(a), a_err
+
+
+KERNELS = {
+    '+': _Add,
+    '-': _Subtract,
+    '*': _Multiply,
+    '/': _Divide,
+    'l**': _Power,
+    'r**': _ReversePower,
+    'sin': _Sin,
+    'cos': _Cos,
+    'tan': _Tan,
+    'arcsin': _Arcsin,
+    'arccos': _Arccos,
+    'arctan': _Arctan,
+    'e': _Exp,
+    'log': _Log,
+    'abs': _Abs,
+}
+
+
+# Slopes write the derivative of the single operand functions into out
+# without allocating, for the out= paths of the ValueUncertainty math
+# functions. The sign is irrelevant as the errors take the absolute value.
+# SLOPES maps the operation names to (function, slope)
+
+def _SinSlope(a, out):
+    return np.cos(a, out = out)
+
+
+def _CosSlope(a, out):
+    return np.sin(a, out = out)
+
+
+def _TanSlope(a, out):
+
+    np.cos(a, out = out)
+
+    np.square(out, out = out)
+
+    return np.reciprocal(out, out = out)
+
+
+def _ArcsinSlope(a, out):
+
+    np.square(a, out = out)
+
+    np.subtract(1, out, out = out)
+
+    np.sqrt(out, out = out)
+
+    return np.reciprocal(out, out = out)
+
+
+def _ArctanSlope(a, out):
+
+    np.square(a, out = out)
+
+    np.add(out, 1, out = out)
+
+    return np.reciprocal(out, out = out)
+
+
+def _ExpSlope(a, out):
+    return np.exp(a, out = out)
+
+
+def _LogSlope(a, out):
+    return np.reciprocal(a, out = out)
+
+
+def _SqrtSlope(a, out):
+
+    np.sqrt(a, out = out)
+
+    np.multiply(out, 2, out = out)
+
+    return np.reciprocal(out, out = out)
+
+
+SLOPES = {
+    'sin': (np.sin, _SinSlope),
+    'cos': (np.cos, _CosSlope),
+    'tan': (np.tan, _TanSlope),
+    'arcsin': (np.arcsin, _ArcsinSlope),
+    'arccos': (np.arccos, _ArcsinSlope),
+    'arctan': (np.arctan, _ArctanSlope),
+    'e': (np.exp, _ExpSlope),
+    'log': (np.log, _LogSlope),
+    'sqrt': (np.sqrt, _SqrtSlope),
+}
@@ -0,0 +1,204 @@
+"""
+Houses the evaluation of lazy ValueUncertainty expressions, see
+ValueUncertainty.StartLazyEvaluation
+
+A lazy result holds (operation, operands) instead of arrays. Evaluating
+it walks the graph once, then runs every operation with the kernels on
+blocks of rows of the inputs, so the temporaries of a long formula stay
+cache sized instead of each being a full array
+"""
+
+import numpy as np
+
+from Kernels import KERNELS
+
+
+BLOCK_SIZE = 2**14
+
+
+def EvaluateExpression(root, block_size = BLOCK_SIZE):
+    """
+    Values and errors arrays of the lazy root, evaluated in blocks of
+    about block_size items
+    """
+
+    leaves, steps, result = _Linearize(root)
+
+    shape = np.broadcast_shapes(*[np.shape(values) for values, _ in leaves])
+
+    shape = shape or (1,)
+
+    # Leaves are broadcast views of the full shape so every block is a
+    # plain slice of rows, plain number errors stay scalar
+    leaves = [(np.broadcast_to(values, shape), errors if np.ndim(errors) == 0 else np.broadcast_to(errors, shape)) for values, errors in leaves]
+
+    row_size = int(np.prod(shape[1:]))
+
+    rows_per_block = max(1, block_size // max(row_size, 1))
+
+    out_values = out_errors = None
+
+    for start in range(0, shape[0], rows_per_block):
+
+        stop = min(start + rows_per_block, shape[0])
+
+        registers = [(values[start:stop], errors if np.ndim(errors) == 0 else errors[start:stop]) for values, errors in leaves]
+
+        registers.extend([None] * len(steps))
+
+        for kernel, indices, output, released in steps:
+
+            first = registers[indices[0]]
+
+            second = registers[indices[1]] if len(indices) > 1 else (None, None)
+
+            registers[output] = kernel(*first, *second)
+
+            for index in released:
+                registers[index] = None
+
+        values, errors = registers[result]
+
+        if out_values is None:
+
+            out_values = np.empty(shape, dtype = np.result_type(values))
+
+            # Exact results stay the scalar 0 in every block and get no
+            # errors buffer
+            exact = np.ndim(errors) == 0 and errors == 0
+
+            out_errors = None if exact else np.empty(shape, dtype = np.result_type(errors, values))
+
+        out_values[start:stop] = values
+
+        if out_errors is not None:
+            out_errors[start:stop] = errors
+
+    return out_values, out_errors
+
+
+def _Linearize(root):
+    """
+    Orders the lazy nodes under root so operands come first, without
+    recursion. Returns the leaves as (values, errors), the steps as
+    (kernel, operand registers, output register, registers released after
+    the step) and the register of the root. Registers are numbered with
+    the leaves first
+    """
+
+    leaves = []
+
+    leaf_registers = {}
+
+    nodes = []
+
+    node_positions = {}
+
+    stack = [(root, False)]
+
+    while stack:
+
+        node, expanded = stack.pop()
+
+        if id(node) in node_positions:
+            continue
+
+        operation, operands = node._expression
+
+        if not expanded:
+
+            stack.append((node, True))
+
+            for operand in reversed(operands):
+
+                if _IsLazy(operand) and id(operand) not in node_positions:
+                    stack.append((operand, False))
+
+            continue
+
+        arguments = []
+
+        for operand in operands:
+
+            if _IsLazy(operand):
+                arguments.append(('node', node_positions[id(operand)]))
+
+            elif hasattr(operand, '_expression'):
+
+                if id(operand) not in leaf_registers:
+
+                    leaf_registers[id(operand)] = len(leaves)
+
+                    leaves.append((operand._values, 0.0 if operand._errors is None else operand._errors))
+
+                arguments.append(('leaf', leaf_registers[id(operand)]))
+
+            else:
+
+                leaves.append((np.asarray(operand), 0.0))
+
+                arguments.append(('leaf', len(leaves) - 1))
+
+        node_positions[id(node)] = len(nodes)
+
+        nodes.append((KERNELS[operation], arguments))
+
+    register = lambda kind, index: index if kind == 'leaf' else len(leaves) + index
+
+    last_use = {}
+
+    steps = []
+
+    for position, (kernel, arguments) in enumerate(nodes):
+
+        indices = [register(kind, index) for kind, index in arguments]
+
+        for index in indices:
+            last_use[index] = position
+
+        steps.append((kernel, indices, len(leaves) + position))
+
+    steps = [(kernel, indices, output, [index for index in set(indices) if index >= len(leaves) and last_use[index] == position])
+             for position, (kernel, indices, output) in enumerate(steps)]
+
+    return leaves, steps, len(leaves) + len(nodes) - 1
+
+
+def ReadsBuffers(root, buffers):
+    """
+    True when evaluating the lazy root would read memory of any of the
+    buffers, through a leaf operand or a plain array operand
+    """
+
+    stack, seen = [root], set()
+
+    while stack:
+
+        node = stack.pop()
+
+        if id(node) in seen:
+            continue
+
+        seen.add(id(node))
+
+        for operand in node._expression[1]:
+
+            if _IsLazy(operand):
+                stack.append(operand)
+
+                continue
+
+            if hasattr(operand, '_expression'):
+                arrays = [operand._values, operand._errors]
+
+            else:
+                arrays = [operand]
+
+            if any(isinstance(array, np.ndarray) and np.may_share_memory(array, buffer) for array in arrays for buffer in buffers):
+                return True
+
+    return False
+
+
+def _IsLazy(item):
+    return getattr(item, '_expression', None) is not None
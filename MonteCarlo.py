@@ -0,0 +1,175 @@
+"""
+Houses the Monte Carlo propagation used to cross-check the linear error
+formulas of ValueUncertainty when relative errors are large
+"""
+
+from collections import namedtuple
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+MonteCarloResult = namedtuple('MonteCarloResult', ["Result", "Mean", "Std", "Percentiles"])
+
+
+def MonteCarloPropagate(function, *inputs, draws = 10000, percentiles = (2.5, 50, 97.5), seed = None,
+                        processes = None, elementwise = True, memory_limit = 2**26):
+    """
+    Evaluates function(*inputs) on draws normally distributed samples of
+    every input item (value ± error) and returns a MonteCarloResult with
+    the mean and standard deviation of the outputs, Result holding them as
+    a ValueUncertainty, and the requested percentiles stacked on axis 0
+
+    The function is called with exact ValueUncertainty samples so any
+    expression built from ValueUncertainty operations works. With
+    elementwise True it must act item by item and the work is split into
+    blocks of items, otherwise the draws are on a new leading axis of the
+    inputs and reductions inside the function must use the trailing axes
+
+    The samples are processed in chunks so about memory_limit bytes are
+    used per process. processes runs the blocks on a process pool, the
+    function then needs to be picklable (defined at module level)
+
+    Every block of items, or of draws when elementwise is False, takes
+    its own random stream spawned from seed. The blocks are sized from
+    memory_limit alone, so a seed gives the same result serially and on
+    any number of processes, but not with a different memory_limit
+    """
+
+    inputs = [item if isinstance(item, ValueUncertainty) else ValueUncertainty(item) for item in inputs]
+
+    shape = np.broadcast_shapes(*[item.shape for item in inputs])
+
+    percentiles = tuple(percentiles)
+
+    if elementwise:
+        tasks, combine = _ElementwiseTasks(function, inputs, shape, draws, percentiles, memory_limit)
+
+    else:
+        tasks, combine = _DrawTasks(function, inputs, draws, percentiles, memory_limit)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+
+    tasks = [task + (task_seed,) for task, task_seed in zip(tasks, seeds)]
+
+    if processes is None:
+        results = [_RunTask(*task) for task in tasks]
+
+    else:
+
+        with ProcessPoolExecutor(max_workers = processes) as pool:
+            results = list(pool.map(_RunTask, *zip(*tasks)))
+
+    mean, std, percentile_values = combine(results)
+
+    return MonteCarloResult(ValueUncertainty(mean, std), mean, std, percentile_values)
+
+
+def _ElementwiseTasks(function, inputs, shape, draws, percentiles, memory_limit):
+    """
+    Splits the broadcast items into blocks whose draws fit in memory_limit,
+    every task summarises its block so only the statistics are returned
+    """
+
+    flat = [(np.broadcast_to(item.values, shape).ravel(), np.broadcast_to(item.errors, shape).ravel()) for item in inputs]
+
+    size = int(np.prod(shape))
+
+    # The stored draws and the sorted copy np.percentile makes
+    block = max(1, memory_limit // (draws * 8 * 2))
+
+    tasks = []
+
+    for start in range(0, size, block):
+
+        stop = min(start + block, size)
+
+        block_inputs = [(values[start:stop], errors[start:stop]) for values, errors in flat]
+
+        tasks.append((function, block_inputs, draws, percentiles, memory_limit, True))
+
+    def combine(results):
+
+        mean = np.concatenate([result[0] for result in results]).reshape(shape)
+
+        std = np.concatenate([result[1] for result in results]).reshape(shape)
+
+        percentile_values = np.concatenate([result[2] for result in results], axis = 1).reshape((len(percentiles),) + shape)
+
+        return mean, std, percentile_values
+
+    return tasks, combine
+
+
+def _DrawTasks(function, inputs, draws, percentiles, memory_limit):
+    """
+    Splits the draws between tasks that each evaluate the whole inputs,
+    used when the function reduces over items. The reduced outputs of
+    every draw are kept and summarised once all tasks are done. A task
+    holds one chunk of draws, so the split, and with it the streams the
+    draws come from, depends on memory_limit but not on processes
+    """
+
+    arrays = [(item.values, item.errors) for item in inputs]
+
+    per_task = _ChunkDraws(arrays, memory_limit)
+
+    tasks = [(function, arrays, min(per_task, draws - start), percentiles, memory_limit, False) for start in range(0, draws, per_task)]
+
+    def combine(results):
+
+        outputs = np.concatenate(results, axis = 0)
+
+        return outputs.mean(axis = 0), outputs.std(axis = 0, ddof = 1), np.percentile(outputs, percentiles, axis = 0)
+
+    return tasks, combine
+
+
+def _BroadcastSize(arrays):
+    return max(int(np.prod(np.broadcast_shapes(*[values.shape for values, _ in arrays]))), 1)
+
+
+def _ChunkDraws(arrays, memory_limit):
+    """
+    Draws evaluated at a time, leaving room for the samples of every
+    input and the temporaries of the function
+    """
+
+    return max(1, memory_limit // (8 * 16 * (len(arrays) + 1) * _BroadcastSize(arrays)))
+
+
+def _RunTask(function, arrays, draws, percentiles, memory_limit, summarise, seed):
+
+    rng = np.random.default_rng(seed)
+
+    size = _BroadcastSize(arrays)
+
+    chunk = _ChunkDraws(arrays, memory_limit)
+
+    # Summarised blocks keep the draws of every item contiguous, which
+    # makes the percentile partition much faster than along axis 0
+    outputs = np.empty((size, draws)) if summarise else []
+
+    for start in range(0, draws, chunk):
+
+        count = min(chunk, draws - start)
+
+        samples = [ValueUncertainty(values + errors * rng.standard_normal((count,) + values.shape)) for values, errors in arrays]
+
+        result = function(*samples)
+
+        result = result.values if isinstance(result, ValueUncertainty) else np.asarray(result)
+
+        if summarise:
+            outputs[:, start:start + count] = np.broadcast_to(result, (count, size)).T
+
+        else:
+            outputs.append(result)
+
+    if not summarise:
+        return np.concatenate(outputs, axis = 0)
+
+    return outputs.mean(axis = 1), outputs.std(axis = 1, ddof = 1), np.percentile(outputs, percentiles, axis = 1)
@@ -0,0 +1,169 @@
+"""
+Houses the process pool map used to run the same elementwise uncertainty
+pipeline over large arrays on every core
+
+The values and errors buffers are placed in shared memory once, workers
+attach to them by name and write their rows of the result straight into
+shared output buffers, so only the function and the row ranges are ever
+pickled. Exact inputs and results have no errors buffer at all
+"""
+
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+def ParallelMap(function, *inputs, processes = None, chunk_rows = None, pool = None):
+    """
+    Evaluates the elementwise function(*inputs) with the work split by
+    rows (axis 0) across a process pool and returns the result as a
+    ValueUncertainty. inputs are ValueUncertainty objects or arrays taken
+    as exact, broadcast together. function is called with ValueUncertainty
+    views of a range of rows and must be picklable (defined at module
+    level)
+
+    A running ProcessPoolExecutor can be passed as pool to avoid starting
+    processes for every call, otherwise processes workers are started
+    (all cores by default). chunk_rows sets the rows per task, by default
+    every worker gets about four tasks
+    """
+
+    inputs = [item if isinstance(item, ValueUncertainty) else ValueUncertainty(item) for item in inputs]
+
+    shape = np.broadcast_shapes(*[item.shape for item in inputs])
+
+    workers = pool._max_workers if pool is not None else processes or os.cpu_count()
+
+    chunk_rows = chunk_rows or max(1, -(-shape[0] // (4 * workers)))
+
+    buffers = [(item.values, None if item.is_exact else item.errors) for item in inputs]
+
+    # The dtypes of the result, and whether it is exact, come from
+    # evaluating the first row here
+    probe = function(*[ValueUncertainty._from_buffers(*(None if array is None else np.broadcast_to(array, shape)[:1] for array in pair)) for pair in buffers])
+
+    blocks = []
+
+    try:
+
+        shared_inputs = [tuple(None if array is None else _Share(array, shape, blocks) for array in pair) for pair in buffers]
+
+        out_values = _Share(np.empty(0, dtype = probe.values.dtype), shape, blocks, fill = False)
+
+        out_errors = None if probe.is_exact else _Share(np.empty(0, dtype = probe.errors.dtype), shape, blocks, fill = False)
+
+        tasks = [(function, shared_inputs, (out_values, out_errors), start, min(start + chunk_rows, shape[0])) for start in range(0, shape[0], chunk_rows)]
+
+        if pool is None:
+
+            with ProcessPoolExecutor(max_workers = workers) as executor:
+                list(executor.map(_RunRows, *zip(*tasks)))
+
+        else:
+            list(pool.map(_RunRows, *zip(*tasks)))
+
+        values = _Read(out_values, blocks)
+
+        errors = None if out_errors is None else _Read(out_errors, blocks)
+
+    finally:
+
+        for block in blocks:
+
+            block.close()
+
+            block.unlink()
+
+    return ValueUncertainty._from_buffers(values, errors)
+
+
+def _Share(array, shape, blocks, fill = True):
+    """
+    Copies array, broadcast to shape, into a new shared memory block and
+    returns the (name, shape, dtype) workers use to attach to it
+    """
+
+    dtype = np.asarray(array).dtype
+
+    block = shared_memory.SharedMemory(create = True, size = max(1, int(np.prod(shape)) * dtype.itemsize))
+
+    blocks.append(block)
+
+    if fill:
+        np.ndarray(shape, dtype = dtype, buffer = block.buf)[...] = array
+
+    return block.name, shape, dtype.str
+
+
+def _Read(spec, blocks):
+    """
+    Copy of the array of a spec made by _Share, read from its block
+    among blocks
+    """
+
+    name, shape, dtype = spec
+
+    block = next(block for block in blocks if block.name == name)
+
+    return np.ndarray(shape, dtype = np.dtype(dtype), buffer = block.buf).copy()
+
+
+def _Attached(spec):
+    """
+    (shared memory block, array over it) of a spec made by _Share, the
+    array must be deleted before the block is closed
+    """
+
+    name, shape, dtype = spec
+
+    block = shared_memory.SharedMemory(name = name)
+
+    return block, np.ndarray(shape, dtype = np.dtype(dtype), buffer = block.buf)
+
+
+def _RunRows(function, shared_inputs, shared_outputs, start, stop):
+
+    attached = []
+
+    try:
+
+        arrays = []
+
+        # Exact inputs and results have None in place of an errors spec
+        for spec in [spec for pair in shared_inputs for spec in pair] + list(shared_outputs):
+
+            if spec is None:
+
+                arrays.append(None)
+
+                continue
+
+            block, array = _Attached(spec)
+
+            attached.append(block)
+
+            arrays.append(array[start:stop])
+
+        outputs = arrays[-2:]
+
+        inputs = [ValueUncertainty._from_buffers(values, errors) for values, errors in zip(arrays[0:-2:2], arrays[1:-2:2])]
+
+        result = function(*inputs)
+
+        outputs[0][...] = result.values
+
+        if outputs[1] is not None:
+            outputs[1][...] = result.errors
+
+        del arrays, outputs, inputs, result
+
+    finally:
+
+        for block in attached:
+            block.close()
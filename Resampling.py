@@ -0,0 +1,180 @@
+"""
+Houses the bootstrap and jackknife estimates of the spread of statistics
+of ValueUncertainty data, for when the propagated errors and the analytic
+variances cannot be trusted
+
+Resamples are rows of an index matrix into the items (axis 0), gathered
+in batches sized to a memory limit and reduced with one vectorised call
+of the statistic per batch
+"""
+
+from collections import namedtuple
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+ResampleResult = namedtuple('ResampleResult', ["Result", "Estimate", "Std", "Bias", "Replicates", "Percentiles"])
+
+
+def Bootstrap(value_uncertainty, statistic = 'mean', resamples = 1000, percentiles = (2.5, 50, 97.5), seed = None,
+              processes = None, memory_limit = 2**26):
+    """
+    Bootstrap of the statistic over the items (axis 0) of the data, the
+    values only, errors are not resampled. statistic is 'mean', 'sum',
+    'population_variance', 'sample_variance' or a function called with
+    an exact ValueUncertainty of shape (batch, N, ...), one resample per
+    row, that reduces axis 1 and returns a ValueUncertainty or array of
+    shape (batch, ...)
+
+    Returns a ResampleResult: Estimate is the statistic of the data, Std
+    the standard deviation of the Replicates, Result the two as a
+    ValueUncertainty, Bias the mean of the replicates minus the estimate
+    and Percentiles those of the replicates stacked on axis 0
+
+    About memory_limit bytes of resampled data are gathered at a time.
+    processes runs the batches on a process pool, a function statistic
+    then needs to be picklable (defined at module level). The indices of
+    each batch come from a stream of its own spawned from seed, and the
+    batch size follows from memory_limit: a seed repeats the replicates
+    for any processes, while a new memory_limit draws other replicates
+    """
+
+    values = _Values(value_uncertainty)
+
+    statistic = _STATISTICS.get(statistic, statistic)
+
+    batch = _BatchSize(values, values.shape[0], memory_limit)
+
+    tasks = [(statistic, values, min(batch, resamples - start)) for start in range(0, resamples, batch)]
+
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+
+    replicates = _Run(_BootstrapTask, [task + (task_seed,) for task, task_seed in zip(tasks, seeds)], processes)
+
+    estimate = _Evaluate(statistic, values[np.newaxis])[0]
+
+    std = replicates.std(axis = 0, ddof = 1)
+
+    return ResampleResult(ValueUncertainty(estimate, std), estimate, std, replicates.mean(axis = 0) - estimate, replicates,
+                          np.percentile(replicates, percentiles, axis = 0))
+
+
+def Jackknife(value_uncertainty, statistic = 'mean', processes = None, memory_limit = 2**26):
+    """
+    Leave-one-out jackknife of the statistic over the items (axis 0),
+    statistic and processes as for Bootstrap. Std is
+    sqrt((N - 1) / N sum (replicate - replicate mean)^2) and Bias
+    (N - 1) (replicate mean - estimate), Percentiles is None
+    """
+
+    values = _Values(value_uncertainty)
+
+    statistic = _STATISTICS.get(statistic, statistic)
+
+    count = values.shape[0]
+
+    if count < 2:
+        raise ValueError("The jackknife needs at least 2 items")
+
+    batch = _BatchSize(values, count - 1, memory_limit)
+
+    tasks = [(statistic, values, start, min(start + batch, count)) for start in range(0, count, batch)]
+
+    replicates = _Run(_JackknifeTask, tasks, processes)
+
+    estimate = _Evaluate(statistic, values[np.newaxis])[0]
+
+    mean = replicates.mean(axis = 0)
+
+    std = np.sqrt((count - 1) / count * np.square(replicates - mean).sum(axis = 0))
+
+    return ResampleResult(ValueUncertainty(estimate, std), estimate, std, (count - 1) * (mean - estimate), replicates, None)
+
+
+def _Mean(sample):
+    return ValueUncertainty.average(sample, axis = 1)
+
+
+def _Sum(sample):
+    return ValueUncertainty.sum(sample, axis = 1)
+
+
+def _PopulationVariance(sample):
+    return ValueUncertainty.variance(sample, axis = 1)
+
+
+def _SampleVariance(sample):
+    return ValueUncertainty.variance(sample, axis = 1, ddof = 1)
+
+
+_STATISTICS = {
+    'mean': _Mean,
+    'sum': _Sum,
+    'population_variance': _PopulationVariance,
+    'sample_variance': _SampleVariance,
+}
+
+
+def _Values(value_uncertainty):
+
+    values = value_uncertainty.values if isinstance(value_uncertainty, ValueUncertainty) else np.asarray(value_uncertainty)
+
+    if values.ndim == 0 or values.shape[0] == 0:
+        raise ValueError("Resampling needs data with items along axis 0")
+
+    return values
+
+
+def _BatchSize(values, length, memory_limit):
+    """
+    Resamples of length items per batch, leaving room for the gathered
+    data, the index matrix and the temporaries of the statistic
+    """
+
+    return max(1, memory_limit // (length * (values[0].size * values.itemsize * 3 + 8)))
+
+
+def _Evaluate(statistic, samples):
+
+    result = statistic(ValueUncertainty._from_buffers(samples, None))
+
+    return result.values if isinstance(result, ValueUncertainty) else np.asarray(result)
+
+
+def _Run(task_function, tasks, processes):
+    """
+    Replicates of every task concatenated on axis 0, in order
+    """
+
+    if processes is None:
+        results = [task_function(*task) for task in tasks]
+
+    else:
+
+        with ProcessPoolExecutor(max_workers = processes) as pool:
+            results = list(pool.map(task_function, *zip(*tasks)))
+
+    return np.concatenate(results, axis = 0)
+
+
+def _BootstrapTask(statistic, values, count, seed):
+
+    rng = np.random.default_rng(seed)
+
+    indices = rng.integers(0, values.shape[0], (count, values.shape[0]))
+
+    return _Evaluate(statistic, values[indices])
+
+
+def _JackknifeTask(statistic, values, start, stop):
+
+    # Row i lists every item but start + i
+    columns = np.arange(values.shape[0] - 1)
+
+    indices = columns + (columns >= np.arange(start, stop)[:, np.newaxis])
+
+    return _Evaluate(statistic, values[indices])
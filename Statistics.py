@@ -0,0 +1,249 @@
+"""
+Houses the inverse-variance weighted statistics, chi-square tests and
+the group-by aggregation of ValueUncertainty data keyed by integer labels
+
+Groups are reduced with np.bincount for flat data and np.add.reduceat on
+rows sorted by group otherwise, never with a Python loop over groups
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from Error import ValueUncertainty, _axis_count
+
+
+ChiSquareResult = namedtuple('ChiSquareResult', ["ChiSquare", "Degrees", "Reduced"])
+
+
+def WeightedMean(value_uncertainty, axis = None):
+    """
+    Inverse-variance weighted mean along axis, sum(x / e^2) / sum(1 / e^2)
+    with the error 1 / sqrt(sum(1 / e^2)). Every error must be positive
+    """
+
+    weights = _Weights(value_uncertainty)
+
+    total = weights.sum(axis = axis)
+
+    values = (weights * value_uncertainty.values).sum(axis = axis) / total
+
+    return ValueUncertainty._from_buffers(np.atleast_1d(values), np.atleast_1d(1 / np.sqrt(total)))
+
+
+def ChiSquare(value_uncertainty, expected = None, axis = None, parameters = 0):
+    """
+    Chi-square of the data against expected values (a ValueUncertainty,
+    array or number), sum(((x - expected) / e)^2) along axis, with its
+    degrees of freedom N - parameters and the reduced chi-square. The
+    errors of expected are added in quadrature. Without expected the
+    data is tested against its weighted mean, one fitted parameter
+    """
+
+    if expected is None:
+
+        weights = _Weights(value_uncertainty)
+
+        expected = (weights * value_uncertainty.values).sum(axis = axis, keepdims = True) / weights.sum(axis = axis, keepdims = True)
+
+        parameters += 1
+
+    squared_errors = np.square(value_uncertainty.errors)
+
+    if isinstance(expected, ValueUncertainty):
+
+        if not expected.is_exact:
+            squared_errors = squared_errors + np.square(expected.errors)
+
+        expected = expected.values
+
+    if not np.all(squared_errors > 0):
+        raise ValueError("Chi-square needs a positive error on every item")
+
+    chi_square = np.atleast_1d((np.square(value_uncertainty.values - expected) / squared_errors).sum(axis = axis))
+
+    degrees = _axis_count(value_uncertainty.shape, axis) - parameters
+
+    return ChiSquareResult(chi_square, degrees, chi_square / degrees)
+
+
+class GroupBy:
+    """
+    Groups the items (1-D data) or rows (axis 0) of a ValueUncertainty by
+    an integer label per item or row. keys holds the distinct labels in
+    increasing order and counts the size of each group, every reduction
+    returns one result per key along axis 0
+
+        groups = GroupBy(channel, measurements)
+        groups.weighted_mean(), groups.chi_square()
+    """
+
+    def __init__(self, labels, value_uncertainty):
+
+        labels = np.asarray(labels)
+
+        if labels.ndim != 1 or not np.issubdtype(labels.dtype, np.integer):
+            raise TypeError("Group labels must be a 1-D integer array")
+
+        if not isinstance(value_uncertainty, ValueUncertainty):
+            value_uncertainty = ValueUncertainty(np.asarray(value_uncertainty))
+
+        if labels.shape[0] != value_uncertainty.shape[0]:
+            raise ValueError(f"{labels.shape[0]} labels for {value_uncertainty.shape[0]} rows")
+
+        self.data = value_uncertainty
+
+        self.keys, self.groups, self.counts = _GroupIndex(labels)
+
+        # Multidimensional rows are summed with reduceat on the rows
+        # sorted by group, flat data uses bincount directly
+        if value_uncertainty.ndim > 1:
+
+            self._order = np.argsort(self.groups, kind = 'stable')
+
+            self._starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+
+
+    def __len__(self):
+        return len(self.keys)
+
+
+    def sum(self):
+        """
+        Sum of every group, the errors added in quadrature
+        """
+
+        values = self._sum(self.data.values)
+
+        errors = None if self.data.is_exact else np.sqrt(self._sum(np.square(self.data.errors)))
+
+        return ValueUncertainty._from_buffers(values, errors)
+
+
+    def mean(self):
+        """
+        Unweighted mean of every group, as ValueUncertainty.average
+        """
+
+        counts = self._per_row(self.counts)
+
+        values = self._sum(self.data.values) / counts
+
+        errors = None if self.data.is_exact else np.sqrt(self._sum(np.square(self.data.errors))) / counts
+
+        return ValueUncertainty._from_buffers(values, errors)
+
+
+    def weighted_mean(self):
+        """
+        Inverse-variance weighted mean of every group, as WeightedMean
+        """
+
+        weights = _Weights(self.data)
+
+        total = self._sum(weights)
+
+        return ValueUncertainty._from_buffers(self._sum(weights * self.data.values) / total, 1 / np.sqrt(total))
+
+
+    def variance(self, ddof = 0):
+        """
+        Variance of every group with ddof delta degrees of freedom, the
+        errors propagated as ValueUncertainty.variance does
+        """
+
+        counts = self._per_row(self.counts)
+
+        values = self.data.values
+
+        deviations = values - (self._sum(values) / counts)[self.groups]
+
+        squares = np.square(deviations)
+
+        result = self._sum(squares) / (counts - ddof)
+
+        if self.data.is_exact:
+            return ValueUncertainty._from_buffers(result, None)
+
+        squared_errors = np.square(self.data.errors)
+
+        # sum 4 (x - mean)^2 (e^2 + mean error^2) per group
+        mean_squared_errors = self._sum(squared_errors) / np.square(counts)
+
+        spread = 4 * (self._sum(squares * squared_errors) + mean_squared_errors * self._sum(squares))
+
+        return ValueUncertainty._from_buffers(result, np.sqrt(spread) / (counts - ddof))
+
+
+    def chi_square(self, parameters = 0):
+        """
+        ChiSquareResult of every group against its weighted mean, which
+        takes one degree of freedom besides parameters
+        """
+
+        means = self.weighted_mean().values
+
+        terms = np.square((self.data.values - means[self.groups]) / self.data.errors)
+
+        chi_square = self._sum(terms)
+
+        degrees = self._per_row(self.counts) - 1 - parameters
+
+        return ChiSquareResult(chi_square, degrees, chi_square / degrees)
+
+
+    def _sum(self, array):
+        """
+        Sums array (rows matching the data) over the rows of every group
+        """
+
+        if array.ndim == 1:
+            return np.bincount(self.groups, weights = array, minlength = len(self.keys))
+
+        return np.add.reduceat(array[self._order], self._starts, axis = 0)
+
+
+    def _per_row(self, counts):
+        """
+        counts shaped to broadcast against the group results
+        """
+
+        return counts.reshape((-1,) + (1,) * (self.data.ndim - 1))
+
+
+def _Weights(value_uncertainty):
+
+    if value_uncertainty.is_exact:
+        raise ValueError("Weighted statistics need the errors of the data")
+
+    squared_errors = np.square(value_uncertainty.errors)
+
+    # A zero error would give an infinite weight and a nan mean
+    if not np.all(squared_errors > 0):
+        raise ValueError("Weighted statistics need a positive error on every item")
+
+    return 1 / squared_errors
+
+
+def _GroupIndex(labels):
+    """
+    (distinct labels, group number of every label, group sizes). Small
+    non negative labels use a bincount lookup table instead of sorting
+    """
+
+    if len(labels) and labels.min() >= 0 and labels.max() < 4 * len(labels) + 1024:
+
+        counts = np.bincount(labels)
+
+        keys = np.flatnonzero(counts)
+
+        lookup = np.zeros(len(counts), dtype = np.intp)
+
+        lookup[keys] = np.arange(len(keys))
+
+        return keys.astype(labels.dtype), lookup[labels], counts[keys]
+
+    keys, groups, counts = np.unique(labels, return_inverse = True, return_counts = True)
+
+    return keys, groups.reshape(-1), counts
+
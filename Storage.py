@@ -0,0 +1,172 @@
+"""
+Houses the binary storage of ValueUncertainty datasets and the chunked
+CSV reader used to import them
+
+A dataset is saved as a directory holding values.npy, errors.npy (left
+out for exact data) and metadata.json with the variable name, dtypes
+and shape, so loading with mmap_mode maps the arrays instead of reading
+them, or as a single .npz archive holding the same arrays and metadata
+"""
+
+import itertools
+
+import json
+
+import os
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+FORMAT_VERSION = 1
+
+
+def SaveValueUncertainty(path, value_uncertainty, compressed = False):
+    """
+    Saves the values, errors and variable name. A path ending in .npz
+    writes one archive (compressed with zlib if asked), any other path
+    a directory of .npy files that LoadValueUncertainty can memory map
+    """
+
+    metadata = {
+        'format': FORMAT_VERSION,
+        'variable_name': value_uncertainty._variable_name,
+        'shape': list(value_uncertainty.shape),
+        'values_dtype': value_uncertainty.values.dtype.str,
+        'errors_dtype': None if value_uncertainty.is_exact else value_uncertainty.errors.dtype.str,
+    }
+
+    arrays = {'values': value_uncertainty.values}
+
+    if not value_uncertainty.is_exact:
+        arrays['errors'] = value_uncertainty.errors
+
+    if str(path).endswith('.npz'):
+
+        save = np.savez_compressed if compressed else np.savez
+
+        save(path, metadata = np.array(json.dumps(metadata)), **arrays)
+
+        return
+
+    os.makedirs(path, exist_ok = True)
+
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f"{name}.npy"), array)
+
+    errors_path = os.path.join(path, 'errors.npy')
+
+    # Saving exact data over an uncertain dataset must not leave its errors
+    if 'errors' not in arrays and os.path.exists(errors_path):
+        os.remove(errors_path)
+
+    with open(os.path.join(path, 'metadata.json'), 'w') as file:
+        json.dump(metadata, file, indent = 2)
+
+
+def LoadValueUncertainty(path, mmap_mode = None):
+    """
+    Loads a dataset saved by SaveValueUncertainty. For directories
+    mmap_mode ('r', 'r+' or 'c', see np.load) maps the .npy files so the
+    object opens at once and its items are read as they are used, .npz
+    archives are always read into memory
+    """
+
+    if str(path).endswith('.npz'):
+
+        with np.load(path) as archive:
+
+            metadata = json.loads(archive['metadata'].item())
+
+            values = archive['values']
+
+            errors = archive['errors'] if 'errors' in archive.files else None
+
+    else:
+
+        with open(os.path.join(path, 'metadata.json')) as file:
+            metadata = json.load(file)
+
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode = mmap_mode)
+
+        errors = None if metadata['errors_dtype'] is None else np.load(os.path.join(path, 'errors.npy'), mmap_mode = mmap_mode)
+
+    if metadata['format'] > FORMAT_VERSION:
+        raise ValueError(f"{path} was saved in format {metadata['format']}, newer than the supported {FORMAT_VERSION}")
+
+    return ValueUncertainty._from_buffers(values, errors, metadata['variable_name'])
+
+
+def ReadCSV(path, value_column = 0, error_column = 1, delimiter = ',', skip_rows = 0, chunk_rows = 2**16,
+            dtype = np.float64, out = None, variable_name = ''):
+    """
+    Reads a value column and an error column (None for exact data) of a
+    CSV file chunk_rows lines at a time into preallocated buffers, so the
+    memory used besides the result is one chunk. The buffers are allocated
+    after counting the lines, or given as out = (values, errors), e.g.
+    arrays made with np.lib.format.open_memmap to convert a file larger
+    than memory straight into a dataset directory. Empty lines are skipped
+    """
+
+    columns = [value_column] if error_column is None else [value_column, error_column]
+
+    if out is None:
+
+        rows = _CountRows(path, skip_rows)
+
+        out = (np.empty(rows, dtype = dtype), None if error_column is None else np.empty(rows, dtype = dtype))
+
+    values, errors = out
+
+    filled = 0
+
+    with open(path) as file:
+
+        lines = (line for line in itertools.islice(file, skip_rows, None) if line.strip())
+
+        while True:
+
+            chunk = list(itertools.islice(lines, chunk_rows))
+
+            if not chunk:
+                break
+
+            if filled + len(chunk) > len(values):
+                raise ValueError(f"{path} has more than the {len(values)} rows of the given buffers")
+
+            data = np.loadtxt(chunk, delimiter = delimiter, usecols = columns, dtype = dtype, ndmin = 2)
+
+            values[filled:filled + len(chunk)] = data[:, 0]
+
+            if errors is not None:
+                errors[filled:filled + len(chunk)] = np.abs(data[:, 1])
+
+            filled += len(chunk)
+
+    return ValueUncertainty._from_buffers(values[:filled], None if errors is None else errors[:filled], variable_name)
+
+
+def _CountRows(path, skip_rows):
+    """
+    Lines after the first skip_rows, counted on binary blocks. Empty
+    lines are counted too, so this is an upper bound on the data rows
+    """
+
+    with open(path, 'rb') as file:
+
+        for _ in range(skip_rows):
+            file.readline()
+
+        rows = 0
+
+        last = b'\n'
+
+        for block in iter(lambda: file.read(2**20), b''):
+
+            rows += block.count(b'\n')
+
+            last = block[-1:]
+
+    # The last line may have no newline
+    return rows + (last != b'\n')
@@ -0,0 +1,224 @@
+"""
+Houses the streaming accumulator of mean and variance, for datasets that
+arrive in chunks too large to hold as one ValueUncertainty
+"""
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+class RunningStatistics:
+    """
+    Single pass mean, variance and standard error of ValueUncertainty
+    chunks in constant memory. With axis None every item is pooled, with
+    axis 0 the chunks are stacks of rows and the statistics are per item
+    of a row. Accumulators of separate shards (e.g. built in worker
+    processes, they pickle) are combined with merge
+
+    Chunks are reduced with numpy and folded into the running state with
+    the pairwise update of Chan, Golub and LeVeque, which also carries
+    the error sums the variance errors need. Results are the same as
+    ValueUncertainty.average and variance on the whole dataset:
+
+        sum e^2,  sum (x - mean) e^2  and  sum (x - mean)^2 e^2
+
+    are kept about the running mean, so the errors of the deviations
+    need no second pass
+    """
+
+    def __init__(self, axis = None):
+
+        if axis not in (None, 0):
+            raise ValueError("RunningStatistics reduces over all items (axis None) or rows (axis 0)")
+
+        self.axis = axis
+
+        self.count = 0
+
+        self.exact = True
+
+        # Running mean, sum of squared deviations and the error sums,
+        # made on the first update with the shape of a result
+        self._mean = self._m2 = self._e2 = self._e2_deviation = self._e2_m2 = None
+
+
+    def update(self, chunk):
+        """
+        Adds a chunk, a ValueUncertainty or an array taken as exact, and
+        returns self
+        """
+
+        if not isinstance(chunk, ValueUncertainty):
+            chunk = ValueUncertainty(np.asarray(chunk))
+
+        values = chunk.values if self.axis == 0 else chunk.values.reshape(-1)
+
+        if values.shape[0] == 0:
+            return self
+
+        count = values.shape[0]
+
+        mean = values.mean(axis = 0)
+
+        deviations = values - mean
+
+        self.exact = self.exact and chunk.is_exact
+
+        if chunk.is_exact:
+            e2 = e2_deviation = e2_m2 = np.zeros_like(mean, dtype = np.float64)
+
+        else:
+
+            squared_errors = np.square(chunk.errors if self.axis == 0 else chunk.errors.reshape(-1))
+
+            e2 = squared_errors.sum(axis = 0)
+
+            e2_deviation = (deviations * squared_errors).sum(axis = 0)
+
+            e2_m2 = (np.square(deviations) * squared_errors).sum(axis = 0)
+
+        np.square(deviations, out = deviations)
+
+        self._combine(count, mean, deviations.sum(axis = 0), e2, e2_deviation, e2_m2)
+
+        return self
+
+
+    def merge(self, other):
+        """
+        Adds the data of another accumulator with the same axis and
+        returns self
+        """
+
+        if other.axis != self.axis:
+            raise ValueError("Cannot merge accumulators reducing over different axes")
+
+        if other.count:
+
+            self.exact = self.exact and other.exact
+
+            self._combine(other.count, other._mean, other._m2, other._e2, other._e2_deviation, other._e2_m2)
+
+        return self
+
+
+    @property
+    def mean(self):
+        """
+        Unweighted mean, the error is the quadrature sum of the errors
+        divided by the number of items
+        """
+
+        self._check()
+
+        return ValueUncertainty._from_buffers(np.atleast_1d(self._mean).copy(), None if self.exact else np.atleast_1d(np.sqrt(self._e2) / self.count))
+
+
+    @property
+    def sum(self):
+
+        self._check()
+
+        return ValueUncertainty._from_buffers(np.atleast_1d(self._mean * self.count), None if self.exact else np.atleast_1d(np.sqrt(self._e2)))
+
+
+    @property
+    def population_variance(self):
+        return self.variance(ddof = 0)
+
+
+    @property
+    def sample_variance(self):
+        return self.variance(ddof = 1)
+
+
+    @property
+    def standard_error(self):
+        """
+        Standard error of the mean, sqrt(sample_variance / N)
+        """
+
+        variance = self.sample_variance
+
+        values = np.sqrt(variance.values / self.count)
+
+        errors = None if variance.is_exact else variance.errors / (2 * self.count * values)
+
+        return ValueUncertainty._from_buffers(values, errors)
+
+
+    def variance(self, ddof = 0):
+        """
+        Variance with ddof delta degrees of freedom, errors propagated
+        as ValueUncertainty.variance does
+        """
+
+        self._check()
+
+        values = np.atleast_1d(self._m2 / (self.count - ddof))
+
+        if self.exact:
+            return ValueUncertainty._from_buffers(values, None)
+
+        # sum 4 (x - mean)^2 (e^2 + mean error^2)
+        squares = 4 * (self._e2_m2 + self._e2 / self.count**2 * self._m2)
+
+        return ValueUncertainty._from_buffers(values, np.atleast_1d(np.sqrt(squares) / (self.count - ddof)))
+
+
+    def _combine(self, count, mean, m2, e2, e2_deviation, e2_m2):
+        """
+        Folds the state of count items about their own mean into the
+        running state, both shifted to the combined mean
+        """
+
+        if self.count == 0:
+
+            self.count = count
+
+            self._mean, self._m2, self._e2, self._e2_deviation, self._e2_m2 = [np.array(item, dtype = np.float64) for item in (mean, m2, e2, e2_deviation, e2_m2)]
+
+            return
+
+        total = self.count + count
+
+        delta = mean - self._mean
+
+        # Shifts of the two means to the combined mean
+        shift = delta * (count / total)
+
+        other_shift = shift - delta
+
+        self._m2 = self._m2 + m2 + np.square(delta) * (self.count * count / total)
+
+        self._e2_m2 = (self._e2_m2 - 2 * shift * self._e2_deviation + np.square(shift) * self._e2
+                       + e2_m2 - 2 * other_shift * e2_deviation + np.square(other_shift) * e2)
+
+        self._e2_deviation = self._e2_deviation - shift * self._e2 + e2_deviation - other_shift * e2
+
+        self._e2 = self._e2 + e2
+
+        self._mean = self._mean + shift
+
+        self.count = total
+
+
+    def _check(self):
+
+        if self.count == 0:
+            raise ValueError("No data has been added to the accumulator")
+
+
+def Accumulate(chunks, axis = None):
+    """
+    RunningStatistics of an iterable of chunks, e.g. a generator reading
+    a file piece by piece
+    """
+
+    statistics = RunningStatistics(axis)
+
+    for chunk in chunks:
+        statistics.update(chunk)
+
+    return statistics
@@ -2,7 +2,9 @@
 Houses functions that work to create the latex formatting 
 """
 
-from collections import namedtuple
+import re
+
+from collections import Counter, namedtuple
 
 
 def CreateVariableValues(*variable_value_pairs):
@@ -25,41 +27,100 @@ def CreateValueUncertainties(*value_error_pairs):
 def LatexCreator(current_str: str, variable_dict : dict):
 
     """
-    Recursive function that takes in a string with variables
-    and replaces the variables with their corresponding values
-    by indexing into the dictionary
+    Takes in a string with variables (@n#) and expands them one at a
+    time, leftmost first, with the variable strings in the dictionary.
+    Before every expansion the string is written out with all variables
+    replaced by their numeric strings
+
+    Returns a list of latex strings, starting from the numeric result
 
-    Returns a list of latex strings
+    The strings are kept as token lists where the variables are ints, so
+    each line is built in one pass over its tokens rather than rescanning
+    and replacing the whole string for every variable, and there is no
+    recursion limit on the number of captured operations
 
     Used internally in the program
     """
 
-    start_ind = current_str.find("@")
+    entries = {int(key[1:-1]): value for key, value in variable_dict.items()}
 
-    if start_ind == -1:
-        return ['$' + current_str + '$'] # Need to put something here
-    
-    else:
+    numeric = lambda token: entries[token][1] if type(token) is int else token
+
+    tokens = _TokenizeVariables(current_str)
+
+    # numerics mirrors tokens with the variables already replaced by
+    # their numeric strings so each line is a single join
+    numerics = list(map(numeric, tokens))
+
+    counts = Counter(token for token in tokens if type(token) is int)
+
+    lines = []
+
+    position = 0
+
+    while True:
+
+        while position < len(tokens) and type(tokens[position]) is not int:
+            position += 1
+
+        lines.append('$' + ''.join(numerics) + '$')
+
+        if position == len(tokens):
+            return lines
+
+        variable = tokens[position]
+
+        expansion = _TokenizeVariables(entries[variable][0])
 
-        end_ind = current_str.find('#')
+        expansion_numerics = list(map(numeric, expansion))
 
-        dict_value = variable_dict[current_str[start_ind:end_ind+1]]
+        occurrences = counts.pop(variable)
 
-        result_str = current_str.replace(current_str[start_ind:end_ind+1], dict_value[1])
+        if occurrences == 1:
 
-        while result_str.find('@') != -1:
+            tokens[position:position + 1] = expansion
 
-            next_start = result_str.find('@')
+            numerics[position:position + 1] = expansion_numerics
 
-            next_end = result_str.find('#')
+        else:
 
-            next_var = result_str[next_start:next_end + 1]
+            # The variable is used more than once, every use is expanded
+            expanded, expanded_numerics = tokens[:position], numerics[:position]
 
-            result_str = result_str.replace(next_var, variable_dict[next_var][1])
+            for token, numeric_token in zip(tokens[position:], numerics[position:]):
+
+                if token == variable:
+
+                    expanded.extend(expansion)
+
+                    expanded_numerics.extend(expansion_numerics)
+
+                else:
+
+                    expanded.append(token)
+
+                    expanded_numerics.append(numeric_token)
+
+            tokens, numerics = expanded, expanded_numerics
+
+        for token in expansion:
+
+            if type(token) is int:
+                counts[token] += occurrences
+
+
+_VARIABLE_PATTERN = re.compile(r'@(\d+)#')
+
+
+def _TokenizeVariables(string):
+    """
+    Splits a string into its text and its variables, the variable
+    @n# becomes the int n
+    """
 
-        variable_str = current_str.replace(current_str[start_ind:end_ind+1], dict_value[0])
+    parts = _VARIABLE_PATTERN.split(string)
 
-        return ['$' + result_str + '$'] + LatexCreator(variable_str, variable_dict)
+    return [int(part) if i % 2 else part for i, part in enumerate(parts) if part != '' or i % 2]
     
 
 def ErrorBeginning2Items(operation, item1, item2):
@@ -232,4 +293,5 @@ def CreateErrorLatexString(operation, error_result, *value_error_pairs):
                 return ErrorBeginning1Item(format_func, item1) + f"\\text{{, Error}} = {item1.Error} * e^{{{item1.Value}}} \\approx {error_result}"
 
             case 'log':
-                pass
\ No newline at end of file
+                format_func = lambda x: f"\\log{{{x}}}"
+                return ErrorBeginning1Item(format_func, item1) + f"\\text{{, Error }} = \\frac{{{item1.Error}}}{{{item1.Value}}} \\approx {error_result}"
@@ -0,0 +1,10 @@
+"""
+Puts the package directory on the path, the modules import each other
+by their top level names
+"""
+
+import os
+
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
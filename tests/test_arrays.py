@@ -0,0 +1,51 @@
+"""
+Tests of N-dimensional data and broadcasting
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+
+def test_operations_broadcast():
+
+    rows = ValueUncertainty(np.arange(3.0).reshape(3, 1), np.full((3, 1), 0.1))
+
+    columns = ValueUncertainty(np.arange(1.0, 5.0), np.full(4, 0.2))
+
+    result = rows * columns
+
+    assert result.shape == (3, 4)
+
+    np.testing.assert_allclose(result.values, rows.values * columns.values)
+
+    expected = np.sqrt(np.square(rows.errors * columns.values) + np.square(rows.values * columns.errors))
+
+    np.testing.assert_allclose(result.errors, expected)
+
+    with pytest.raises(ValueError):
+        columns + ValueUncertainty(np.arange(3.0))
+
+
+def test_reshape_and_iteration():
+
+    data = ValueUncertainty(np.arange(12.0), np.full(12, 0.1)).reshape(3, 4)
+
+    assert data.shape == (3, 4) and data.ndim == 2 and data.size == 12 and len(data) == 3
+
+    rows = list(data)
+
+    assert len(rows) == 3 and rows[1].shape == (4,)
+
+    np.testing.assert_array_equal(data.T.values, data.values.T)
+
+
+def test_standard_error_counts_every_item():
+
+    values = np.arange(12.0).reshape(3, 4)
+
+    result = ValueUncertainty(values, np.full((3, 4), 0.1)).standard_error
+
+    np.testing.assert_allclose(result.values, values.std(ddof = 1) / np.sqrt(12))
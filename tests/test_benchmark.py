@@ -0,0 +1,50 @@
+"""
+Tests of the benchmark suite and its runner
+"""
+
+import pytest
+
+from Benchmark import Benchmarks, CompareResults, LoadResults, RunBenchmarks, SaveResults, main
+
+
+def test_every_benchmark_runs():
+
+    benchmarks = list(Benchmarks(sizes = [2], capture_lengths = [3], latex_lengths = [3]))
+
+    assert len({name for name, _ in benchmarks}) == len(benchmarks)
+
+    for name, function in benchmarks:
+        function()
+
+
+def test_results_round_trip(tmp_path):
+
+    results = RunBenchmarks('operator/add/1', repeat = 1, min_time = 0.001, sizes = [1])
+
+    assert list(results) == ['operator/add/1'] and results['operator/add/1'] > 0
+
+    SaveResults(results, tmp_path / 'results.json')
+
+    assert LoadResults(tmp_path / 'results.json') == results
+
+
+def test_regressions_are_flagged():
+
+    comparison = CompareResults({'a': 1.0, 'b': 1.2, 'c': 1.0}, {'a': 1.0, 'b': 0.5}, threshold = 0.25)
+
+    assert [(name, regression) for name, *_, regression in comparison] == [('a', False), ('b', True)]
+
+    assert comparison[1][3] == pytest.approx(2.4)
+
+
+def test_runner_exits_with_the_regressions(tmp_path, capsys):
+
+    arguments = ['--filter', 'operator/add/1', '--sizes', '1', '--repeat', '1', '--min-time', '0.001']
+
+    assert main(arguments + ['--output', str(tmp_path / 'results.json')]) == 0
+
+    SaveResults({'operator/add/1': 1e-12}, tmp_path / 'fast.json')
+
+    assert main(arguments + ['--baseline', str(tmp_path / 'fast.json')]) == 1
+
+    assert 'REGRESSION' in capsys.readouterr().out
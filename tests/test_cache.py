@@ -0,0 +1,52 @@
+"""
+Tests of the cached summary statistics
+"""
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+def _Data():
+    return ValueUncertainty(np.arange(1.0, 5.0), np.full(4, 0.1))
+
+
+def test_statistics_are_computed_once():
+
+    data = _Data()
+
+    assert data.mean is data.mean
+
+    assert data.sample_variance is data.sample_variance
+
+    np.testing.assert_allclose(data.mean.values, [2.5])
+
+    np.testing.assert_allclose(data.sample_variance.values, [np.var(data.values, ddof = 1)])
+
+
+def test_changes_invalidate_the_cache():
+
+    data = _Data()
+
+    for change in (lambda: data.__setitem__(0, 5.0), lambda: setattr(data, 'values', np.arange(4.0)), lambda: data.__iadd__(1)):
+
+        mean = data.mean
+
+        change()
+
+        assert data.mean is not mean
+
+        np.testing.assert_allclose(data.mean.values, [data.values.mean()])
+
+
+def test_writes_through_views_invalidate_the_base():
+
+    data = _Data()
+
+    mean = data.mean
+
+    data[1:3][0] = 10.0
+
+    assert data.mean is not mean
+
+    np.testing.assert_allclose(data.mean.values, [(1 + 10 + 3 + 4) / 4])
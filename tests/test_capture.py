@@ -0,0 +1,181 @@
+"""
+Tests of the calculation capture sessions and their LaTeX derivations
+"""
+
+import threading
+
+import numpy as np
+
+from Capture import current_capture
+
+from Error import ValueUncertainty
+
+from Utilities import LatexCreator
+
+
+def test_references_are_scoped_to_their_session():
+
+    x = ValueUncertainty(2.0, 0.1, 'x')
+
+    with ValueUncertainty.CalcCapture() as first:
+        y = x * 2
+
+    with ValueUncertainty.CalcCapture() as second:
+        y + 1
+
+    assert first.latex_list[0] == '$x * 2$'
+
+    assert second.latex_list == ['$4.0 + 1$', '$4.0 + 1$', '$5.0$']
+
+
+def test_starting_again_restarts_the_capture():
+
+    x = ValueUncertainty(2.0, 0.1, 'x')
+
+    ValueUncertainty.StartCalcCapture()
+
+    x * 2
+
+    ValueUncertainty.StartCalcCapture()
+
+    x + 1
+
+    latex_list, _ = ValueUncertainty.EndCalcCapture()
+
+    assert latex_list == ['$x + 1$', '$2.0 + 1$', '$3.0$']
+
+    assert current_capture.get() is None
+
+
+def test_nested_sessions_end_in_order():
+
+    x = ValueUncertainty(2.0, 0.1, 'x')
+
+    with ValueUncertainty.CalcCapture() as outer:
+
+        x * 2
+
+        with ValueUncertainty.CalcCapture() as inner:
+            x + 1
+
+        x - 1
+
+    assert len(outer) == 2 and len(inner) == 1
+
+    assert current_capture.get() is None
+
+
+def test_threads_do_not_see_each_others_captures():
+
+    x = ValueUncertainty(2.0, 0.1, 'x')
+
+    lengths = []
+
+    def work():
+
+        with ValueUncertainty.CalcCapture() as capture:
+
+            for _ in range(100):
+                x * 2
+
+        lengths.append(len(capture))
+
+    threads = [threading.Thread(target = work) for _ in range(4)]
+
+    with ValueUncertainty.CalcCapture() as main:
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+    assert lengths == [100] * 4 and len(main) == 0
+
+
+def test_renderer_expands_variables_leftmost_first():
+
+    variables = {'@1#': ('x * 2', '2.0 * 2'), '@2#': ('@1# + y', '4.0 + 1.0'), '@3#': ('@2#', '5.0'), '@4#': ('@3#', '')}
+
+    assert LatexCreator('@3#', variables) == ['$5.0$', '$4.0 + 1.0$', '$2.0 * 2 + y$', '$x * 2 + y$']
+
+
+def test_long_derivations_have_no_recursion_limit():
+
+    x = ValueUncertainty(1.0, 0.1, 'x')
+
+    with ValueUncertainty.CalcCapture() as capture:
+
+        y = x
+
+        for _ in range(3000):
+            y = y + 1
+
+    assert len(capture.latex_list) == 3002
+
+    assert capture.latex_list[0] == '$x' + ' + 1' * 3000 + '$'
+
+    assert capture.latex_list[-1] == '$3001.0$'
+
+
+def test_division_renders_as_a_fraction():
+
+    x, y = ValueUncertainty(3.0, 0.1, 'x'), ValueUncertainty(2.0, 0.1, 'y')
+
+    with ValueUncertainty.CalcCapture() as capture:
+        (x + 1) / y
+
+    assert capture.latex_list[0] == '$\\frac{x + 1}{y}$'
+
+    assert capture.latex_list[-1] == '$2.0$'
+
+
+def test_operations_are_kept_on_the_tape():
+
+    x = ValueUncertainty(2.0, 0.1, 'x')
+
+    with ValueUncertainty.CalcCapture() as capture:
+        result = ValueUncertainty.sin(x) * 3 - 1
+
+    assert len(capture) == 3
+
+    assert capture.inputs == [('x', 2.0, 0.1), ('3', 3, 0), ('1', 1, 0)]
+
+    # Entry 1 is sin of input 1, entry 2 multiplies entry 1 by input 2
+    assert list(capture.operands) == [-1, 0, 1, -2, 2, -3]
+
+    assert capture.result == (result.value, result.error)
+
+    assert len(capture.error_operations) == 3
+
+
+def test_captured_integers_render_as_given():
+
+    x = ValueUncertainty(np.array([2]), np.array([1]), 'x')
+
+    with ValueUncertainty.CalcCapture() as capture:
+        x * 3
+
+    assert capture.latex_list == ['$x * 3$', '$2 * 3$', '$6$']
+
+
+def test_final_result_comes_from_the_tape():
+
+    x = ValueUncertainty(2.5, 0.1, '\\alpha_{1}')
+
+    ValueUncertainty.StartCalcCapture()
+
+    result = ValueUncertainty.exp(x) / 3
+
+    latex_list, _ = ValueUncertainty.EndCalcCapture()
+
+    assert latex_list[0] == '$\\frac{e^{\\alpha_{1}}}{3}$'
+
+    assert latex_list[-1] == f"${result.value}$"
+
+
+def test_empty_capture():
+
+    ValueUncertainty.StartCalcCapture()
+
+    assert ValueUncertainty.EndCalcCapture() == ([], [])
@@ -0,0 +1,63 @@
+"""
+Tests of building ValueUncertainty objects from numbers, iterables and
+arrays
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+
+def test_arrays_are_adopted_without_copying():
+
+    values, errors = np.arange(3.0), np.full(3, 0.1)
+
+    result = ValueUncertainty(values, errors)
+
+    assert result.values is values and result.errors is errors
+
+    copied = ValueUncertainty(values, errors, copy = True)
+
+    assert not np.may_share_memory(copied.values, values) and not np.may_share_memory(copied.errors, errors)
+
+
+def test_dtype_casts_both_buffers():
+
+    result = ValueUncertainty(np.arange(3.0), np.full(3, 0.1), dtype = np.float32)
+
+    assert result.values.dtype == np.float32 and result.errors.dtype == np.float32
+
+
+def test_errors_are_made_positive_and_broadcast():
+
+    values = np.arange(3.0)
+
+    negative = ValueUncertainty(values, np.array([-0.1, 0.2, -0.3]))
+
+    np.testing.assert_array_equal(negative.errors, [0.1, 0.2, 0.3])
+
+    np.testing.assert_array_equal(ValueUncertainty(values, 0.5).errors, [0.5, 0.5, 0.5])
+
+    with pytest.raises(ValueError):
+        ValueUncertainty(values, np.full(2, 0.1))
+
+
+def test_iterables_and_exact_data():
+
+    np.testing.assert_array_equal(ValueUncertainty(range(3)).values, [0, 1, 2])
+
+    np.testing.assert_array_equal(ValueUncertainty(x * 0.5 for x in range(3)).values, [0.0, 0.5, 1.0])
+
+    assert ValueUncertainty([1, 2], 0).is_exact and ValueUncertainty([1, 2], []).is_exact
+
+    with pytest.raises(ValueError):
+        ValueUncertainty('a', 0.1)
+
+
+def test_variable_names():
+
+    assert ValueUncertainty([2.0, 3.0], variable_name = 'x')._variable_name == 'x'
+
+    assert ValueUncertainty([2.0, 3.0])._variable_name == '2.0'
@@ -0,0 +1,70 @@
+"""
+Tests of correlation tracking, see ValueUncertainty.StartCorrelationTracking
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+
+@pytest.fixture
+def tracking():
+
+    ValueUncertainty.StartCorrelationTracking()
+
+    yield
+
+    ValueUncertainty.EndCorrelationTracking()
+
+
+def _Data():
+    return ValueUncertainty(np.array([1.0, 2.0, 3.0]), np.array([0.1, 0.2, 0.3]))
+
+
+def test_shared_inputs_cancel(tracking):
+
+    x = _Data()
+
+    np.testing.assert_allclose((x - x).errors, 0.0, atol = 1e-15)
+
+    np.testing.assert_allclose((x + x).errors, 2 * x.errors)
+
+    np.testing.assert_allclose((x * x).errors, 2 * x.values * x.errors)
+
+
+def test_independent_inputs_add_in_quadrature(tracking):
+
+    x, y = _Data(), _Data()
+
+    np.testing.assert_allclose((x - y).errors, np.sqrt(2) * x.errors)
+
+
+def test_reductions_keep_correlations(tracking):
+
+    x = _Data()
+
+    total = ValueUncertainty.sum(x)
+
+    np.testing.assert_allclose((total - x[0]).errors, [np.sqrt(0.2**2 + 0.3**2)])
+
+    np.testing.assert_allclose((x.mean * 3 - total).errors, 0.0, atol = 1e-15)
+
+
+def test_covariance(tracking):
+
+    x = _Data()
+
+    y = 2 * x + 1
+
+    np.testing.assert_allclose(ValueUncertainty.covariance(x, y), np.diag(2 * np.square(x.errors)))
+
+    np.testing.assert_allclose(ValueUncertainty.covariance(x, x[::-1]), np.fliplr(np.diag(np.square(x.errors))))
+
+
+def test_untracked_operations_are_independent():
+
+    x = _Data()
+
+    np.testing.assert_allclose((x - x).errors, np.sqrt(2) * x.errors)
@@ -0,0 +1,57 @@
+"""
+Tests of exact values, which hold no errors buffer
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+from Parallel import ParallelMap
+
+
+def _Square(x):
+    return x * x
+
+
+def test_exact_values_hold_no_errors():
+
+    exact = ValueUncertainty(np.arange(4.0))
+
+    assert exact.is_exact and exact._errors is None
+
+    np.testing.assert_array_equal(exact.errors, np.zeros(4))
+
+    with pytest.raises(ValueError):
+        exact.errors[0] = 1.0
+
+
+def test_exact_operations_stay_exact():
+
+    exact = ValueUncertainty(np.arange(1.0, 5.0))
+
+    for result in (exact * 2 + exact, ValueUncertainty.sin(exact), exact ** 2 / 3, ValueUncertainty.sum(exact), exact.mean):
+        assert result._errors is None
+
+
+def test_mixed_operations_use_the_uncertain_errors():
+
+    exact = ValueUncertainty(np.arange(1.0, 5.0))
+
+    uncertain = ValueUncertainty(np.full(4, 2.0), np.full(4, 0.1))
+
+    np.testing.assert_allclose((exact + uncertain).errors, uncertain.errors)
+
+    np.testing.assert_allclose((exact * uncertain).errors, exact.values * uncertain.errors)
+
+
+def test_parallel_map_keeps_exact_results_exact():
+
+    exact = ParallelMap(_Square, np.arange(20.0), processes = 2)
+
+    assert exact.is_exact and exact._errors is None
+
+    uncertain = ParallelMap(_Square, ValueUncertainty(np.arange(20.0), np.full(20, 0.1)), processes = 2)
+
+    np.testing.assert_array_equal(uncertain.errors, _Square(ValueUncertainty(np.arange(20.0), np.full(20, 0.1))).errors)
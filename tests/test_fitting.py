@@ -0,0 +1,106 @@
+"""
+Tests of the weighted least-squares fits against np.polyfit
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+from Fitting import EvaluateFit, FitLinear, FitPolynomial
+
+
+def _Data(degree = 2, datasets = ()):
+
+    rng = np.random.default_rng(3)
+
+    x = np.linspace(-1.0, 4.0, 12)
+
+    errors = rng.uniform(0.05, 0.3, datasets + (12,))
+
+    values = np.polyval(np.arange(1.0, degree + 2), x) + rng.normal(0, errors)
+
+    return x, ValueUncertainty(values, errors)
+
+
+@pytest.mark.parametrize('degree', [1, 2, 3])
+def test_fit_matches_polyfit(degree):
+
+    x, y = _Data(degree)
+
+    fit = FitPolynomial(x, y, degree)
+
+    parameters, covariance = np.polyfit(x, y.values, degree, w = 1 / y.errors, cov = 'unscaled')
+
+    np.testing.assert_allclose(fit.Parameters.values, parameters[::-1], rtol = 1e-9)
+
+    np.testing.assert_allclose(fit.Covariance, covariance[::-1, ::-1], rtol = 1e-8, atol = 1e-14)
+
+    np.testing.assert_allclose(fit.Parameters.errors, np.sqrt(np.diag(covariance))[::-1], rtol = 1e-9)
+
+    residuals = (y.values - np.polyval(parameters, x)) / y.errors
+
+    np.testing.assert_allclose(fit.ChiSquare, np.square(residuals).sum())
+
+    assert fit.Degrees == len(x) - degree - 1
+
+
+def test_batched_fits_match_single_fits():
+
+    x, y = _Data(1, (2, 3))
+
+    fit = FitLinear(x, y)
+
+    for index in np.ndindex(2, 3):
+
+        single = FitLinear(x, ValueUncertainty(y.values[index], y.errors[index]))
+
+        np.testing.assert_allclose(fit.Parameters.values[index], single.Parameters.values)
+
+        np.testing.assert_allclose(fit.Covariance[index], single.Covariance)
+
+
+def test_exact_data_scales_the_covariance():
+
+    x, y = _Data(1)
+
+    fit = FitLinear(x, ValueUncertainty(y.values))
+
+    parameters, covariance = np.polyfit(x, y.values, 1, cov = True)
+
+    np.testing.assert_allclose(fit.Covariance, covariance[::-1, ::-1], rtol = 1e-8)
+
+
+def test_integer_x():
+
+    x, y = _Data(1)
+
+    fit = FitLinear(ValueUncertainty(np.arange(12)), y)
+
+    np.testing.assert_allclose(fit.Parameters.values, FitLinear(np.arange(12.0), y).Parameters.values)
+
+    evaluated = EvaluateFit(fit, ValueUncertainty(np.arange(3)))
+
+    np.testing.assert_allclose(evaluated.values, fit.Parameters.values[0] + fit.Parameters.values[1] * np.arange(3))
+
+
+def test_evaluated_errors_use_the_full_covariance():
+
+    x, y = _Data(1)
+
+    fit = FitLinear(x, y)
+
+    evaluated = EvaluateFit(fit, 2.0)
+
+    covariance = fit.Covariance
+
+    expected = np.sqrt(covariance[0, 0] + 4 * covariance[0, 1] + 4 * covariance[1, 1])
+
+    np.testing.assert_allclose(evaluated.errors, [expected])
+
+
+def test_too_few_points():
+
+    with pytest.raises(ValueError):
+        FitPolynomial([1.0, 2.0], ValueUncertainty([1.0, 2.0], [0.1, 0.1]), 2)
@@ -0,0 +1,99 @@
+"""
+Tests of the formula compiler
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+from Formula import CompileFormula
+
+
+def _Formula(x, y):
+    return ValueUncertainty.sin(x) * y + x / y
+
+
+def _Inputs():
+
+    x = ValueUncertainty(np.linspace(0.1, 2.0, 50), np.full(50, 0.01))
+
+    y = ValueUncertainty(np.linspace(1.0, 3.0, 50), np.linspace(0.02, 0.05, 50))
+
+    return x, y
+
+
+def test_compiled_matches_eager():
+
+    x, y = _Inputs()
+
+    result = CompileFormula(_Formula, x, y)(x, y)
+
+    expected = _Formula(x, y)
+
+    np.testing.assert_allclose(result.values, expected.values, rtol = 1e-13)
+
+    np.testing.assert_allclose(result.errors, expected.errors, rtol = 1e-13)
+
+
+def test_variables_by_name_and_constants():
+
+    x, y = _Inputs()
+
+    formula = CompileFormula(lambda x, y: x * 2 + ValueUncertainty(2.0, 0.1) / y)
+
+    assert formula.variables == ['x', 'y']
+
+    result = formula(y = y, x = x)
+
+    expected = x * 2 + ValueUncertainty(2.0, 0.1) / y
+
+    np.testing.assert_allclose(result.values, expected.values)
+
+    np.testing.assert_allclose(result.errors, expected.errors)
+
+
+def test_compiled_results_do_not_share_input_buffers():
+
+    x = ValueUncertainty(np.arange(-2.0, 3.0), np.full(5, 0.1))
+
+    for function in (abs, lambda x: x + 0, lambda x: x * 2, lambda x: x):
+
+        result = CompileFormula(function, ValueUncertainty(1.0, 0.1))(x)
+
+        assert not np.may_share_memory(result.values, x.values)
+
+        assert not np.may_share_memory(result.errors, x.errors)
+
+
+def test_returning_a_parameter_compiles_to_it():
+
+    x, y = _Inputs()
+
+    result = CompileFormula(lambda x, y: y)(x, y)
+
+    np.testing.assert_array_equal(result.values, y.values)
+
+    np.testing.assert_array_equal(result.errors, y.errors)
+
+
+@pytest.mark.parametrize('function', [
+    lambda x: ValueUncertainty.sum(x) * 2 + x,
+    lambda x: x.mean * x,
+    lambda x: ValueUncertainty.variance(x) + x,
+    lambda x: x[0] * x,
+    lambda x: ValueUncertainty(np.array([1.0, 2.0])).reshape(2, 1)[0] * x,
+])
+def test_unrecorded_operations_are_refused(function):
+
+    with pytest.raises(ValueError, match = 'did not record'):
+        CompileFormula(function, ValueUncertainty(1.0, 0.1))
+
+
+def test_results_from_outside_the_capture_are_refused():
+
+    outside = ValueUncertainty(3.0, 0.1) * 2
+
+    with pytest.raises(ValueError, match = 'did not record'):
+        CompileFormula(lambda x: x * outside)
@@ -0,0 +1,100 @@
+"""
+Tests of the in-place operators and the out= argument of the math
+functions
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+
+def _Formula(x, y):
+    return ValueUncertainty.sin(x) * y + x / y
+
+
+def _Inputs():
+
+    x = ValueUncertainty(np.linspace(0.1, 2.0, 50), np.full(50, 0.01))
+
+    y = ValueUncertainty(np.linspace(1.0, 3.0, 50), np.linspace(0.02, 0.05, 50))
+
+    return x, y
+
+
+def _AssertSame(result, expected):
+
+    np.testing.assert_allclose(result.values, expected.values, rtol = 1e-13)
+
+    np.testing.assert_allclose(result.errors, expected.errors, rtol = 1e-13)
+
+
+def test_in_place_and_out_match_eager():
+
+    x, y = _Inputs()
+
+    result = ValueUncertainty(x.values.copy(), x.errors.copy())
+
+    ValueUncertainty.sin(result, out = result)
+
+    result *= y
+
+    result += x / y
+
+    _AssertSame(result, _Formula(x, y))
+
+    _AssertSame(x, _Inputs()[0])
+
+
+@pytest.mark.parametrize('operation', ['__iadd__', '__isub__', '__imul__', '__itruediv__'])
+def test_in_place_operators_write_into_the_buffers(operation):
+
+    x, y = _Inputs()
+
+    expected = getattr(x, operation.replace('__i', '__'))(y)
+
+    buffers = x.values, x.errors
+
+    result = getattr(x, operation)(y)
+
+    assert result is x and result.values is buffers[0] and result.errors is buffers[1]
+
+    _AssertSame(result, expected)
+
+
+def test_out_into_another_object():
+
+    x, _ = _Inputs()
+
+    out = ValueUncertainty(np.empty(50), np.empty(50))
+
+    assert ValueUncertainty.exp(x, out = out) is out
+
+    _AssertSame(out, ValueUncertainty.exp(x))
+
+
+def test_in_place_operators_keep_cached_statistics():
+
+    a = ValueUncertainty(np.arange(1.0, 5.0), np.full(4, 0.1))
+
+    mean = a.mean
+
+    mean += 1
+
+    assert a.mean.values[0] == 2.5
+
+    a += 1
+
+    assert a.mean.values[0] == 3.5
+
+
+def test_cached_results_are_read_only():
+
+    mean = ValueUncertainty(np.arange(1.0, 5.0), np.full(4, 0.1)).mean
+
+    with pytest.raises(ValueError):
+        mean[0] = 1.0
+
+    with pytest.raises(ValueError):
+        mean.values[0] = 1.0
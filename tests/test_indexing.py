@@ -0,0 +1,91 @@
+"""
+Tests of indexing, views and item assignment
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ScalarUncertainty, ValueUncertainty
+
+
+def _Data():
+    return ValueUncertainty(np.arange(10.0), np.linspace(0.1, 1.0, 10))
+
+
+def test_slices_are_views():
+
+    data = _Data()
+
+    view = data[2:8:2]
+
+    assert np.shares_memory(view.values, data.values) and np.shares_memory(view.errors, data.errors)
+
+    view[0] = ValueUncertainty(50.0, 5.0)
+
+    assert data.values[2] == 50.0 and data.errors[2] == 5.0
+
+
+def test_index_arrays_and_masks_copy():
+
+    data = _Data()
+
+    for index in ([1, 3, 5], data.values > 6, np.array([0, 0, 9])):
+
+        selected = data[index]
+
+        np.testing.assert_array_equal(selected.values, data.values[index])
+
+        np.testing.assert_array_equal(selected.errors, data.errors[index])
+
+        assert not np.shares_memory(selected.values, data.values)
+
+
+def test_single_items_are_scalars():
+
+    data = _Data()
+
+    item = data[-1]
+
+    assert isinstance(item, ScalarUncertainty) and (item.value, item.error) == (9.0, 1.0)
+
+    with pytest.raises(IndexError):
+        data[1.5]
+
+
+def test_bulk_assignment():
+
+    data = _Data()
+
+    data[data.values < 3] = 0.0
+
+    np.testing.assert_array_equal(data.values[:4], [0.0, 0.0, 0.0, 3.0])
+
+    np.testing.assert_array_equal(data.errors[:3], 0.0)
+
+    data[[4, 5]] = ValueUncertainty(np.array([1.0, 2.0]), np.array([0.5, 0.5]))
+
+    np.testing.assert_array_equal(data.errors[4:6], [0.5, 0.5])
+
+
+def test_uncertain_items_into_exact_data():
+
+    exact = ValueUncertainty(np.arange(4.0))
+
+    exact[1] = ValueUncertainty(7.0, 0.5)
+
+    np.testing.assert_array_equal(exact.errors, [0.0, 0.5, 0.0, 0.0])
+
+    with pytest.raises(ValueError):
+        ValueUncertainty(np.arange(4.0))[1:3][0] = ValueUncertainty(7.0, 0.5)
+
+
+def test_multidimensional_indexing():
+
+    data = ValueUncertainty(np.arange(12.0).reshape(3, 4), np.full((3, 4), 0.1))
+
+    np.testing.assert_array_equal(data[1].values, [4.0, 5.0, 6.0, 7.0])
+
+    np.testing.assert_array_equal(data[:, 2].values, [2.0, 6.0, 10.0])
+
+    assert data[2, 3].value == 11.0
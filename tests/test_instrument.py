@@ -0,0 +1,49 @@
+"""
+Tests of the per-operation instrumentation
+"""
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+from Instrument import Instrumentation, InstrumentationReport, IsInstrumenting
+
+
+def test_operations_are_counted():
+
+    x = ValueUncertainty(np.arange(10.0), np.full(10, 0.1))
+
+    with Instrumentation() as instrumentation:
+        ValueUncertainty.sin(x * 2 + 1)
+
+    stats = instrumentation.stats
+
+    for name in ('ValueUncertainty.__mul__', 'ValueUncertainty.__add__', 'ValueUncertainty.sin'):
+
+        assert stats[name].Calls == 1 and stats[name].Elements == 10
+
+        assert stats[name].Allocations == 2 and stats[name].AllocatedBytes == 160
+
+    assert all(item.Seconds >= item.SelfSeconds >= 0 for item in stats.values())
+
+    assert 'ValueUncertainty.sin' in InstrumentationReport(stats)
+
+
+def test_originals_are_restored():
+
+    add, sin = ValueUncertainty.__add__, ValueUncertainty.sin
+
+    with Instrumentation():
+
+        assert IsInstrumenting() and ValueUncertainty.__add__ is not add
+
+        with Instrumentation() as inner:
+            ValueUncertainty(1.0, 0.1) + 1
+
+        assert IsInstrumenting()
+
+    assert not IsInstrumenting()
+
+    assert ValueUncertainty.__add__ is add and ValueUncertainty.sin is sin
+
+    assert inner.stats['ScalarUncertainty.__add__'].Calls == 1
@@ -0,0 +1,108 @@
+"""
+Tests of lazy evaluation, see ValueUncertainty.StartLazyEvaluation
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+
+def _Formula(x, y):
+    return ValueUncertainty.sin(x) * y + x / y
+
+
+def _Inputs(count = 50):
+
+    x = ValueUncertainty(np.linspace(0.1, 2.0, count), np.full(count, 0.01))
+
+    y = ValueUncertainty(np.linspace(1.0, 3.0, count), np.linspace(0.02, 0.05, count))
+
+    return x, y
+
+
+@pytest.fixture
+def lazy():
+
+    ValueUncertainty.StartLazyEvaluation()
+
+    yield
+
+    ValueUncertainty.EndLazyEvaluation()
+
+
+def test_lazy_matches_eager():
+
+    x, y = _Inputs()
+
+    expected = _Formula(x, y)
+
+    ValueUncertainty.StartLazyEvaluation()
+
+    try:
+        result = _Formula(x, y)
+
+    finally:
+        ValueUncertainty.EndLazyEvaluation()
+
+    assert result._expression is not None
+
+    np.testing.assert_allclose(result.values, expected.values, rtol = 1e-13)
+
+    np.testing.assert_allclose(result.errors, expected.errors, rtol = 1e-13)
+
+
+def test_small_blocks_match_one_block():
+
+    x, y = _Inputs(1000)
+
+    results = []
+
+    for block_size in (7, None):
+
+        ValueUncertainty.StartLazyEvaluation(block_size)
+
+        try:
+            results.append(_Formula(x, y))
+
+        finally:
+            ValueUncertainty.EndLazyEvaluation()
+
+    np.testing.assert_array_equal(results[0].values, results[1].values)
+
+    np.testing.assert_array_equal(results[0].errors, results[1].errors)
+
+
+def test_writes_do_not_leak_into_lazy_results(lazy):
+
+    a = ValueUncertainty(np.arange(1.0, 5.0), np.full(4, 0.1))
+
+    doubled = a * 2
+
+    ValueUncertainty.EndLazyEvaluation()
+
+    a[0] = ValueUncertainty(100.0, 0.1)
+
+    a += 1
+
+    np.testing.assert_array_equal(doubled.values, [2.0, 4.0, 6.0, 8.0])
+
+
+def test_construction_while_a_result_is_pending(lazy):
+
+    x = ValueUncertainty(np.arange(3.0), np.full(3, 0.1))
+
+    pending = x * 2
+
+    ValueUncertainty.EndLazyEvaluation()
+
+    exact = ValueUncertainty(np.arange(3.0))
+
+    uncertain = ValueUncertainty([1.0, 2.0], [0.1, 0.1])
+
+    assert exact.is_exact and uncertain.errors[1] == 0.1
+
+    assert pending._expression is not None
+
+    np.testing.assert_array_equal(pending.values, [0.0, 2.0, 4.0])
@@ -0,0 +1,67 @@
+"""
+Tests of the Monte Carlo propagation
+"""
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+from MonteCarlo import MonteCarloPropagate
+
+
+def _Linear(x, y):
+    return 2 * x - y
+
+
+def _Total(x):
+    return ValueUncertainty.sum(x * x, axis = -1)
+
+
+def test_linear_function_matches_propagation():
+
+    x = ValueUncertainty(np.linspace(1.0, 5.0, 40), np.full(40, 0.3))
+
+    y = ValueUncertainty(np.full(40, 2.0), np.full(40, 0.4))
+
+    result = MonteCarloPropagate(_Linear, x, y, draws = 20000, seed = 2)
+
+    expected = _Linear(x, y)
+
+    np.testing.assert_allclose(result.Mean, expected.values, atol = 0.03)
+
+    np.testing.assert_allclose(result.Std, expected.errors, rtol = 0.05)
+
+    assert result.Percentiles.shape == (3, 40)
+
+    np.testing.assert_array_equal(result.Result.values, result.Mean)
+
+
+def test_seed_reproduces_results_over_memory_chunks():
+
+    x = ValueUncertainty(np.linspace(1.0, 5.0, 40), np.full(40, 0.3))
+
+    runs = [MonteCarloPropagate(ValueUncertainty.exp, x, draws = 1000, seed = 7, memory_limit = 2**16) for _ in range(2)]
+
+    np.testing.assert_array_equal(runs[0].Percentiles, runs[1].Percentiles)
+
+
+def test_reducing_function():
+
+    x = ValueUncertainty(np.arange(1.0, 11.0), np.full(10, 0.1))
+
+    result = MonteCarloPropagate(_Total, x, draws = 20000, seed = 4, elementwise = False)
+
+    # The sum of squares has mean sum(x^2 + e^2) and spread sqrt(sum((2 x e)^2))
+    np.testing.assert_allclose(result.Mean, np.square(x.values).sum() + np.square(x.errors).sum(), rtol = 1e-3)
+
+    np.testing.assert_allclose(result.Std, np.sqrt(np.square(2 * x.values * x.errors).sum()), rtol = 0.05)
+
+
+def test_reducing_function_does_not_depend_on_processes():
+
+    x = ValueUncertainty(np.arange(100.0), np.full(100, 0.5))
+
+    runs = [MonteCarloPropagate(_Total, x, draws = 500, seed = 1, elementwise = False, processes = processes, memory_limit = 2**20)
+            for processes in (None, 2)]
+
+    np.testing.assert_array_equal(runs[0].Percentiles, runs[1].Percentiles)
@@ -0,0 +1,71 @@
+"""
+Tests of the numpy ufunc and array function protocols
+"""
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+def _Data():
+    return ValueUncertainty(np.linspace(0.5, 2.0, 6), np.full(6, 0.1))
+
+
+def _AssertSame(result, expected):
+
+    assert isinstance(result, ValueUncertainty)
+
+    np.testing.assert_allclose(result.values, expected.values)
+
+    np.testing.assert_allclose(result.errors, expected.errors)
+
+
+def test_ufuncs_propagate_errors():
+
+    data = _Data()
+
+    _AssertSame(np.sin(data), ValueUncertainty.sin(data))
+
+    _AssertSame(np.exp(data), ValueUncertainty.exp(data))
+
+    _AssertSame(np.sqrt(data), ValueUncertainty.sqrt(data))
+
+    _AssertSame(np.multiply(data, 3), data * 3)
+
+
+def test_arrays_on_the_left():
+
+    data = _Data()
+
+    array = np.arange(6.0)
+
+    _AssertSame(array + data, data + array)
+
+    _AssertSame(array * data, data * array)
+
+    _AssertSame(array - data, -(data - array))
+
+
+def test_array_functions():
+
+    data = ValueUncertainty(np.arange(12.0).reshape(3, 4), np.full((3, 4), 0.1))
+
+    _AssertSame(np.sum(data, axis = 0), ValueUncertainty.sum(data, axis = 0))
+
+    _AssertSame(np.mean(data), ValueUncertainty.average(data))
+
+    _AssertSame(np.var(data, ddof = 1), ValueUncertainty.variance(data, ddof = 1))
+
+    assert np.shape(data) == (3, 4) and np.ndim(data) == 2 and np.size(data) == 12
+
+    stacked = np.stack([data, data])
+
+    assert stacked.shape == (2, 3, 4)
+
+    joined = np.concatenate([data, data], axis = 1)
+
+    np.testing.assert_array_equal(joined.values, np.concatenate([data.values, data.values], axis = 1))
+
+    np.testing.assert_array_equal(np.transpose(data).values, data.values.T)
+
+    np.testing.assert_array_equal(np.reshape(data, (4, 3)).errors, np.full((4, 3), 0.1))
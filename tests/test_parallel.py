@@ -0,0 +1,53 @@
+"""
+Tests of the process pool map over shared memory
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+from Parallel import ParallelMap
+
+
+def _Pipeline(x, y):
+    return ValueUncertainty.exp(x / 10) * y - x
+
+
+def _Inputs():
+
+    x = ValueUncertainty(np.linspace(0.0, 5.0, 300).reshape(100, 3), np.full((100, 3), 0.1))
+
+    y = ValueUncertainty(np.linspace(1.0, 2.0, 3), np.full(3, 0.05))
+
+    return x, y
+
+
+def test_matches_eager_evaluation():
+
+    x, y = _Inputs()
+
+    result = ParallelMap(_Pipeline, x, y, processes = 2, chunk_rows = 7)
+
+    expected = _Pipeline(x, y)
+
+    assert result.shape == (100, 3)
+
+    np.testing.assert_array_equal(result.values, expected.values)
+
+    np.testing.assert_array_equal(result.errors, expected.errors)
+
+
+def test_running_pool_and_array_inputs():
+
+    x, _ = _Inputs()
+
+    with ProcessPoolExecutor(max_workers = 2) as pool:
+        result = ParallelMap(_Pipeline, x, np.full(3, 2.0), pool = pool)
+
+    expected = _Pipeline(x, ValueUncertainty(np.full(3, 2.0)))
+
+    np.testing.assert_array_equal(result.values, expected.values)
+
+    np.testing.assert_array_equal(result.errors, expected.errors)
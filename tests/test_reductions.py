@@ -0,0 +1,80 @@
+"""
+Tests of the vectorised sum, average and variance
+"""
+
+import numpy as np
+
+from Error import ValueUncertainty
+
+
+def _Data():
+
+    values = np.arange(12.0).reshape(3, 4)
+
+    return ValueUncertainty(values, 0.1 + values / 100)
+
+
+def test_sum_adds_errors_in_quadrature():
+
+    data = _Data()
+
+    for axis in (None, 0, 1):
+
+        result = ValueUncertainty.sum(data, axis = axis)
+
+        np.testing.assert_allclose(result.values, np.atleast_1d(data.values.sum(axis = axis)))
+
+        np.testing.assert_allclose(result.errors, np.atleast_1d(np.sqrt(np.square(data.errors).sum(axis = axis))))
+
+
+def test_sum_of_items_matches_the_array_sum():
+
+    data = ValueUncertainty(np.arange(1.0, 5.0), np.full(4, 0.1))
+
+    by_items = ValueUncertainty.sum(list(data))
+
+    result = ValueUncertainty.sum(data)
+
+    np.testing.assert_allclose(by_items.values, result.values)
+
+    np.testing.assert_allclose(by_items.errors, result.errors)
+
+
+def test_average_and_variance_match_numpy():
+
+    data = _Data()
+
+    for axis in (None, 0, 1):
+
+        np.testing.assert_allclose(ValueUncertainty.average(data, axis).values, np.atleast_1d(data.values.mean(axis = axis)))
+
+        for ddof in (0, 1):
+            np.testing.assert_allclose(ValueUncertainty.variance(data, axis, ddof).values, np.atleast_1d(data.values.var(axis = axis, ddof = ddof)))
+
+
+def test_variance_matches_the_item_by_item_formula():
+
+    data = ValueUncertainty(np.array([1.0, 2.0, 4.0]), np.array([0.1, 0.2, 0.1]))
+
+    mean = ValueUncertainty.sum(list(data)) / 3
+
+    expected = ValueUncertainty.sum([(item - mean) ** 2 for item in data]) / 3
+
+    np.testing.assert_allclose(data.population_variance.values, expected.values)
+
+
+def test_captured_sums_and_means_are_recorded_item_by_item():
+
+    x = ValueUncertainty(np.array([1.0, 2.0, 3.0]), np.full(3, 0.1), 'x')
+
+    with ValueUncertainty.CalcCapture() as capture:
+        x.mean * 2
+
+    assert capture.latex_list[0] == '$\\frac{x_{0} + x_{1} + x_{2}}{3} * 2$'
+
+    assert capture.latex_list[-1] == '$4.0$'
+
+    with ValueUncertainty.CalcCapture() as capture:
+        ValueUncertainty.sum(ValueUncertainty([1, 2, 3])) + 1
+
+    assert capture.latex_list == ['$1 + 2 + 3 + 1$', '$1 + 2 + 3 + 1$', '$3 + 3 + 1$', '$6 + 1$', '$7$']
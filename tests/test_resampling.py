@@ -0,0 +1,81 @@
+"""
+Tests of the bootstrap and jackknife
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+from Resampling import Bootstrap, Jackknife
+
+
+def _Data():
+    return ValueUncertainty(np.random.default_rng(9).normal(5.0, 2.0, 200))
+
+
+def _Median(sample):
+    return np.median(sample.values, axis = 1)
+
+
+def test_bootstrap_of_the_mean():
+
+    data = _Data()
+
+    result = Bootstrap(data, resamples = 4000, seed = 1)
+
+    assert result.Estimate == pytest.approx(data.values.mean())
+
+    assert result.Std == pytest.approx(data.values.std() / np.sqrt(200), rel = 0.05)
+
+    assert result.Replicates.shape == (4000,) and result.Percentiles.shape == (3,)
+
+    assert result.Percentiles[0] < result.Estimate < result.Percentiles[2]
+
+
+def test_bootstrap_repeats_with_the_seed():
+
+    data = _Data()
+
+    runs = [Bootstrap(data, _Median, resamples = 300, seed = 5, memory_limit = 2**16, processes = processes) for processes in (None, 2)]
+
+    np.testing.assert_array_equal(runs[0].Replicates, runs[1].Replicates)
+
+
+def test_jackknife_of_the_mean_is_the_standard_error():
+
+    data = _Data()
+
+    result = Jackknife(data)
+
+    assert result.Std == pytest.approx(data.values.std(ddof = 1) / np.sqrt(200))
+
+    assert result.Bias == pytest.approx(0, abs = 1e-12)
+
+    replicates = [np.delete(data.values, i).mean() for i in range(200)]
+
+    np.testing.assert_allclose(result.Replicates, replicates)
+
+
+def test_jackknife_batches_agree():
+
+    data = _Data()
+
+    small = Jackknife(data, 'sample_variance', memory_limit = 2**12)
+
+    large = Jackknife(data, 'sample_variance')
+
+    np.testing.assert_allclose(small.Replicates, large.Replicates)
+
+
+def test_items_are_resampled_along_axis_0():
+
+    data = ValueUncertainty(np.arange(20.0).reshape(10, 2))
+
+    result = Bootstrap(data, resamples = 50, seed = 0)
+
+    assert result.Replicates.shape == (50, 2)
+
+    with pytest.raises(ValueError):
+        Jackknife(ValueUncertainty([1.0]))
@@ -0,0 +1,111 @@
+"""
+Tests of ScalarUncertainty, which must behave as a 1 item ValueUncertainty
+"""
+
+import pickle
+
+import numpy as np
+
+import pytest
+
+from Error import ScalarUncertainty, ValueUncertainty
+
+
+@pytest.mark.parametrize('operation', [
+    lambda a, b: a + b,
+    lambda a, b: a - b,
+    lambda a, b: b - a,
+    lambda a, b: a * b,
+    lambda a, b: a / b,
+    lambda a, b: b / a,
+    lambda a, b: 3.0 / a,
+    lambda a, b: a ** 2,
+    lambda a, b: 2.0 ** a,
+    lambda a, b: abs(-a),
+    lambda a, b: ValueUncertainty.sin(a),
+    lambda a, b: ValueUncertainty.exp(b),
+    lambda a, b: ValueUncertainty.log(a),
+])
+def test_scalar_matches_one_item_array(operation):
+
+    scalar = operation(ValueUncertainty(1.7, 0.3), ValueUncertainty(0.6, 0.05))
+
+    array = operation(ValueUncertainty(np.array([1.7]), np.array([0.3])), ValueUncertainty(np.array([0.6]), np.array([0.05])))
+
+    assert isinstance(scalar, ScalarUncertainty)
+
+    np.testing.assert_array_equal(scalar.values, array.values)
+
+    np.testing.assert_array_equal(scalar.errors, array.errors)
+
+
+def test_array_api():
+
+    scalar = ValueUncertainty(2.0, 0.5, 'x')
+
+    assert scalar.shape == (1,) and scalar.ndim == 1 and scalar.size == 1 and len(scalar) == 1
+
+    assert [str(item) for item in scalar] == ['[2.0 ± 0.5]']
+
+    assert not scalar.is_exact and ValueUncertainty(2.0).is_exact
+
+    restored = pickle.loads(pickle.dumps(scalar))
+
+    assert (restored.value, restored.error, restored._variable_name) == (2.0, 0.5, 'x')
+
+
+def test_products_overflow_to_infinity():
+
+    with np.errstate(over = 'ignore'):
+
+        product = ScalarUncertainty(1e160, 1e158) * ScalarUncertainty(2.0, 0.1)
+
+        quotient = ScalarUncertainty(1e160, 1e158) / ScalarUncertainty(1e-160, 1e-162)
+
+    assert product.values[0] == 2e160 and np.isinf(product.errors[0])
+
+    assert np.isinf(quotient.values[0])
+
+
+def test_item_assignment():
+
+    scalar = ValueUncertainty(3.0, 0.1)
+
+    mean = scalar.mean
+
+    scalar[0] = ValueUncertainty(1.0, 0.2)
+
+    assert (scalar.value, scalar.error) == (1.0, 0.2) and mean.values[0] == 3.0
+
+    assert scalar.mean.values[0] == 1.0
+
+    scalar[...] = 5
+
+    assert scalar.value == 5 and scalar.is_exact
+
+    with pytest.raises(IndexError):
+        scalar[1] = 2.0
+
+    with pytest.raises(ValueError):
+        scalar[0] = [1.0, 2.0]
+
+
+def test_buffers_are_read_only_copies():
+
+    scalar = ValueUncertainty(2, 1)
+
+    with pytest.raises(ValueError):
+        scalar.values[0] = 3
+
+    with pytest.raises(ValueError):
+        scalar.errors *= 2
+
+    scalar.errors = scalar.errors * 3
+
+    assert str(scalar) == '[2 ± 3]'
+
+    array = ValueUncertainty([2.0], [1.0])
+
+    array.errors *= 2
+
+    assert not isinstance(array, ScalarUncertainty) and array.errors[0] == 2.0
@@ -0,0 +1,112 @@
+"""
+Tests of the weighted statistics, chi-square and group-by aggregation
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+from Statistics import ChiSquare, GroupBy, WeightedMean
+
+
+def _Data(shape):
+
+    rng = np.random.default_rng(5)
+
+    return ValueUncertainty(rng.normal(10.0, 2.0, shape), rng.uniform(0.1, 1.0, shape))
+
+
+def test_weighted_mean():
+
+    data = _Data((4, 6))
+
+    weights = 1 / np.square(data.errors)
+
+    for axis in (None, 0, 1):
+
+        result = WeightedMean(data, axis)
+
+        np.testing.assert_allclose(result.values, np.atleast_1d(np.average(data.values, axis = axis, weights = weights)))
+
+        np.testing.assert_allclose(result.errors, np.atleast_1d(1 / np.sqrt(weights.sum(axis = axis))))
+
+
+def test_zero_errors_are_refused():
+
+    data = ValueUncertainty([1.0, 2.0, 3.0], [0.1, 0.0, 0.1])
+
+    with pytest.raises(ValueError):
+        WeightedMean(data)
+
+    with pytest.raises(ValueError):
+        GroupBy([0, 0, 1], data).weighted_mean()
+
+    with pytest.raises(ValueError):
+        ChiSquare(data, 2.0)
+
+
+def test_chi_square():
+
+    data = _Data(20)
+
+    expected = ValueUncertainty(np.full(20, 10.0), np.full(20, 0.5))
+
+    result = ChiSquare(data, expected, parameters = 2)
+
+    np.testing.assert_allclose(result.ChiSquare, [(np.square(data.values - 10.0) / (np.square(data.errors) + 0.25)).sum()])
+
+    assert result.Degrees == 18
+
+    np.testing.assert_allclose(result.Reduced, result.ChiSquare / 18)
+
+    against_mean = ChiSquare(data)
+
+    mean = WeightedMean(data).values
+
+    np.testing.assert_allclose(against_mean.ChiSquare, [np.square((data.values - mean) / data.errors).sum()])
+
+    assert against_mean.Degrees == 19
+
+
+@pytest.mark.parametrize('labels', [
+    np.array([3, 1, 3, 0, 1, 3, 0, 0, 1, 3]),
+    np.array([-7, 10**9, -7, 5, 5, 10**9, -7, 5, 5, -7]),
+])
+@pytest.mark.parametrize('shape', [(10,), (10, 3)])
+def test_group_by_matches_masks(labels, shape):
+
+    data = _Data(shape)
+
+    groups = GroupBy(labels, data)
+
+    np.testing.assert_array_equal(groups.keys, np.unique(labels))
+
+    sums, means, weighted, variances = groups.sum(), groups.mean(), groups.weighted_mean(), groups.variance(ddof = 1)
+
+    chi_square = groups.chi_square()
+
+    for row, key in enumerate(groups.keys):
+
+        group = data[labels == key]
+
+        assert groups.counts[row] == len(group)
+
+        for result, expected in ((sums, ValueUncertainty.sum(group, axis = 0)), (means, ValueUncertainty.average(group, axis = 0)),
+                                 (weighted, WeightedMean(group, axis = 0)), (variances, ValueUncertainty.variance(group, axis = 0, ddof = 1))):
+
+            np.testing.assert_allclose(result.values[row], expected.values.reshape(shape[1:]))
+
+            np.testing.assert_allclose(result.errors[row], expected.errors.reshape(shape[1:]))
+
+        np.testing.assert_allclose(chi_square.ChiSquare[row], ChiSquare(group, axis = 0).ChiSquare.reshape(shape[1:]))
+
+
+def test_group_labels_are_checked():
+
+    with pytest.raises(TypeError):
+        GroupBy([0.5, 1.0], [1.0, 2.0])
+
+    with pytest.raises(ValueError):
+        GroupBy([0, 1, 1], [1.0, 2.0])
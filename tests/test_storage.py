@@ -0,0 +1,116 @@
+"""
+Tests of the binary storage and the CSV reader
+"""
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+from Storage import LoadValueUncertainty, ReadCSV, SaveValueUncertainty
+
+
+def _Data():
+    return ValueUncertainty(np.arange(12.0).reshape(3, 4), np.full((3, 4), 0.5), 'x')
+
+
+def _AssertSame(result, expected):
+
+    np.testing.assert_array_equal(result.values, expected.values)
+
+    assert result.is_exact == expected.is_exact
+
+    np.testing.assert_array_equal(result.errors, expected.errors)
+
+    assert result._variable_name == expected._variable_name
+
+
+@pytest.mark.parametrize('name', ['data', 'data.npz'])
+def test_round_trip(tmp_path, name):
+
+    data = _Data()
+
+    SaveValueUncertainty(tmp_path / name, data)
+
+    _AssertSame(LoadValueUncertainty(tmp_path / name), data)
+
+
+def test_compressed_archive(tmp_path):
+
+    SaveValueUncertainty(tmp_path / 'data.npz', _Data(), compressed = True)
+
+    _AssertSame(LoadValueUncertainty(tmp_path / 'data.npz'), _Data())
+
+
+@pytest.mark.parametrize('mmap_mode', ['r', 'r+', 'c'])
+def test_memory_mapped_loading(tmp_path, mmap_mode):
+
+    SaveValueUncertainty(tmp_path / 'data', _Data())
+
+    loaded = LoadValueUncertainty(tmp_path / 'data', mmap_mode = mmap_mode)
+
+    assert isinstance(loaded.values, np.memmap) and isinstance(loaded.errors, np.memmap)
+
+    _AssertSame(loaded, _Data())
+
+    if mmap_mode == 'r':
+
+        with pytest.raises(ValueError):
+            loaded[0, 0] = 5.0
+
+        return
+
+    loaded[0, 0] = ValueUncertainty(5.0, 1.0)
+
+    del loaded
+
+    reloaded = LoadValueUncertainty(tmp_path / 'data')
+
+    assert reloaded.values[0, 0] == (5.0 if mmap_mode == 'r+' else 0.0)
+
+
+def test_exact_data_drops_old_errors(tmp_path):
+
+    SaveValueUncertainty(tmp_path / 'data', _Data())
+
+    SaveValueUncertainty(tmp_path / 'data', ValueUncertainty(np.arange(3.0), variable_name = 'y'))
+
+    loaded = LoadValueUncertainty(tmp_path / 'data')
+
+    assert loaded.is_exact and not (tmp_path / 'data' / 'errors.npy').exists()
+
+
+def test_read_csv(tmp_path):
+
+    path = tmp_path / 'data.csv'
+
+    path.write_text("value,error\n1.0,0.1\n\n2.0,-0.2\n3.0,0.3")
+
+    data = ReadCSV(path, skip_rows = 1, chunk_rows = 2, variable_name = 'x')
+
+    np.testing.assert_array_equal(data.values, [1.0, 2.0, 3.0])
+
+    np.testing.assert_array_equal(data.errors, [0.1, 0.2, 0.3])
+
+    exact = ReadCSV(path, error_column = None, skip_rows = 1)
+
+    assert exact.is_exact and exact.shape == (3,)
+
+
+def test_read_csv_into_given_buffers(tmp_path):
+
+    path = tmp_path / 'data.csv'
+
+    path.write_text("".join(f"{i},{i / 10}\n" for i in range(10)))
+
+    out = (np.empty(10), np.empty(10))
+
+    data = ReadCSV(path, chunk_rows = 3, out = out)
+
+    assert np.shares_memory(data.values, out[0])
+
+    np.testing.assert_array_equal(data.values, np.arange(10.0))
+
+    with pytest.raises(ValueError):
+        ReadCSV(path, out = (np.empty(5), np.empty(5)))
@@ -0,0 +1,95 @@
+"""
+Tests of the streaming accumulator against the whole dataset statistics
+"""
+
+import pickle
+
+import numpy as np
+
+import pytest
+
+from Error import ValueUncertainty
+
+from Streaming import Accumulate, RunningStatistics
+
+
+def _Data(shape = (500,)):
+
+    rng = np.random.default_rng(11)
+
+    return ValueUncertainty(rng.normal(1e6, 3.0, shape), rng.uniform(0.1, 0.5, shape))
+
+
+def _AssertSame(result, expected):
+
+    np.testing.assert_allclose(result.values, expected.values, rtol = 1e-9)
+
+    np.testing.assert_allclose(result.errors, expected.errors, rtol = 1e-9)
+
+
+def _Chunks(data, sizes):
+
+    starts = np.cumsum([0] + list(sizes))
+
+    return [data[start:stop] for start, stop in zip(starts[:-1], starts[1:])]
+
+
+def test_matches_the_whole_dataset():
+
+    data = _Data()
+
+    statistics = Accumulate(_Chunks(data, [1, 99, 250, 0, 150]))
+
+    assert statistics.count == 500
+
+    _AssertSame(statistics.mean, ValueUncertainty.average(data))
+
+    _AssertSame(statistics.sum, ValueUncertainty.sum(data))
+
+    _AssertSame(statistics.population_variance, ValueUncertainty.variance(data))
+
+    _AssertSame(statistics.sample_variance, ValueUncertainty.variance(data, ddof = 1))
+
+    _AssertSame(statistics.standard_error, data.standard_error)
+
+
+def test_merged_shards_match_the_whole_dataset():
+
+    data = _Data()
+
+    shards = [Accumulate(_Chunks(data[start:start + 100], [30, 70])) for start in range(0, 500, 100)]
+
+    merged = RunningStatistics()
+
+    for shard in shards:
+        merged.merge(pickle.loads(pickle.dumps(shard)))
+
+    _AssertSame(merged.sample_variance, ValueUncertainty.variance(data, ddof = 1))
+
+    _AssertSame(merged.mean, ValueUncertainty.average(data))
+
+
+def test_rows_are_reduced_per_item():
+
+    data = _Data((120, 4))
+
+    statistics = Accumulate(_Chunks(data, [50, 70]), axis = 0)
+
+    _AssertSame(statistics.mean, ValueUncertainty.average(data, axis = 0))
+
+    _AssertSame(statistics.population_variance, ValueUncertainty.variance(data, axis = 0))
+
+
+def test_exact_chunks_and_errors():
+
+    statistics = Accumulate([np.arange(5.0), np.arange(5.0, 10.0)])
+
+    assert statistics.exact and statistics.mean.is_exact
+
+    np.testing.assert_allclose(statistics.sample_variance.values, [np.var(np.arange(10.0), ddof = 1)])
+
+    with pytest.raises(ValueError):
+        RunningStatistics().mean
+
+    with pytest.raises(ValueError):
+        RunningStatistics().merge(RunningStatistics(axis = 0))